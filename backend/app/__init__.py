@@ -1,8 +1,14 @@
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
+from functools import partial
 from .database import Database
 from .utils.scraper import AMCScraper
+from .utils.retrieval import RetrievalEngine
+from .utils.admission import Admission
+from .utils.analytics import WriteBehindBuffer
+from config import Config
 import logging
 
 # Configure logging
@@ -12,23 +18,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def create_app():
+def _discard(records):
+    pass
+
+def create_app(database=None, use_database=True):
+    """Build the app; `database` replaces the MongoDB connection, `use_database=False` runs without one"""
     app = Flask(__name__)
     CORS(app)
 
+    # Behind our proxies the client address is the last X-Forwarded-For entry
+    # they did not add; anything to its left was sent by the client.
+    if Config.ADMISSION_TRUST_PROXY:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=max(1, Config.ADMISSION_PROXY_HOPS))
+
     # Initialize MongoDB (optional)
-    mongo_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-    try:
-        app.db = Database(mongo_uri)
-        logger.info("MongoDB connection established")
-    except Exception as e:
-        logger.warning(f"MongoDB not available, running without database: {str(e)}")
+    # Nothing connects here: the connection check and index creation run in
+    # the background from the warm-up or the first query, so a slow or
+    # missing MongoDB never delays startup.
+    if database is not None:
+        app.db = database
+        logger.info("Using provided database")
+    elif not use_database:
         app.db = None
+        logger.info("Running without a database")
+    else:
+        mongo_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
+        app.db = Database(mongo_uri)
 
     # Initialize scraper
     app.scraper = AMCScraper()
     logger.info("AMC scraper initialized")
 
+    # One retrieval engine behind every question/search endpoint
+    app.engine = RetrievalEngine(app.scraper, app.db)
+
+    # Per-client rate limits, checked before any route does work
+    app.admission = Admission()
+
+    # Query analytics are buffered and written to MongoDB in batches
+    write = partial(app.db.insert_records, 'query_log') if app.db is not None else _discard
+    app.analytics = WriteBehindBuffer(write, 'query_log')
+
     # Import and register blueprints
     from .routes import main
     app.register_blueprint(main)
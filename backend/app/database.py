@@ -1,68 +1,166 @@
-from pymongo import MongoClient
-from datetime import datetime, timedelta
-import os
+from datetime import datetime, timedelta, timezone
 import logging
+import threading
+import time
 from typing import List, Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
-# MongoDB setup
-client = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/'))
-db = client.amc_chatbot
-cache_collection = db.response_cache
-
-def cache_response(question, response, language):
-    cache_collection.insert_one({
-        'question': question,
-        'response': response,
-        'language': language,
-        'timestamp': datetime.now()
-    })
-
-def get_cached_response(question, language):
-    # Check for cached responses in the last 24 hours
-    one_day_ago = datetime.now() - timedelta(days=1)
-    
-    cached = cache_collection.find_one({
-        'question': question,
-        'language': language,
-        'timestamp': {'$gte': one_day_ago}
-    })
-    
-    if cached:
-        return {
-            'question': cached['question'],
-            'answer': cached['response'],
-            'language': cached['language'],
-            'source': 'cache'
-        }
-    return None
+def _mongo_client(connection_string: str, **kwargs):
+    """Build a MongoClient without connecting; pymongo is imported on first use"""
+    from pymongo import MongoClient
+    return MongoClient(connection_string, connect=False, **kwargs)
 
 class Database:
-    def __init__(self, connection_string: str = "mongodb://localhost:27017/"):
+    # After a failed connection attempt, requests fail fast for this long
+    # while a background probe retries, instead of each waiting on the
+    # server selection timeout.
+    RETRY_INTERVAL = 30
+    # Publication time first; articles stored before it was recorded sort last
+    NEWEST_FIRST = [('published_at', -1), ('last_updated', -1)]
+
+    def __init__(self, connection_string: str = "mongodb://localhost:27017/", client=None):
+        self.connection_string = connection_string
+        self._owns_client = client is None
+        # An already-built client (e.g. mongomock in benchmarks) can be injected
+        self._client = client
+        self._lock = threading.Lock()
+        self._probe = None
+        self.available = None  # None until the first connection attempt finishes
+        self._failed_at = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = _mongo_client(self.connection_string, serverSelectionTimeoutMS=5000)
+        return self._client
+
+    @property
+    def db(self):
+        return self.client.amc_chatbot
+
+    @property
+    def articles(self):
+        return self.db.articles
+
+    @property
+    def ready(self) -> bool:
+        """True once the background probe has reached MongoDB"""
+        return self.available is True
+
+    @property
+    def status(self) -> str:
+        if self.available is None:
+            return 'connecting'
+        return 'connected' if self.available else 'not available'
+
+    def connect_async(self) -> None:
+        """Check the connection and create indexes in a background thread"""
+        with self._lock:
+            if self._probe is not None and self._probe.is_alive():
+                return
+            self._probe = threading.Thread(target=self._connect, name='mongo-connect', daemon=True)
+            self._probe.start()
+
+    def _connect(self) -> None:
         try:
-            self.client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
             # Test the connection
             self.client.server_info()
-            self.db = self.client.amc_chatbot
-            self.articles = self.db.articles
-            # Create text index for better search
-            self.articles.create_index([
-                ("title", "text"),
-                ("content", "text")
-            ])
-            # Create unique index on URL
-            self.articles.create_index([("url", 1)], unique=True)
+            self.ensure_indexes()
+            self.available = True
             logger.info("Successfully connected to MongoDB")
         except Exception as e:
+            self.available = False
+            self._failed_at = time.monotonic()
             logger.error(f"Failed to connect to MongoDB: {str(e)}")
+
+    def ensure_indexes(self) -> None:
+        """Create the indexes the queries rely on"""
+        # Create text index for better search
+        self.articles.create_index([
+            ("title", "text"),
+            ("content", "text")
+        ])
+        # Create unique index on URL
+        self.articles.create_index([("url", 1)], unique=True)
+        # Publication time, for newest-first loads and date range queries
+        self.articles.create_index([("published_at", -1)])
+        self.db.response_cache.create_index([("question", 1), ("language", 1), ("timestamp", -1)])
+        self.db.query_log.create_index([("timestamp", -1)])
+
+    def _check_available(self) -> None:
+        """Fail fast while MongoDB is known to be down, retrying in the background"""
+        if self._probe is None:
+            self.connect_async()
+        if self.available is False:
+            if time.monotonic() - self._failed_at > self.RETRY_INTERVAL:
+                self._failed_at = time.monotonic()
+                self.connect_async()
+            raise ConnectionError("MongoDB is not available")
+
+    def reconnect(self) -> None:
+        """Drop the client after a fork; MongoClient is not fork-safe"""
+        if not self._owns_client:
+            return
+        # The parent's lock may have been held by its probe thread at fork time
+        self._lock = threading.Lock()
+        self._client = None
+        self._probe = None
+        self.connect_async()
+
+    def cache_response(self, question: str, response: str, language: str) -> None:
+        """Persist a generated answer for reuse by other processes"""
+        try:
+            self._check_available()
+            self.db.response_cache.insert_one({
+                'question': question,
+                'response': response,
+                'language': language,
+                'timestamp': datetime.now()
+            })
+        except Exception as e:
+            logger.error(f"Error caching response in MongoDB: {str(e)}")
+            raise
+
+    def get_cached_response(self, question: str, language: str, max_age: int = 86400) -> Optional[str]:
+        """Return an answer cached within `max_age` seconds, if any"""
+        try:
+            self._check_available()
+            cached = self.db.response_cache.find_one({
+                'question': question,
+                'language': language,
+                'timestamp': {'$gte': datetime.now() - timedelta(seconds=max_age)}
+            }, sort=[('timestamp', -1)])
+            return cached['response'] if cached else None
+        except Exception as e:
+            logger.error(f"Error reading cached response from MongoDB: {str(e)}")
+            raise
+
+    def get_cached_responses(self, questions: List[str], language: str, max_age: int = 86400) -> Dict[str, str]:
+        """Newest answer cached within `max_age` seconds for each of `questions`, in one query"""
+        try:
+            self._check_available()
+            cursor = self.db.response_cache.find({
+                'question': {'$in': list(questions)},
+                'language': language,
+                'timestamp': {'$gte': datetime.now() - timedelta(seconds=max_age)}
+            }, {'question': 1, 'response': 1}).sort('timestamp', 1)
+            # Oldest first, so the newest answer for each question wins
+            return {doc['question']: doc['response'] for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error reading cached responses from MongoDB: {str(e)}")
             raise
 
     def save_articles(self, articles: List[Dict[str, Any]]) -> None:
         """Save or update articles in MongoDB"""
         try:
+            self._check_available()
             for article in articles:
                 article['last_updated'] = datetime.now()
+                if article.get('published_ts') is not None:
+                    article['published_at'] = datetime.fromtimestamp(article['published_ts'], timezone.utc)
                 self.articles.update_one(
                     {'url': article['url']},
                     {'$set': article},
@@ -74,8 +172,9 @@ class Database:
             raise
 
     def get_articles(self, query: str = None, limit: int = 10) -> List[Dict[str, Any]]:
-        """Retrieve articles from MongoDB with optional text search"""
+        """Retrieve articles from MongoDB with optional text search, newest first"""
         try:
+            self._check_available()
             if query:
                 # Use text search if available, fallback to regex
                 try:
@@ -93,14 +192,14 @@ class Database:
                                     {'content': {'$regex': query, '$options': 'i'}}
                                 ]
                             }
-                        ).sort('last_updated', -1).limit(limit)
+                        ).sort(self.NEWEST_FIRST).limit(limit)
                         results = list(cursor)
                     return results
                 except Exception as e:
                     logger.error(f"Error using text search: {str(e)}")
                     raise
             else:
-                cursor = self.articles.find().sort('last_updated', -1).limit(limit)
+                cursor = self.articles.find().sort(self.NEWEST_FIRST).limit(limit)
                 return list(cursor)
         except Exception as e:
             logger.error(f"Error retrieving articles from MongoDB: {str(e)}")
@@ -109,7 +208,40 @@ class Database:
     def get_article_by_url(self, url: str) -> Optional[Dict[str, Any]]:
         """Retrieve a specific article by URL"""
         try:
+            self._check_available()
             return self.articles.find_one({'url': url})
         except Exception as e:
             logger.error(f"Error retrieving article by URL: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def insert_records(self, collection: str, records: List[Dict[str, Any]]) -> None:
+        """Insert a batch of records in one round trip (used by the write-behind buffers)"""
+        try:
+            self._check_available()
+            # insert_many adds _id to the documents; keep the caller's records unchanged
+            self.db[collection].insert_many([dict(record) for record in records], ordered=False)
+        except Exception as e:
+            logger.error(f"Error inserting {len(records)} records into {collection}: {str(e)}")
+            raise
+
+    def popular_questions(self, limit: int = 50, days: int = 7) -> List[Dict[str, Any]]:
+        """Most frequently asked questions of the last `days` days, with their counts"""
+        try:
+            self._check_available()
+            return list(self.db.query_log.aggregate([
+                {'$match': {
+                    'endpoint': 'ask',
+                    'timestamp': {'$gte': datetime.utcnow() - timedelta(days=days)}
+                }},
+                {'$group': {
+                    '_id': {'question': '$normalized_question', 'language': '$language'},
+                    'question': {'$last': '$question'},
+                    'count': {'$sum': 1}
+                }},
+                {'$sort': {'count': -1}},
+                {'$limit': limit},
+                {'$project': {'_id': 0, 'question': 1, 'language': '$_id.language', 'count': 1}}
+            ]))
+        except Exception as e:
+            logger.error(f"Error retrieving popular questions: {str(e)}")
+            raise
@@ -1,42 +1,52 @@
-from pymongo import MongoClient
 import os
 from datetime import datetime
 
+from ..utils.analytics import WriteBehindBuffer
+
+_client = None
+
 def get_db():
     """Get MongoDB connection with fallback to default local connection"""
+    global _client
     try:
-        mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/amc_chatbot')
-        client = MongoClient(mongodb_uri)
-        return client.amc_chatbot
+        if _client is None:
+            from pymongo import MongoClient
+            mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/amc_chatbot')
+            # Reused across calls; connects on the first operation
+            _client = MongoClient(mongodb_uri, connect=False)
+        return _client.amc_chatbot
     except Exception as e:
         print(f"MongoDB connection error: {str(e)}")
         return None
 
-def save_chat_history(question, answer, language):
-    """Save chat interaction to MongoDB"""
+def _write_chat_history(records):
     db = get_db()
-    if not db:
-        print("Warning: MongoDB not available, skipping chat history save")
-        return False
-    
+    if db is None:
+        raise ConnectionError("MongoDB not available")
+    db.chat_history.insert_many([dict(record) for record in records], ordered=False)
+
+_history = WriteBehindBuffer(_write_chat_history, 'chat_history')
+
+def save_chat_history(question, answer, language):
+    """Queue a chat interaction for a batched write to MongoDB"""
     chat_record = {
         'question': question,
         'answer': answer,
         'language': language,
         'timestamp': datetime.utcnow()
     }
-    
-    try:
-        db.chat_history.insert_one(chat_record)
-        return True
-    except Exception as e:
-        print(f"Error saving chat history: {str(e)}")
-        return False
+    _history.add(chat_record)
+    return True
+
+def flush_chat_history():
+    """Write queued chat history now (e.g. before reading it back)"""
+    _history.flush()
 
 def get_chat_history(limit=10):
     """Retrieve recent chat history"""
+    flush_chat_history()
     db = get_db()
-    if not db:
+    if db is None:
         print("Warning: MongoDB not available, returning empty history")
         return []
     
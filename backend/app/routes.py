@@ -1,12 +1,68 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app
+import json
 import logging
+import time
 import traceback
-from .utils.scraper import get_amc_content
-from .utils.institution_info import is_institutional_query, get_query_type, get_amc_info
+from config import Config
+from .utils.admission import Overloaded
+from .utils.analytics import query_record
 
 main = Blueprint('main', __name__)
 logger = logging.getLogger(__name__)
 
+# Endpoints that do retrieval work are rate limited per client; the health check
+# and /api/suggest (answered from memory on every keystroke) are not
+RATE_LIMITED_ENDPOINTS = {'main.ask', 'main.ask_batch', 'main.search'}
+
+def _client_address():
+    # With ADMISSION_TRUST_PROXY, ProxyFix has already set this from X-Forwarded-For
+    return request.remote_addr or 'unknown'
+
+def _batch_limit():
+    """Most questions this client may send in one batch: one rate-limit token each"""
+    max_cost = current_app.admission.max_cost(request.headers.get('X-API-Key'))
+    return min(Config.ASK_BATCH_MAX_QUESTIONS, max_cost or Config.ASK_BATCH_MAX_QUESTIONS)
+
+def _overloaded(e):
+    response = jsonify({
+        'status': 'error',
+        'message': str(e)
+    })
+    response.status_code = e.status
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@main.before_request
+def admit():
+    """Turn clients away with 429 before any work is done once they exceed their rate"""
+    if request.endpoint not in RATE_LIMITED_ENDPOINTS:
+        return None
+    cost = 1
+    if request.endpoint == 'main.ask_batch':
+        data = request.get_json(silent=True)
+        questions = data.get('questions') if isinstance(data, dict) else None
+        cost = max(1, len(questions)) if isinstance(questions, list) else 1
+        if cost > _batch_limit():
+            # Refused by the route with 400 before any work is done
+            cost = 1
+    try:
+        current_app.admission.admit(_client_address(), request.headers.get('X-API-Key'), cost=cost)
+    except Overloaded as e:
+        logger.warning(f"Rate limited {request.endpoint} request: {str(e)}")
+        return _overloaded(e)
+    return None
+
+@main.errorhandler(Overloaded)
+def overloaded(e):
+    logger.warning(f"Shedding {request.endpoint} request: {str(e)}")
+    return _overloaded(e)
+
+def _question_from(data):
+    """Accept both the current ('message') and legacy ('question') schemas"""
+    if 'message' in data:
+        return data['message']
+    return data.get('question')
+
 @main.route('/api/ask', methods=['POST'])
 def ask():
     try:
@@ -14,7 +70,7 @@ def ask():
         logger.debug(f"Request headers: {dict(request.headers)}")
         logger.debug(f"Request data: {request.get_data()}")
         
-        data = request.get_json()
+        data = request.get_json(silent=True)
         logger.debug(f"Parsed JSON data: {data}")
         
         if not data or not isinstance(data, dict):
@@ -23,13 +79,13 @@ def ask():
                 'message': 'Invalid request format'
             }), 400
 
-        if 'message' not in data:
+        if 'message' not in data and 'question' not in data:
             return jsonify({
                 'status': 'error',
                 'message': 'No message provided'
             }), 400
 
-        user_message = data['message']
+        user_message = _question_from(data)
         language = data.get('language', 'am')
         
         if not user_message or not isinstance(user_message, str):
@@ -39,98 +95,20 @@ def ask():
             }), 400
 
         logger.info(f"Processing question: {user_message}")
-
-        # Check if this is an institutional query
-        if is_institutional_query(user_message):
-            query_type = get_query_type(user_message)
-            info = get_amc_info(query_type, language)
-            return jsonify({
-                'status': 'success',
-                'context': [],
-                'source': 'AMC Info',
-                'message': info,
-                'is_institutional': True,
-                'total_results': 0
-            })
-
-        # Try to get articles from MongoDB if available
-        articles = []
-        if current_app.db:
-            try:
-                # Get both Amharic and English articles
-                articles = current_app.db.get_articles(query=user_message, limit=5)
-                logger.info(f"Found {len(articles)} articles in database")
-            except Exception as e:
-                logger.warning(f"Error retrieving articles from MongoDB: {str(e)}")
-                logger.debug(traceback.format_exc())
-
-        # If no articles found in DB or DB not available, try scraping
-        if not articles:
-            logger.info("Attempting to scrape new content...")
-            try:
-                # Get both Amharic and English articles
-                articles = get_amc_content(user_message, include_english=True)
-                if not articles:
-                    logger.warning("No articles found from scraping")
-                else:
-                    logger.info(f"Scraped {len(articles)} new articles")
-                    logger.debug(f"Scraped articles: {articles}")
-                
-                # Try to save to MongoDB if available
-                if current_app.db and articles:
-                    try:
-                        current_app.db.save_articles(articles)
-                        logger.info("Saved new articles to database")
-                    except Exception as e:
-                        logger.warning(f"Could not save articles to MongoDB: {str(e)}")
-                        logger.debug(traceback.format_exc())
-            except Exception as e:
-                logger.error(f"Error scraping content: {str(e)}")
-                logger.debug(traceback.format_exc())
-                # Don't return error here, continue with empty articles list
-
-        # Format response
-        context = []
-        if articles:
-            for article in articles:
-                if not isinstance(article, dict):
-                    logger.warning(f"Skipping invalid article format: {type(article)}")
-                    continue
-                
-                # Clean and validate the article data
-                title = str(article.get('title', '')).strip()
-                url = str(article.get('url', '')).strip()
-                date = str(article.get('date', '')).strip()
-                lang = str(article.get('language', 'am')).strip().lower()
-                
-                if not title or not url:
-                    logger.warning(f"Skipping article with missing title or URL")
-                    continue
-                
-                context.append({
-                    'title': title,
-                    'url': url,
-                    'date': date,
-                    'language': lang
-                })
-
-        # Sort articles by date (newest first) and group by language
-        context.sort(key=lambda x: x.get('date', ''), reverse=True)
-        
-        # Return a valid response even if no articles found
-        response = {
-            'status': 'success',
-            'context': context if context else [],
-            'source': 'AMC News',
-            'message': 'No relevant content found' if not context else 'Content retrieved successfully',
-            'is_institutional': False,
-            'total_results': len(context)
-        }
+        start = time.perf_counter()
+        trace = {}
+        response = current_app.engine.ask(user_message, language, trace=trace)
+        current_app.analytics.add(query_record(
+            user_message, language, 'ask', response,
+            (time.perf_counter() - start) * 1000, cache=trace.get('cache')
+        ))
 
         logger.info("Successfully processed request")
         logger.debug(f"Response: {response}")
         return jsonify(response)
 
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
         logger.debug(traceback.format_exc())
@@ -139,14 +117,135 @@ def ask():
             'message': str(e)
         }), 500
 
+@main.route('/api/ask/batch', methods=['POST'])
+def ask_batch():
+    """Answer many questions in one call, streamed back as NDJSON (one result per line)"""
+    try:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data, dict) or not isinstance(data.get('questions'), list):
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid request format'
+            }), 400
+
+        items = data['questions']
+        limit = _batch_limit()
+        if len(items) > limit:
+            return jsonify({
+                'status': 'error',
+                'message': f'At most {limit} questions per batch'
+            }), 400
+
+        default_language = data.get('language', 'am')
+        questions = []
+        invalid = []
+        for position, item in enumerate(items):
+            # Each item is a question string or an /api/ask request body
+            message = _question_from(item) if isinstance(item, dict) else item
+            language = item.get('language', default_language) if isinstance(item, dict) else default_language
+            if not message or not isinstance(message, str):
+                invalid.append(position)
+            else:
+                questions.append((position, message, language))
+    except Exception as e:
+        logger.error(f"Error processing batch request: {str(e)}")
+        logger.debug(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+    # The stream outlives the request context
+    app = current_app._get_current_object()
+    logger.info(f"Processing batch of {len(items)} questions")
+
+    def generate():
+        for position in invalid:
+            yield json.dumps({'index': position, 'status': 'error', 'message': 'Invalid message format'}) + '\n'
+        results = app.engine.ask_batch([(message, language) for _, message, language in questions])
+        try:
+            for batch_position, response, cache, latency_ms in results:
+                position, message, language = questions[batch_position]
+                app.analytics.add(query_record(message, language, 'ask_batch', response, latency_ms, cache=cache))
+                yield json.dumps(dict(response, index=position), ensure_ascii=False) + '\n'
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            logger.error(f"Error processing batch request: {str(e)}")
+            logger.debug(traceback.format_exc())
+            yield json.dumps({'status': 'error', 'message': str(e)}) + '\n'
+        finally:
+            # The server closes this stream when the client goes away; stop the batch with it
+            results.close()
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@main.route('/api/search', methods=['POST'])
+def search():
+    try:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data, dict):
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid request format'
+            }), 400
+
+        query = data.get('query')
+        language = data.get('language', 'am')
+        if not query or not isinstance(query, str):
+            return jsonify({
+                'status': 'error',
+                'message': 'No query provided'
+            }), 400
+
+        start = time.perf_counter()
+        response = current_app.engine.search(query, language)
+        current_app.analytics.add(query_record(
+            query, language, 'search', response, (time.perf_counter() - start) * 1000
+        ))
+        return jsonify(response)
+
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing search: {str(e)}")
+        logger.debug(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@main.route('/api/suggest', methods=['GET'])
+def suggest():
+    """Autocomplete for the chat input; cheap enough to call on every keystroke"""
+    try:
+        prefix = request.args.get('q', '')
+        language = request.args.get('language') or None
+        limit = min(max(request.args.get('limit', Config.SUGGEST_LIMIT, type=int), 1), 50)
+        return jsonify({
+            'status': 'success',
+            'query': prefix,
+            'suggestions': current_app.engine.suggest(prefix, language=language, limit=limit)
+        })
+    except Exception as e:
+        logger.error(f"Error processing suggestions: {str(e)}")
+        logger.debug(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
 @main.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     try:
         status = {
             'status': 'healthy',
-            'mongodb': 'connected' if current_app.db else 'not available',
+            'mongodb': current_app.db.status if current_app.db else 'not available',
             'scraper': 'initialized' if current_app.scraper else 'not initialized',
+            'articles_indexed': current_app.engine.indexed_count,
+            'analytics': current_app.analytics.stats,
+            'cache': current_app.engine.cache_stats,
+            'admission': dict(current_app.admission.stats, **current_app.engine.gate_stats),
             'version': '1.0.0'
         }
         return jsonify(status)
@@ -0,0 +1,159 @@
+"""
+Admission control: per-client rate limits and bounded queues for expensive work.
+
+Every API request first takes a token from its client's bucket (per API key
+for known keys, otherwise per client address); an empty bucket is answered
+with 429 and ``Retry-After``. Expensive work (crawling the site, calling the
+LLM) additionally needs a slot from a `ConcurrencyGate`: a few callers run,
+a bounded number wait, and the rest are turned away at once with
+`Overloaded` (503), so institutional answers and cache hits stay fast while
+the expensive paths are saturated. Limits are per process.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from config import Config
+
+
+class Overloaded(Exception):
+    """Raised when work is refused; `retry_after` is a hint in seconds"""
+
+    def __init__(self, message, retry_after, status=503):
+        super().__init__(message)
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+        self.status = status
+
+
+class RateLimiter:
+    """Token buckets keyed by client, refilled at `rate` per second up to `burst`"""
+
+    def __init__(self, rate, burst, max_clients=Config.ADMISSION_MAX_CLIENTS):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self.admitted = self.rejected = 0
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def acquire(self, key, cost=1):
+        """0 if `cost` tokens were taken, otherwise the seconds until they will be available
+
+        A cost above `burst` can never be paid; it is rejected with an infinite wait.
+        """
+        if not self.enabled:
+            return 0
+        if cost > self.burst:
+            with self._lock:
+                self.rejected += 1
+            return math.inf
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0
+                self.admitted += 1
+            else:
+                wait = (cost - tokens) / self.rate
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            # Idle clients are the least recently used; a full bucket loses nothing
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    @property
+    def stats(self):
+        return {'clients': len(self._buckets), 'admitted': self.admitted, 'rejected': self.rejected}
+
+
+class ConcurrencyGate:
+    """At most `limit` concurrent holders; up to `queue_size` more wait up to `timeout` seconds"""
+
+    def __init__(self, name, limit, queue_size, timeout=Config.ADMISSION_QUEUE_TIMEOUT,
+                 retry_after=Config.ADMISSION_RETRY_AFTER):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.active = self.waiting = 0
+        self.admitted = self.rejected = self.timed_out = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Take a slot, waiting if there is room in the queue; raises Overloaded otherwise"""
+        with self._cond:
+            if self.active >= self.limit:
+                if self.waiting >= self.queue_size:
+                    self.rejected += 1
+                    raise Overloaded(f"Too many {self.name} requests in progress", self.retry_after)
+                self.waiting += 1
+                try:
+                    acquired = self._cond.wait_for(lambda: self.active < self.limit, self.timeout)
+                finally:
+                    self.waiting -= 1
+                if not acquired:
+                    self.timed_out += 1
+                    raise Overloaded(f"Timed out waiting for {self.name} capacity", self.retry_after)
+            self.active += 1
+            self.admitted += 1
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @property
+    def stats(self):
+        return {'limit': self.limit, 'active': self.active, 'waiting': self.waiting,
+                'admitted': self.admitted, 'rejected': self.rejected, 'timed_out': self.timed_out}
+
+
+class Admission:
+    """Per-client rate limits; known API keys get their own, higher limits"""
+
+    def __init__(self, api_keys=Config.ADMISSION_API_KEYS):
+        self.api_keys = {key.strip() for key in api_keys.split(',') if key.strip()}
+        self.clients = RateLimiter(Config.ADMISSION_RATE, Config.ADMISSION_BURST)
+        self.keys = RateLimiter(Config.ADMISSION_API_KEY_RATE, Config.ADMISSION_API_KEY_BURST)
+
+    def _limiter(self, api_key):
+        return self.keys if api_key in self.api_keys else self.clients
+
+    def max_cost(self, api_key=None):
+        """The largest cost one request can ever be admitted with, or None without a limit"""
+        limiter = self._limiter(api_key)
+        return limiter.burst if limiter.enabled else None
+
+    def admit(self, address, api_key=None, cost=1):
+        """Raise Overloaded (429) if the client is over its rate limit"""
+        limiter = self._limiter(api_key)
+        key = api_key if limiter is self.keys else address
+        wait = limiter.acquire(key, cost)
+        if wait == math.inf:
+            # Waiting will not help: the request must be split
+            raise Overloaded(f"Request costs {cost} tokens, more than the limit of {limiter.burst}",
+                             limiter.burst / limiter.rate, status=429)
+        if wait:
+            raise Overloaded("Too many requests", wait, status=429)
+
+    @property
+    def stats(self):
+        return {'clients': self.clients.stats, 'api_keys': self.keys.stats}
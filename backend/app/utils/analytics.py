@@ -0,0 +1,351 @@
+"""
+Write-behind persistence for chat history and query analytics.
+
+Records are appended to a bounded in-memory buffer and written by a
+background thread with one ``insert_many`` per batch, when the batch is full
+or the flush interval passes. While MongoDB is down batches are spilled to a
+local JSON-lines file, one per process so workers never append to a file
+another one is replaying, and replayed once it is back. Replays are retried
+with exponential backoff, and a retry only reads one batch until a write
+succeeds. Spill files left by exited workers are replayed by the survivors.
+Records are only dropped when both the buffer and the spill file are full.
+Whatever is buffered is flushed at exit.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from itertools import islice
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'$date': value.isoformat()}
+    return str(value)
+
+
+def _decode(obj):
+    if len(obj) == 1 and '$date' in obj:
+        return datetime.fromisoformat(obj['$date'])
+    return obj
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to another user
+        return True
+    return True
+
+
+class WriteBehindBuffer:
+    """Buffer records and hand them to `write(records)` in batches, off the request path
+
+    `write` must raise when the records could not be stored.
+    """
+
+    # Longest wait between replay attempts while the database is down, seconds
+    MAX_RETRY_INTERVAL = 300
+
+    def __init__(self, write, name, batch_size=Config.ANALYTICS_BATCH_SIZE,
+                 flush_interval=Config.ANALYTICS_FLUSH_INTERVAL, max_size=Config.ANALYTICS_MAX_BUFFER,
+                 spill_dir=Config.ANALYTICS_SPILL_DIR, max_spill_bytes=Config.ANALYTICS_MAX_SPILL_BYTES):
+        self.write = write
+        self.name = name
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_size = max(self.batch_size, max_size)
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes  # per process
+        self.enqueued = self.written = self.spilled = self.dropped = self.failed_batches = 0
+        self._records = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = None
+        self._pid = None
+        self._retry_at = 0.0
+        self._retry_interval = 0.0
+        atexit.register(self.close)
+
+    def add(self, record):
+        """Queue one record; never blocks on the database"""
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._records) >= self.max_size:
+                # Bounded: drop the oldest rather than grow without limit
+                self._records.popleft()
+                self.dropped += 1
+            self._records.append(record)
+            self.enqueued += 1
+            self._ensure_thread()
+            if len(self._records) >= self.batch_size:
+                self._cond.notify()
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def spill_path(self):
+        """This process's spill file"""
+        if not self.spill_dir:
+            return None
+        return os.path.join(self.spill_dir, f"{self.name}.{os.getpid()}.jsonl")
+
+    @property
+    def stats(self):
+        return {
+            'buffered': len(self._records),
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'spilled': self.spilled,
+            'dropped': self.dropped,
+            'failed_batches': self.failed_batches,
+        }
+
+    def _ensure_thread(self):
+        # Started lazily and restarted in forked workers, which inherit the
+        # buffer but not its thread
+        if self._pid != os.getpid():
+            # The parent's flush lock may have been held at fork time
+            self._pid = os.getpid()
+            self._flush_lock = threading.Lock()
+            self._thread = None
+            self._retry_at = 0.0
+            self._retry_interval = 0.0
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f'write-behind-{self.name}', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._records) < self.batch_size and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
+
+    def _take(self):
+        with self._cond:
+            count = min(self.batch_size, len(self._records))
+            return [self._records.popleft() for _ in range(count)]
+
+    def flush(self):
+        """Write everything currently buffered (and any spilled records)"""
+        with self._flush_lock:
+            if time.monotonic() < self._retry_at or not self._replay_spill():
+                # Still down: keep new records in order behind the spilled ones
+                self._spill_buffered()
+                return
+            batch = self._take()
+            while batch:
+                if not self._write(batch):
+                    # Spill the rest too rather than retrying a database that is down
+                    self._spill(batch)
+                    self._spill_buffered()
+                    self._back_off()
+                    return
+                batch = self._take()
+            self._retry_interval = 0.0
+
+    def _back_off(self):
+        self._retry_interval = min(max(2 * self._retry_interval, self.flush_interval, 1.0), self.MAX_RETRY_INTERVAL)
+        self._retry_at = time.monotonic() + self._retry_interval
+
+    def _write(self, batch):
+        try:
+            self.write(batch)
+            self.written += len(batch)
+            return True
+        except Exception as e:
+            self.failed_batches += 1
+            logger.warning(f"Could not write {len(batch)} {self.name} records: {str(e)}")
+            return False
+
+    def _spill_buffered(self):
+        batch = self._take()
+        while batch:
+            self._spill(batch)
+            batch = self._take()
+
+    def _spill(self, batch):
+        if self._append_spill(batch):
+            self.spilled += len(batch)
+        else:
+            self.dropped += len(batch)
+
+    def _append_spill(self, records):
+        """Append records to the spill file; False if there is no room for them"""
+        if not self.spill_path:
+            return False
+        try:
+            if os.path.exists(self.spill_path) and os.path.getsize(self.spill_path) >= self.max_spill_bytes:
+                return False
+            os.makedirs(self.spill_dir, exist_ok=True)
+            lines = ''.join(json.dumps(record, default=_encode, ensure_ascii=False) + '\n' for record in records)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            return True
+        except Exception as e:
+            logger.error(f"Error spilling {self.name} records: {str(e)}")
+            return False
+
+    def _append_lines(self, lines):
+        """Move already encoded records from a claimed spill file into this process's own
+
+        Records that do not fit under `max_spill_bytes` are dropped, like new ones.
+        """
+        try:
+            size = os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+            kept = []
+            for line in lines:
+                size += len(line.encode('utf-8'))
+                if size > self.max_spill_bytes:
+                    break
+                kept.append(line)
+            if len(kept) < len(lines):
+                self.dropped += len(lines) - len(kept)
+                logger.warning(f"Spill file full, dropping {len(lines) - len(kept)} {self.name} records")
+            if kept:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    f.writelines(kept)
+        except Exception as e:
+            self.dropped += len(lines)
+            logger.error(f"Error spilling {self.name} records: {str(e)}")
+
+    def _claim(self, path):
+        """Rename another process's spill file to a claim of this one; None if it lost the race"""
+        target = f"{path.split('.claimed.', 1)[0]}.claimed.{os.getpid()}"
+        try:
+            # Whichever survivor renames the file first replays it
+            os.rename(path, target)
+        except OSError:
+            return None
+        return target
+
+    def _orphaned_spills(self):
+        """Spill files of processes that have exited (and this one's earlier claims)"""
+        pid = os.getpid()
+        claimed = []
+        legacy = os.path.join(self.spill_dir, f"{self.name}.jsonl")
+        for path in [legacy] + glob.glob(os.path.join(self.spill_dir, f"{self.name}.*.jsonl")):
+            owner = os.path.basename(path)[len(self.name) + 1:-len('.jsonl')]
+            if path != legacy and (not owner.isdigit() or int(owner) == pid or _process_alive(int(owner))):
+                continue
+            if os.path.exists(path):
+                claimed.append(self._claim(path))
+        for path in glob.glob(os.path.join(self.spill_dir, f"{self.name}.*.jsonl.claimed.*")):
+            owner = path.rsplit('.', 1)[1]
+            if owner == str(pid):
+                claimed.append(path)
+            elif owner.isdigit() and not _process_alive(int(owner)):
+                # Claimed by a process that exited mid-replay
+                claimed.append(self._claim(path))
+        return [path for path in claimed if path]
+
+    def _replay_spill(self):
+        """Write spilled records back; False if the database is still unavailable"""
+        if not self.spill_dir:
+            return True
+        own = self.spill_path
+        paths = ([own] if os.path.exists(own) else []) + self._orphaned_spills()
+        for path in paths:
+            if not self._replay_file(path, own):
+                self._back_off()
+                return False
+        return True
+
+    def _replay_file(self, path, own):
+        """Write the records of one spill file back; False if a write failed
+
+        Records are read one batch at a time, so while the database is down
+        a retry costs one batch rather than the whole file. Whatever could
+        not be written ends up in this process's own spill file.
+        """
+        replayed = 0
+        rest = []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                while True:
+                    lines = list(islice(f, self.batch_size))
+                    if not lines:
+                        break
+                    records = []
+                    for line in lines:
+                        try:
+                            if line.strip():
+                                records.append(json.loads(line, object_hook=_decode))
+                        except ValueError:
+                            logger.warning(f"Skipping a corrupt spilled {self.name} record")
+                    if records and not self._write(records):
+                        if not replayed and path == own:
+                            # Nothing written; leave the file as it is
+                            return False
+                        rest = lines + f.readlines()
+                        break
+                    replayed += len(records)
+        except Exception as e:
+            # Kept for the next attempt
+            logger.error(f"Error reading spilled {self.name} records: {str(e)}")
+            return False
+
+        if path == own:
+            tmp_path = f"{own}.tmp"
+            if rest:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.writelines(rest)
+                os.replace(tmp_path, own)
+            else:
+                os.remove(own)
+        else:
+            if rest:
+                self._append_lines(rest)
+            os.remove(path)
+        if replayed:
+            logger.info(f"Replayed {replayed} spilled {self.name} records")
+        return not rest
+
+    def close(self, timeout=5.0):
+        """Stop the flusher and write (or spill) whatever is still buffered"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout)
+        self.flush()
+
+
+def query_record(question, language, endpoint, response, latency_ms, cache=None):
+    """Analytics record for one answered request"""
+    return {
+        'question': question,
+        'normalized_question': ' '.join(question.lower().split()),
+        'language': language,
+        'endpoint': endpoint,
+        'status': response.get('status'),
+        'source': response.get('source'),
+        'answer': response.get('answer'),
+        'answered': bool(response.get('answer')),
+        'total_results': response.get('total_results', len(response.get('results', []))),
+        'latency_ms': round(latency_ms, 2),
+        'cache': cache,
+        'timestamp': datetime.utcnow(),
+    }
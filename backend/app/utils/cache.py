@@ -0,0 +1,328 @@
+"""
+Two-tier cache: an in-process LRU (L1) in front of a shared Redis (L2).
+
+L1 is bounded by entry count and payload bytes. L2 is any client with the
+redis-py interface (``get``/``set``/``incr``/``publish``/``pubsub``), shared by
+every process and node, so one node's crawl or LLM answer warms all of them.
+Keys are versioned: publishing new content bumps the shared version and
+broadcasts it on a pub/sub channel, and every subscriber drops its L1 entries.
+Without ``REDIS_URL`` the cache is L1-only, and `lock` falls back to a file
+lock so the processes of one host still take turns.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client():
+    """The process-wide Redis client for REDIS_URL, or None if none is configured"""
+    global _shared_client
+    if not Config.REDIS_URL:
+        return None
+    with _shared_client_lock:
+        if _shared_client is None:
+            try:
+                import redis
+
+                _shared_client = redis.Redis.from_url(Config.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+            except Exception as e:
+                logger.error(f"Shared cache unavailable, using the in-process cache only: {str(e)}")
+                _shared_client = False
+        return _shared_client or None
+
+
+def _read_timeouts():
+    """Exception types for a socket read that timed out"""
+    try:
+        from redis.exceptions import TimeoutError as RedisTimeoutError
+    except ImportError:
+        return (TimeoutError,)
+    return (TimeoutError, RedisTimeoutError)
+
+
+def _dumps(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'), 1)
+
+
+def _loads(payload):
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by entry count and total payload size, with per-entry expiry"""
+
+    def __init__(self, max_items=Config.CACHE_L1_MAX_ITEMS, max_bytes=Config.CACHE_L1_MAX_BYTES):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, value, ttl, size=1):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self.bytes += size
+            while len(self._entries) > self.max_items or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    @property
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'items': len(self._entries), 'bytes': self.bytes}
+
+
+class TwoTierCache:
+    """L1 LRU + optional shared L2 under one namespace, with a shared content version"""
+
+    # After an L2 error, skip L2 for this long instead of timing out on every call
+    RETRY_INTERVAL = 30
+    # Seconds the invalidation listener waits for a message per poll; kept under
+    # the client's socket timeout so a quiet channel is not a failed read
+    LISTEN_TIMEOUT = 0.5
+
+    def __init__(self, namespace, ttl, client=None, max_items=Config.CACHE_L1_MAX_ITEMS,
+                 max_bytes=Config.CACHE_L1_MAX_BYTES, encode=None, decode=None, lock_dir=None):
+        self.namespace = f"{Config.CACHE_NAMESPACE}:{namespace}"
+        self.ttl = ttl
+        self.client = client
+        # Where `lock` keeps its lock files when there is no L2
+        self.lock_dir = lock_dir
+        # Convert values to and from their JSON form for L2; L1 keeps them as given
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self.l1 = LRUCache(max_items=max_items, max_bytes=max_bytes)
+        self.l2_hits = self.l2_misses = self.l2_errors = 0
+        self._local_version = 0
+        self._down_until = 0.0
+        self._listeners = []
+        self._subscriber = None
+        self._subscriber_pid = None
+        self._lock = threading.Lock()
+        self._file_locks = {}  # lock name -> open, flock'ed file
+
+    @property
+    def channel(self):
+        return f"{self.namespace}:invalidate"
+
+    # shared state ----------------------------------------------------------
+
+    def _l2(self, operation, *args, **kwargs):
+        """Run a client call; None (counted as an error) if L2 is missing or failing"""
+        if self.client is None or time.monotonic() < self._down_until:
+            return None
+        try:
+            return getattr(self.client, operation)(*args, **kwargs)
+        except Exception as e:
+            self.l2_errors += 1
+            self._down_until = time.monotonic() + self.RETRY_INTERVAL
+            logger.warning(f"Shared cache {operation} failed: {str(e)}")
+            return None
+
+    def version(self):
+        """Current content version, shared across nodes when L2 is configured"""
+        value = self._l2('get', f"{self.namespace}:version")
+        if value is not None:
+            return int(value)
+        return self._local_version
+
+    def publish(self, key, value):
+        """Store `value` as the next content version, then tell every node to switch to it
+
+        The value is written before the version is bumped, so subscribers that
+        react to the announcement always find it. Callers should hold `lock`.
+        """
+        version = self.version() + 1
+        self.set(key, value, version=version)
+        shared = self._l2('incr', f"{self.namespace}:version")
+        if shared is None:
+            self._local_version = version
+        else:
+            version = int(shared)
+            self._l2('publish', self.channel, str(version))
+        return version
+
+    def lock(self, name, ttl, wait=0):
+        """Best-effort lock, cluster-wide with L2 (SET NX EX), else per host (flock)
+
+        Retries for up to `wait` seconds. Granted when neither is available,
+        so an outage never stops every process from doing the work.
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            if self.client is not None:
+                acquired = self._l2('set', f"{self.namespace}:lock:{name}", os.getpid(), nx=True, ex=ttl)
+                if acquired:
+                    return True
+                # Not acquired while L2 answers: another process holds it
+                acquired = None if time.monotonic() < self._down_until else False
+            if self.client is None or acquired is None:
+                acquired = self._lock_file(name)
+            if acquired or time.monotonic() >= deadline:
+                return acquired
+            time.sleep(min(0.5, max(deadline - time.monotonic(), 0)))
+
+    def _lock_file(self, name):
+        if not self.lock_dir:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        path = os.path.join(self.lock_dir, f"{self.namespace.replace(':', '.')}.{name}.lock")
+        try:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            f = open(path, 'a')
+        except OSError as e:
+            logger.warning(f"Could not open lock file {path}: {str(e)}")
+            return True
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file_locks[name] = f
+        return True
+
+    def unlock(self, name):
+        f = self._file_locks.pop(name, None)
+        if f is not None:
+            # Closing the file releases the flock
+            f.close()
+        else:
+            self._l2('delete', f"{self.namespace}:lock:{name}")
+
+    # entries -----------------------------------------------------------------
+
+    def _key(self, key, version):
+        return f"{self.namespace}:v{version}:{key}"
+
+    def lookup(self, key, version=0):
+        """(value, tier) where tier is 'l1', 'l2' or None on a miss"""
+        full_key = self._key(key, version)
+        value = self.l1.get(full_key, default=self)
+        if value is not self:
+            return value, 'l1'
+        if self.client is None:
+            return None, None
+        payload = self._l2('get', full_key)
+        if payload is None:
+            self.l2_misses += 1
+            return None, None
+        self.l2_hits += 1
+        value = self.decode(_loads(payload))
+        self.l1.set(full_key, value, self.ttl, size=len(payload))
+        return value, 'l2'
+
+    def get(self, key, version=0, default=None):
+        value, tier = self.lookup(key, version)
+        return default if tier is None else value
+
+    def set(self, key, value, version=0, ttl=None):
+        ttl = ttl or self.ttl
+        full_key = self._key(key, version)
+        payload = _dumps(self.encode(value))
+        self.l1.set(full_key, value, ttl, size=len(payload))
+        self._l2('set', full_key, payload, ex=max(int(ttl), 1))
+
+    # invalidation ------------------------------------------------------------
+
+    def subscribe(self, callback):
+        """Call `callback(version)` whenever any node publishes a new version
+
+        The listener thread starts on the first `ensure_subscribed` call in each
+        process, so a preloading master never hands a dead thread to its workers.
+        """
+        self._listeners.append(callback)
+
+    def ensure_subscribed(self):
+        if self.client is None or not self._listeners:
+            return
+        if self._subscriber_pid == os.getpid() and self._subscriber is not None and self._subscriber.is_alive():
+            return
+        with self._lock:
+            if self._subscriber_pid == os.getpid() and self._subscriber is not None and self._subscriber.is_alive():
+                return
+            self._subscriber_pid = os.getpid()
+            self._subscriber = threading.Thread(target=self._listen, name=f'cache-{self.namespace}', daemon=True)
+            self._subscriber.start()
+
+    def _listen(self):
+        timeouts = _read_timeouts()
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                while True:
+                    try:
+                        message = pubsub.get_message(timeout=self.LISTEN_TIMEOUT)
+                    except timeouts:
+                        # Nothing was published; the next poll reconnects and resubscribes
+                        continue
+                    if message is None or message.get('type') != 'message':
+                        continue
+                    version = int(message['data'])
+                    self.l1.clear()
+                    for callback in self._listeners:
+                        try:
+                            callback(version)
+                        except Exception as e:
+                            logger.error(f"Cache invalidation handler failed: {str(e)}")
+            except Exception as e:
+                logger.warning(f"Cache invalidation channel lost, resubscribing: {str(e)}")
+                time.sleep(self.RETRY_INTERVAL)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    @property
+    def stats(self):
+        return {
+            'l1': self.l1.stats,
+            'l2': {'enabled': self.client is not None, 'hits': self.l2_hits,
+                   'misses': self.l2_misses, 'errors': self.l2_errors},
+        }
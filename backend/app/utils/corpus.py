@@ -0,0 +1,153 @@
+"""
+Compact in-memory and on-disk representation of the article corpus.
+
+Articles are held as ``__slots__`` records rather than dicts: bodies are kept
+zlib-compressed and only inflated when something reads ``content``, and the
+highly repetitive category, language and date strings are interned so every
+record shares one copy. The snippet, summary and language tag computed at
+ingest (see `ingest.py`) are stored on the record, so queries never re-derive
+them; summaries are compressed like bodies. Records are
+read-only mappings, so code written against the scraped dicts keeps working.
+
+The scraper cache is written as gzip-compressed JSON; plain JSON caches from
+older versions are still read.
+"""
+import gzip
+import json
+import os
+import sys
+import zlib
+from collections.abc import Mapping
+
+from .ingest import DERIVED_FIELDS, ingest
+
+# Level 6 is zlib's default; bodies are compressed once per crawl
+COMPRESSION_LEVEL = 6
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def _intern(value):
+    return sys.intern(str(value).strip())
+
+
+def _compress(text):
+    return zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL) if text else b''
+
+
+def _decompress(data):
+    return zlib.decompress(data).decode('utf-8') if data else ''
+
+
+class Article(Mapping):
+    """One article; behaves like the scraped dict it was built from"""
+
+    __slots__ = ('title', 'url', 'date', 'category', 'language', 'published_ts', 'simhash',
+                 '_body', '_snippet', '_summary')
+
+    FIELDS = ('title', 'content', 'date', 'published_ts', 'url', 'category', 'language', 'snippet', 'summary')
+
+    def __init__(self, title, url, content='', date='', category='', language='am', published_ts=None,
+                 snippet='', summary=''):
+        self.title = title
+        self.url = url
+        self.date = _intern(date)
+        self.category = _intern(category)
+        self.language = _intern(language)
+        self.published_ts = published_ts
+        # Near-duplicate fingerprints, computed when the article is first indexed
+        self.simhash = None
+        self._body = _compress(content)
+        # Short bodies are their own snippet and summary; None stands for the body
+        flat = ' '.join(content.split())
+        self._snippet = None if snippet == flat else snippet
+        self._summary = None if summary == flat else _compress(summary)
+
+    @classmethod
+    def from_dict(cls, item, language=None):
+        """Build a record from a scraped or stored article dict (or return it if it is one)"""
+        if isinstance(item, cls):
+            return item
+        if not all(field in item for field in DERIVED_FIELDS):
+            # Stored before ingest computed these fields
+            item = ingest(item)
+        published = item.get('published_ts')
+        return cls(
+            title=str(item.get('title', '')).strip(),
+            url=str(item.get('url', '')).strip(),
+            content=str(item.get('content', '') or ''),
+            date=item.get('date', ''),
+            category=item.get('category', ''),
+            language=language or item.get('language') or 'am',
+            published_ts=float(published) if isinstance(published, (int, float)) else None,
+            snippet=str(item.get('snippet', '') or ''),
+            summary=str(item.get('summary', '') or ''),
+        )
+
+    @property
+    def content(self):
+        """The article body, decompressed on access"""
+        return _decompress(self._body)
+
+    @property
+    def snippet(self):
+        """Opening sentences of the body, for search results"""
+        return ' '.join(self.content.split()) if self._snippet is None else self._snippet
+
+    @property
+    def summary(self):
+        """Extractive summary of the body, decompressed on access"""
+        return ' '.join(self.content.split()) if self._summary is None else _decompress(self._summary)
+
+    @property
+    def compressed_size(self):
+        return len(self._body)
+
+    # Mapping interface ------------------------------------------------------
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __repr__(self):
+        return f"Article({self.url!r})"
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            object.__setattr__(self, slot, value)
+
+
+def compact(items):
+    """Article records for a list of article dicts, skipping malformed entries"""
+    return [Article.from_dict(item) for item in items if isinstance(item, Mapping)]
+
+
+def read_corpus_file(path):
+    """Parse a scraper cache file, gzip-compressed or legacy plain JSON"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if raw[:2] == _GZIP_MAGIC:
+        raw = gzip.decompress(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def write_corpus_file(path, payload):
+    """Write a scraper cache file atomically, gzip-compressed when `path` ends in .gz"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    if path.endswith('.gz'):
+        data = gzip.compress(data, compresslevel=COMPRESSION_LEVEL)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,203 @@
+"""
+Publication date normalization and recency intent detection.
+
+Scraped dates come in several shapes: English ("May 27, 2025"), ISO 8601,
+Ethiopian-calendar Amharic ("ግንቦት 19/2017 ዓ.ም") and relative phrases
+("2 hours ago", "ከ3 ቀን በፊት"). `parse_date` turns all of them into UTC epoch
+seconds at ingest so articles can be ordered and range-scanned by time.
+"""
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+# ameco.et publishes in East Africa Time; dates without a time are local midnight
+EAT = timezone(timedelta(hours=3))
+
+# Julian day number of 1 Meskerem 1 E.C. (Amete Mihret era) and of 1 Jan 1 A.D. ordinal 0
+ETHIOPIAN_EPOCH_JDN = 1724221
+_ORDINAL_JDN_OFFSET = 1721425
+
+ETHIOPIAN_MONTHS = {
+    'መስከረም': 1, 'ጥቅምት': 2, 'ኅዳር': 3, 'ህዳር': 3, 'ታኅሣሥ': 4, 'ታህሳስ': 4, 'ታኅሳስ': 4,
+    'ጥር': 5, 'የካቲት': 6, 'መጋቢት': 7, 'ሚያዝያ': 8, 'ሚያዚያ': 8, 'ግንቦት': 9, 'ሰኔ': 10,
+    'ሐምሌ': 11, 'ሀምሌ': 11, 'ነሐሴ': 12, 'ነሀሴ': 12, 'ጳጉሜ': 13, 'ጳጉሜን': 13,
+}
+ENGLISH_MONTHS = {
+    name: number
+    for number, names in enumerate((
+        ('january', 'jan'), ('february', 'feb'), ('march', 'mar'), ('april', 'apr'), ('may',),
+        ('june', 'jun'), ('july', 'jul'), ('august', 'aug'), ('september', 'sep', 'sept'),
+        ('october', 'oct'), ('november', 'nov'), ('december', 'dec'),
+    ), start=1)
+    for name in names
+}
+
+RELATIVE_UNITS = {
+    'second': 1, 'sec': 1, 'minute': 60, 'min': 60, 'hour': 3600, 'hr': 3600, 'day': 86400,
+    'week': 7 * 86400, 'month': 30 * 86400, 'year': 365 * 86400,
+    'ሰከንድ': 1, 'ደቂቃ': 60, 'ሰዓት': 3600, 'ሰአት': 3600, 'ቀን': 86400, 'ሳምንት': 7 * 86400,
+    'ወር': 30 * 86400, 'ዓመት': 365 * 86400, 'አመት': 365 * 86400,
+}
+
+_ETHIOPIAN_MARKER = re.compile(r'ዓ\.?\s*ም|ዓም')
+_ETHIOPIAN_DATE = re.compile(
+    r'(' + '|'.join(sorted(ETHIOPIAN_MONTHS, key=len, reverse=True)) + r')\s*(\d{1,2})\s*(?:ቀን)?\s*[/,.\s]\s*(\d{4})')
+_ENGLISH_DATE = re.compile(r'([a-z]{3,9})\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})')
+_ENGLISH_DATE_DAY_FIRST = re.compile(r'(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]{3,9})\.?,?\s+(\d{4})')
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}(?:[t ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:z|[+-]\d{2}:?\d{2})?)?')
+_NUMERIC_DATE = re.compile(r'(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})')
+_RELATIVE_EN = re.compile(r'(\d+|an?|one)\s*(' + '|'.join(k for k in RELATIVE_UNITS if k.isascii()) + r')s?\s+ago')
+_RELATIVE_AM = re.compile(r'ከ?\s*(\d+)?\s*(' + '|'.join(k for k in RELATIVE_UNITS if not k.isascii()) + r')\S*\s*በፊት')
+
+
+def ethiopian_to_gregorian(year: int, month: int, day: int) -> date:
+    """Convert an Ethiopian-calendar date to the Gregorian calendar"""
+    # Pagume has a 6th day in the year before a Gregorian leap year
+    if not (1 <= month <= 13 and 1 <= day <= 30) or (month == 13 and day > (6 if year % 4 == 3 else 5)):
+        raise ValueError(f"invalid Ethiopian date {year}-{month}-{day}")
+    jdn = ETHIOPIAN_EPOCH_JDN + 365 * (year - 1) + year // 4 + 30 * (month - 1) + day - 1
+    return date.fromordinal(jdn - _ORDINAL_JDN_OFFSET)
+
+
+def _local_midnight(day: date) -> float:
+    return datetime(day.year, day.month, day.day, tzinfo=EAT).timestamp()
+
+
+def start_of_day(ts: float) -> float:
+    """Epoch seconds of local (EAT) midnight on the day containing `ts`"""
+    return _local_midnight(datetime.fromtimestamp(ts, EAT).date())
+
+
+def parse_date(text: str, now: Optional[float] = None, relative: bool = True) -> Optional[float]:
+    """UTC epoch seconds for a scraped date string, or None if it cannot be parsed
+
+    Relative phrases are resolved against `now` (default: the current time),
+    so they must be parsed at crawl time; pass ``relative=False`` when the
+    crawl time is unknown.
+    """
+    if not text:
+        return None
+    now = time.time() if now is None else now
+    value = ' '.join(str(text).split()).lower()
+
+    match = _ISO_DATE.search(value)
+    if match:
+        try:
+            parsed = datetime.fromisoformat(match.group(0).upper().replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=EAT)
+            return parsed.timestamp()
+        except ValueError:
+            pass
+
+    try:
+        match = _ETHIOPIAN_DATE.search(value)
+        if match:
+            month, day, year = ETHIOPIAN_MONTHS[match.group(1)], int(match.group(2)), int(match.group(3))
+            return _local_midnight(ethiopian_to_gregorian(year, month, day))
+
+        match = _ENGLISH_DATE.search(value)
+        if match and match.group(1) in ENGLISH_MONTHS:
+            return _local_midnight(date(int(match.group(3)), ENGLISH_MONTHS[match.group(1)], int(match.group(2))))
+
+        match = _ENGLISH_DATE_DAY_FIRST.search(value)
+        if match and match.group(2) in ENGLISH_MONTHS:
+            return _local_midnight(date(int(match.group(3)), ENGLISH_MONTHS[match.group(2)], int(match.group(1))))
+
+        match = _NUMERIC_DATE.search(value)
+        if match:
+            day, month, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+            if _ETHIOPIAN_MARKER.search(value):
+                return _local_midnight(ethiopian_to_gregorian(year, month, day))
+            return _local_midnight(date(year, month, day))
+    except ValueError:
+        return None
+
+    if not relative:
+        return None
+    if value in ('just now', 'now', 'አሁን'):
+        return now
+    if 'today' in value or 'ዛሬ' in value:
+        return start_of_day(now)
+    if 'yesterday' in value or 'ትናንት' in value or 'ትላንት' in value:
+        return start_of_day(now) - 86400
+
+    match = _RELATIVE_EN.search(value)
+    if match:
+        amount = int(match.group(1)) if match.group(1).isdigit() else 1
+        return now - amount * RELATIVE_UNITS[match.group(2)]
+    match = _RELATIVE_AM.search(value)
+    if match:
+        amount = int(match.group(1)) if match.group(1) else 1
+        return now - amount * RELATIVE_UNITS[match.group(2)]
+    return None
+
+
+# Recency intent -----------------------------------------------------------
+
+TODAY_TERMS = {'today', "today's", 'tonight', 'ዛሬ', 'የዛሬ', 'ዛሬው', 'የዛሬው', 'በዛሬው'}
+YESTERDAY_TERMS = {'yesterday', "yesterday's", 'ትናንት', 'ትላንት', 'ትናንትና', 'የትናንት', 'የትላንት', 'የትናንትና'}
+# "week"/"month" alone also name programmes and plans ("AMC weekly program"),
+# so they need a deictic word before them or a news cue in the question;
+# the Amharic definite forms ("ሳምንቱ", the week) are deictic themselves.
+WEEK_TERMS = {'week', "week's", 'ሳምንት', 'የሳምንት'}
+THIS_WEEK_TERMS = {'ሳምንቱ', 'በሳምንቱ', 'የሳምንቱ'}
+MONTH_TERMS = {'month', "month's", 'ወር', 'የወር'}
+THIS_MONTH_TERMS = {'ወሩ', 'በወሩ', 'የወሩ'}
+DEICTIC_TERMS = {'this', 'past', 'last', 'በዚህ', 'የዚህ', 'ባለፈው', 'ያለፈው'}
+# "current president" is not a news question; these need a news cue
+LATEST_TERMS = {'latest', 'recent', 'recently', 'newest', 'current', 'ወቅታዊ', 'የቅርብ', 'አዳዲስ', 'ሰሞኑን', 'የሰሞኑ'}
+NEWS_TERMS = {'news', 'headline', 'headlines', 'update', 'updates', 'story', 'stories', 'report', 'reports',
+              'event', 'events', 'happening', 'happened', 'መረጃ', 'መረጃዎች', 'ክስተት', 'ክስተቶች'}
+# Amharic news words take prefixes and suffixes (የዜና, ዜናዎችን)
+NEWS_STEM = 'ዜና'
+# Only dropped from the query when one of the terms above is present
+FILLER_TERMS = DEICTIC_TERMS | {'in', 'the', 'of', 'ጊዜ'}
+
+
+def _is_news_cue(token: str) -> bool:
+    return token in NEWS_TERMS or NEWS_STEM in token
+
+
+def recency_intent(query: str, now: Optional[float] = None) -> Optional[Tuple[Optional[float], Optional[float], str]]:
+    """Detect a time-bounded question
+
+    Returns None for ordinary queries, otherwise ``(start, end, remaining_query)``
+    where start/end are epoch seconds (both None for "latest ..." questions that
+    only prefer recent articles) and `remaining_query` has the temporal words and
+    news cues removed, since nearly every article is news.
+    "Today" and "yesterday" are enough on their own; "week", "month" and
+    "latest"-like words only count with an explicit time or news cue.
+    """
+    tokens = query.lower().split()
+    stripped = [token.strip('?!.,:;።፣፤፧"\'“”') for token in tokens]
+    now = time.time() if now is None else now
+    today = start_of_day(now)
+    news = any(_is_news_cue(token) for token in stripped)
+
+    window = None
+    temporal = set()
+    for position, token in enumerate(stripped):
+        deictic = position > 0 and stripped[position - 1] in DEICTIC_TERMS
+        if token in TODAY_TERMS:
+            window = (today, None)
+        elif token in YESTERDAY_TERMS:
+            window = window or (today - 86400, today)
+        elif token in THIS_WEEK_TERMS or (token in WEEK_TERMS and (deictic or news)):
+            window = window or (today - 6 * 86400, None)
+        elif token in THIS_MONTH_TERMS or (token in MONTH_TERMS and (deictic or news)):
+            window = window or (today - 29 * 86400, None)
+        elif token in LATEST_TERMS and news:
+            window = window or (None, None)
+        else:
+            continue
+        temporal.add(position)
+
+    if window is None:
+        return None
+    remaining = [
+        token for position, (token, bare) in enumerate(zip(tokens, stripped))
+        if position not in temporal and bare not in FILLER_TERMS and not _is_news_cue(bare)
+    ]
+    return window[0], window[1], ' '.join(remaining)
@@ -0,0 +1,144 @@
+"""
+Near-duplicate detection for scraped articles.
+
+AMC files the same story under several sections, each at its own URL. Every
+article gets a 64-bit SimHash of its body (word shingles) and of its title
+(character shingles). Bodies are bucketed by LSH: the fingerprint is split into
+``BANDS`` bands and two articles become candidates when any band matches
+exactly, which by pigeonhole catches every pair within ``BANDS - 1`` bits
+without comparing all pairs. Candidates are confirmed on both fingerprints.
+
+A story and its translation share no shingles, so duplicates across
+languages are not detected.
+"""
+import hashlib
+import re
+import sys
+from collections import Counter, defaultdict
+from typing import Iterable, List, Optional, Tuple
+
+FINGERPRINT_BITS = 64
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+# Maximum differing bits for two articles to count as the same story
+CONTENT_DISTANCE = 3
+TITLE_DISTANCE = 12
+# Bodies shorter than this many shingles are too short to fingerprint reliably
+MIN_SHINGLES = 8
+# Candidates verified per article; bounds the work when many pages share a body
+MAX_CANDIDATES = 64
+
+# Per-bit counters are packed into one integer, LANE_BITS per bit, so a
+# feature is added with 8 table lookups instead of 64 bit tests.
+# _SPREAD[i][byte] puts the bits of digest byte i into their lanes.
+LANE_BITS = 32
+_SPREAD = [
+    [sum(1 << (LANE_BITS * (8 * (7 - i) + bit)) for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+    for i in range(8)
+]
+
+_WORD = re.compile(r'\w+')
+
+
+def _digest(feature: str) -> bytes:
+    return hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+
+
+def word_shingles(text: str, size: int = 3) -> List[str]:
+    """Overlapping `size`-word sequences of the normalized text"""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def char_shingles(text: str, size: int = 3) -> List[str]:
+    """Overlapping `size`-character sequences of the normalized text (for short titles)"""
+    value = ' '.join(_WORD.findall(text.lower()))
+    if len(value) < size:
+        return [value] if value else []
+    return [value[i:i + size] for i in range(len(value) - size + 1)]
+
+
+def simhash(features: Iterable[str]) -> int:
+    """64-bit SimHash of `features`, each weighted by its number of occurrences"""
+    s0, s1, s2, s3, s4, s5, s6, s7 = _SPREAD
+    ones = 0  # lane i: total weight of features with bit i set
+    total = 0
+    for feature, count in Counter(features).items():
+        d = _digest(feature)
+        ones += count * (s0[d[0]] | s1[d[1]] | s2[d[2]] | s3[d[3]] | s4[d[4]] | s5[d[5]] | s6[d[6]] | s7[d[7]])
+        total += count
+    lanes = memoryview(ones.to_bytes(FINGERPRINT_BITS * LANE_BITS // 8, sys.byteorder)).cast('I')
+    fingerprint = 0
+    for bit, weight in enumerate(lanes):
+        # Set when the features with this bit outweigh those without it
+        if 2 * weight > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def fingerprint(title: str, content: str) -> Tuple[int, ...]:
+    """(body SimHash, title SimHash); empty if the body is too short to compare"""
+    shingles = word_shingles(content)
+    if len(shingles) < MIN_SHINGLES:
+        return ()
+    return simhash(shingles), simhash(char_shingles(title))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class DuplicateIndex:
+    """Banded LSH over body fingerprints, clustering articles as they are added"""
+
+    def __init__(self):
+        self.buckets = [defaultdict(list) for _ in range(BANDS)]
+        self.fingerprints = {}  # doc id -> (content, title)
+        self.clusters = {}  # doc id -> representative doc id
+
+    def _bands(self, fingerprint: int):
+        mask = (1 << BAND_BITS) - 1
+        return [fingerprint >> (band * BAND_BITS) & mask for band in range(BANDS)]
+
+    def add(self, doc_id: int, article, content: str) -> int:
+        """Register an article; returns the representative of its cluster (itself if new)
+
+        Fingerprints are kept on the article record, so an article is only
+        fingerprinted once however many times the index is rebuilt.
+        """
+        if article.simhash is None:
+            article.simhash = fingerprint(article.title, content)
+        if not article.simhash:
+            self.clusters[doc_id] = doc_id
+            return doc_id
+        content_print, title_print = article.simhash
+
+        representative = self._match(content_print, title_print)
+        self.clusters[doc_id] = doc_id if representative is None else representative
+        self.fingerprints[doc_id] = (content_print, title_print)
+        for band, key in enumerate(self._bands(content_print)):
+            self.buckets[band][key].append(doc_id)
+        return self.clusters[doc_id]
+
+    def _match(self, content_print: int, title_print: int) -> Optional[int]:
+        seen = set()
+        for band, key in enumerate(self._bands(content_print)):
+            # Most recently added first
+            for candidate in reversed(self.buckets[band].get(key, ())):
+                if candidate in seen:
+                    continue
+                if len(seen) >= MAX_CANDIDATES:
+                    return None
+                seen.add(candidate)
+                other_content, other_title = self.fingerprints[candidate]
+                if (hamming(content_print, other_content) <= CONTENT_DISTANCE
+                        and hamming(title_print, other_title) <= TITLE_DISTANCE):
+                    return self.clusters[candidate]
+        return None
+
+    @property
+    def duplicates(self) -> int:
+        """Articles that joined an existing cluster"""
+        return sum(1 for doc_id, rep in self.clusters.items() if doc_id != rep)
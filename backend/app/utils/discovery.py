@@ -0,0 +1,252 @@
+"""
+Article URL discovery for the scraper.
+
+Prefers the site's RSS/Atom feeds and XML sitemaps (with ``lastmod``) over
+walking every link on the home page. Sitemaps are streamed through an
+incremental XML parser so large ones never sit in memory, and every URL is
+checked against article-URL patterns before it is handed to the crawler, so
+navigation, category, tag and external links are never fetched.
+"""
+import heapq
+import logging
+import re
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlsplit
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+logger = logging.getLogger(__name__)
+
+FEED_PATHS = ('/feed/', '/feed/atom/')
+SITEMAP_PATHS = ('/sitemap.xml', '/sitemap_index.xml', '/wp-sitemap.xml')
+
+# Post permalinks on ameco.et are numeric (/74624/); date-based and ?p= links
+# are the other WordPress permalink styles
+ARTICLE_URL_PATTERNS = (
+    re.compile(r'^/(?:[^/]+/)*\d+/?$'),
+    re.compile(r'^/\d{4}/\d{2}/(?:\d{2}/)?[^/]+/?$'),
+)
+# Date archives (/2024/, /2024/05/, /2024/05/27/) list posts; they are not posts
+DATE_ARCHIVE_PATTERN = re.compile(r'/(?:19|20)\d{2}(?:/\d{2}){0,2}/?$')
+EXCLUDED_PATH_PATTERN = re.compile(
+    r'/(?:category|tag|author|page|feed|search|comments|attachment|wp-[a-z]+|cdn-cgi)(?:/|$)', re.IGNORECASE)
+EXCLUDED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.pdf', '.mp3', '.mp4', '.xml', '.zip')
+
+# Child sitemaps that list taxonomies or people rather than posts
+EXCLUDED_SITEMAP_PATTERN = re.compile(r'taxonom|categor|tag|user|author', re.IGNORECASE)
+
+CHUNK_SIZE = 64 * 1024
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024  # limit from the sitemaps protocol
+MAX_SITEMAPS = 50
+
+
+def _host(url):
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_article_url(url, base_url):
+    """True if `url` looks like an article page on the same site as `base_url`"""
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or _host(url) != _host(base_url):
+        return False
+    if parts.query and re.fullmatch(r'p=\d+', parts.query):
+        return True
+    path = parts.path or '/'
+    if EXCLUDED_PATH_PATTERN.search(path) or path.lower().endswith(EXCLUDED_EXTENSIONS):
+        return False
+    if DATE_ARCHIVE_PATTERN.search(path):
+        return False
+    return any(pattern.match(path) for pattern in ARTICLE_URL_PATTERNS)
+
+
+def parse_timestamp(value):
+    """Epoch seconds for a sitemap lastmod (W3C datetime) or feed date (RFC 822), or None"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(elem, name):
+    for child in elem:
+        if _local(child.tag) == name:
+            return (child.text or '').strip()
+    return ''
+
+
+def iter_xml(chunks, tags):
+    """Incrementally parse XML `chunks`, yielding each completed element named in `tags`
+
+    Elements are cleared after they are yielded, so memory stays flat however
+    large the document is. Gzip-compressed documents are decompressed on the fly.
+    """
+    parser = XMLPullParser(events=('end',))
+    decompress = None
+    received = 0
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            received += len(chunk)
+            if received > MAX_SITEMAP_BYTES:
+                logger.warning("XML document exceeds size limit, truncating")
+                return
+            if decompress is None:
+                # Sniff the first chunk for a gzip (.xml.gz) body
+                decompress = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == b'\x1f\x8b' else False
+            parser.feed(decompress.decompress(chunk) if decompress else chunk)
+            for _, elem in parser.read_events():
+                if _local(elem.tag) in tags:
+                    yield elem
+                    elem.clear()
+    except (ParseError, zlib.error) as e:
+        logger.warning(f"Stopped parsing malformed XML: {str(e)}")
+
+
+class LinkDiscovery:
+    """Find article URLs through feeds and sitemaps, newest first"""
+
+    def __init__(self, session, base_url, timeout=10):
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.requests = 0
+        self.source = None
+        # Set once any sitemap document is found, even if all its entries are skipped
+        self.found_sitemap = False
+
+    def _stream(self, url):
+        """Yield the body of `url` in chunks; nothing if it cannot be fetched"""
+        self.requests += 1
+        try:
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+        except Exception as e:
+            logger.warning(f"Could not fetch {url}: {str(e)}")
+            return
+        try:
+            if response.status_code != 200:
+                logger.info(f"No document at {url} (HTTP {response.status_code})")
+                return
+            # requests undoes Content-Encoding; iter_xml handles .xml.gz bodies
+            yield from response.iter_content(CHUNK_SIZE)
+        finally:
+            response.close()
+
+    def feed_entries(self, url):
+        """(url, title, lastmod) for every item of an RSS or Atom feed"""
+        for elem in iter_xml(self._stream(url), ('item', 'entry')):
+            link = _child_text(elem, 'link')
+            if not link:
+                # Atom: <link rel="alternate" href="..."/>
+                for child in elem:
+                    if _local(child.tag) == 'link' and child.get('rel', 'alternate') == 'alternate':
+                        link = child.get('href', '')
+                        break
+            lastmod = next(filter(None, (
+                parse_timestamp(_child_text(elem, name)) for name in ('updated', 'pubDate', 'published', 'date')
+            )), None)
+            if link:
+                yield urljoin(self.base_url + '/', link), _child_text(elem, 'title'), lastmod
+
+    def sitemap_entries(self, url):
+        """('sitemap' | 'url', loc, lastmod) for every entry of a sitemap or sitemap index"""
+        for elem in iter_xml(self._stream(url), ('sitemap', 'url')):
+            loc = _child_text(elem, 'loc')
+            if loc:
+                yield _local(elem.tag), urljoin(self.base_url + '/', loc), parse_timestamp(_child_text(elem, 'lastmod'))
+
+    def robots_sitemaps(self):
+        """Sitemap URLs declared in robots.txt"""
+        body = b''.join(self._stream(f"{self.base_url}/robots.txt"))
+        found = []
+        for line in body.decode('utf-8', 'replace').splitlines():
+            key, _, value = line.partition(':')
+            if key.strip().lower() == 'sitemap' and value.strip():
+                found.append(value.strip())
+        return found
+
+    def from_feeds(self):
+        for path in FEED_PATHS:
+            entries = [entry for entry in self.feed_entries(self.base_url + path)
+                       if is_article_url(entry[0], self.base_url)]
+            if entries:
+                return entries
+        return []
+
+    def from_sitemaps(self, limit, since=None):
+        """The `limit` newest article URLs from the site's sitemaps
+
+        Child sitemaps whose lastmod predates `since` (epoch seconds) are skipped.
+        """
+        pending = self.robots_sitemaps() or [self.base_url + path for path in SITEMAP_PATHS]
+        seen = set()
+        newest = []  # bounded min-heap of (lastmod, order, url)
+        order = 0
+        while pending and len(seen) < MAX_SITEMAPS:
+            sitemap = pending.pop(0)
+            if sitemap in seen:
+                continue
+            seen.add(sitemap)
+            found_any = False
+            for kind, loc, lastmod in self.sitemap_entries(sitemap):
+                found_any = True
+                if kind == 'sitemap':
+                    if EXCLUDED_SITEMAP_PATTERN.search(urlsplit(loc).path):
+                        continue
+                    if since and lastmod and lastmod < since:
+                        continue
+                    pending.append(loc)
+                elif is_article_url(loc, self.base_url):
+                    # Undated entries keep document order (sitemaps list oldest first)
+                    order += 1
+                    item = (lastmod or 0.0, order, loc)
+                    if len(newest) < limit:
+                        heapq.heappush(newest, item)
+                    else:
+                        heapq.heappushpop(newest, item)
+            self.found_sitemap = self.found_sitemap or found_any
+            if found_any and sitemap.endswith(SITEMAP_PATHS):
+                # The first root sitemap that exists covers the site
+                pending = [p for p in pending if not p.endswith(SITEMAP_PATHS)]
+        return [(loc, '', lastmod or None) for lastmod, _, loc in sorted(newest, reverse=True)]
+
+    def discover(self, limit, since=None):
+        """Up to `limit` (url, title, lastmod) article links, newest first
+
+        Returns None if the site has neither a feed nor a sitemap, and [] if
+        they exist but list nothing changed since `since`. `lastmod` is when the
+        entry last changed, not when the article was published.
+        """
+        links = {}
+        feed = self.from_feeds()
+        for url, title, lastmod in feed:
+            links.setdefault(url, (url, title, lastmod))
+        sitemap = self.from_sitemaps(limit, since=since)
+        for url, title, lastmod in sitemap:
+            if url in links:
+                # Keep the feed's title, but the sitemap's lastmod if it has one
+                links[url] = (url, links[url][1], lastmod or links[url][2])
+            else:
+                links[url] = (url, title, lastmod)
+
+        self.source = '+'.join(name for name, found in (('feed', feed), ('sitemap', sitemap)) if found) or None
+        ordered = sorted(links.values(), key=lambda link: link[2] or 0.0, reverse=True)
+        if not feed and not self.found_sitemap:
+            return None
+        logger.info(f"Discovered {len(ordered)} article links via {self.source} in {self.requests} requests")
+        return ordered[:limit]
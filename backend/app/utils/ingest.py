@@ -0,0 +1,132 @@
+"""
+Per-article text processing done once, when an article is ingested.
+
+Crawled pages get a normalized title, a language tag, a short snippet for
+search results and an extractive summary for the LLM context, so serving a
+query only reads fields. The crawl runs this in its parse workers; articles
+stored without these fields (older caches and MongoDB documents) are
+processed when they are loaded.
+
+Language is decided by script: the share of Ethiopic letters among all
+letters, ignoring digits, spaces and punctuation, so "ዜና 2016" is Amharic
+and "Bahir Dar ፡ news" is English.
+"""
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Mapping
+
+from config import Config
+
+# Articles with at least this share of Ethiopic letters are tagged Amharic
+ETHIOPIC_RATIO = 0.5
+
+# Ethiopic, Ethiopic Supplement and Ethiopic Extended blocks
+_ETHIOPIC = re.compile('[\u1200-\u137f\u1380-\u139f\u2d80-\u2ddf\uab00-\uab2f]')
+_LETTER = re.compile(r'[^\W\d_]')
+# Zero-width and other format characters left behind by the CMS
+_INVISIBLE = re.compile('[\u200b-\u200f\u2060\ufeff\u00ad]')
+# A sentence ends at ። ፧ ፨ ? ! or at a full stop followed by a space
+_SENTENCE_END = re.compile(r'(?<=[።፧፨?!])(?![።፧፨?!])\s*|(?<=\.)\s+')
+_WORD = re.compile(r'\w+')
+
+# Words too common to tell sentences apart
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it',
+    'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'will', 'with',
+    'ነው', 'ናቸው', 'እና', 'ላይ', 'ውስጥ', 'ወደ', 'ግን', 'ይህ', 'ይህን', 'እንደ', 'ነበር', 'ሲሆን', 'መሆኑን',
+    'ጋር', 'አለ', 'ደግሞ', 'ብለዋል', 'ገልጸዋል', 'ተናግረዋል',
+))
+
+# Fields this module adds to an article
+DERIVED_FIELDS = ('language', 'snippet', 'summary')
+
+
+def normalize_title(title: str) -> str:
+    """NFC-normalized title on one line, without invisible characters"""
+    title = _INVISIBLE.sub('', unicodedata.normalize('NFC', str(title or '')))
+    return ' '.join(title.split())
+
+
+def detect_language(text: str) -> str:
+    """'am' if Ethiopic letters make up at least ETHIOPIC_RATIO of the letters, else 'en'"""
+    letters = _LETTER.findall(text)
+    if not letters:
+        return 'am'
+    ethiopic = sum(1 for c in letters if _ETHIOPIC.match(c))
+    return 'am' if ethiopic >= ETHIOPIC_RATIO * len(letters) else 'en'
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of `text`, each with its closing punctuation"""
+    text = ' '.join(text.split())
+    return [sentence for sentence in _SENTENCE_END.split(text) if sentence]
+
+
+def make_snippet(text: str, max_chars: int = Config.INGEST_SNIPPET_CHARS) -> str:
+    """Leading whole sentences up to `max_chars`, or the first sentence cut at a word"""
+    text = ' '.join(text.split())
+    if len(text) <= max_chars:
+        return text
+    snippet = ''
+    for sentence in split_sentences(text):
+        if len(snippet) + len(sentence) + 1 > max_chars:
+            break
+        snippet = f"{snippet} {sentence}" if snippet else sentence
+    if snippet:
+        return snippet
+    cut = text[:max_chars + 1].rsplit(' ', 1)[0] if ' ' in text[:max_chars + 1] else text[:max_chars]
+    return cut.rstrip(' ,;:፣፤፡') + '...'
+
+
+def summarize(text: str, max_sentences: int = Config.INGEST_SUMMARY_SENTENCES,
+              max_chars: int = Config.INGEST_SUMMARY_CHARS) -> str:
+    """Extractive summary: the highest-scoring sentences, in their original order
+
+    A sentence scores the mean frequency of its content words across the
+    article; the opening sentence, which in news usually carries the story,
+    always scores highest.
+    """
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences and sum(len(s) + 1 for s in sentences) <= max_chars:
+        return ' '.join(sentences)
+
+    words = [[w for w in _WORD.findall(s.lower()) if w not in STOPWORDS] for s in sentences]
+    frequency = Counter(w for sentence in words for w in sentence)
+    scores = [sum(frequency[w] for w in sentence) / len(sentence) if sentence else 0.0 for sentence in words]
+    if scores:
+        scores[0] = max(scores) + 1
+
+    chosen = []
+    seen = set()
+    length = 0
+    for position in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        if len(chosen) == max_sentences:
+            break
+        # Repeated boilerplate sentences score high but say nothing new
+        if sentences[position] in seen or length + len(sentences[position]) + 1 > max_chars:
+            continue
+        seen.add(sentences[position])
+        chosen.append(position)
+        length += len(sentences[position]) + 1
+    if not chosen:
+        return make_snippet(text, max_chars)
+    return ' '.join(sentences[i] for i in sorted(chosen))
+
+
+def ingest(item: Mapping[str, Any]) -> Dict[str, Any]:
+    """The article with a normalized title and its derived fields, computed once
+
+    Items that already carry the derived fields are returned unchanged.
+    """
+    if all(field in item for field in DERIVED_FIELDS):
+        return dict(item)
+    article = dict(item)
+    title = normalize_title(article.get('title', ''))
+    content = str(article.get('content', '') or '')
+    article['title'] = title
+    # The body decides for short or mixed titles
+    article['language'] = detect_language(f"{title} {content[:500]}")
+    article['snippet'] = make_snippet(content)
+    article['summary'] = summarize(content)
+    return article
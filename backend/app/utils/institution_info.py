@@ -1,6 +1,7 @@
 """
 Module for handling AMC's institutional information queries
 """
+import re
 
 def get_amc_info(query_type='all', language='am'):
     """
@@ -64,19 +65,31 @@ To become one of Africa's leading and competitive state media institutions by 20
         # Return all information formatted nicely
         return f"{amc_info[language]['about']}\n\n{amc_info[language]['mission']}\n\n{amc_info[language]['vision']}\n\n{amc_info[language]['values']}"
 
+INSTITUTIONAL_KEYWORDS = (
+    'mission', 'vision', 'value', 'about amc', 'what is amc',
+    'who is amc', 'tell me about amc', 'information about amc',
+    'ተልዕኮ', 'ራዕይ', 'እሴት', 'ስለ አማራ ሚዲያ', 'አማራ ሚዲያ ምንድን ነው',
+    'አማራ ሚዲያ ማን ነው', 'ስለ አማራ ሚዲያ ንገረኝ', 'የአማራ ሚዲያ መረጃ'
+)
+
+_institutional_pattern = None
+
+def compile_matchers():
+    """
+    Compile the institutional keyword matcher (done once, e.g. during warm-up)
+    """
+    global _institutional_pattern
+    if _institutional_pattern is None:
+        # Longest keywords first so the alternation behaves like substring checks
+        keywords = sorted(INSTITUTIONAL_KEYWORDS, key=len, reverse=True)
+        _institutional_pattern = re.compile('|'.join(re.escape(k) for k in keywords))
+    return _institutional_pattern
+
 def is_institutional_query(query):
     """
     Check if the query is about AMC's institutional information
     """
-    query = query.lower()
-    institutional_keywords = {
-        'mission', 'vision', 'value', 'about amc', 'what is amc', 
-        'who is amc', 'tell me about amc', 'information about amc',
-        'ተልዕኮ', 'ራዕይ', 'እሴት', 'ስለ አማራ ሚዲያ', 'አማራ ሚዲያ ምንድን ነው',
-        'አማራ ሚዲያ ማን ነው', 'ስለ አማራ ሚዲያ ንገረኝ', 'የአማራ ሚዲያ መረጃ'
-    }
-    
-    return any(keyword in query for keyword in institutional_keywords)
+    return compile_matchers().search(query.lower()) is not None
 
 def get_query_type(query):
     """
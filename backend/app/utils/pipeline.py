@@ -0,0 +1,176 @@
+"""
+fetch -> parse -> extract crawl pipeline.
+
+I/O threads download pages and push the raw bytes onto a bounded queue; a
+process pool turns them into compact article records so BeautifulSoup
+parsing runs on every core instead of contending for the GIL. The queue and
+a cap on in-flight parse jobs provide backpressure in both directions, and
+every stage is shut down cleanly on success, error or interrupt.
+"""
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def parse_page(content, encoding, url, link_text):
+    """Parse-worker entry point: raw page bytes in, article record (or None) out"""
+    from .scraper import extract_article
+
+    html = content.decode(encoding or 'utf-8', errors='replace')
+    return extract_article(html, url, link_text)
+
+
+class CrawlPipeline:
+    """Fetch `links` with `fetch_workers` threads and parse them in `parse_workers` processes
+
+    `fetch` is a callable returning ``(content_bytes, encoding)`` for a URL.
+    With ``parse_workers=0`` pages are parsed inline on the calling thread.
+    """
+
+    def __init__(self, fetch, fetch_workers=8, parse_workers=2, queue_size=32, start_method='spawn'):
+        self.fetch = fetch
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(0, parse_workers)
+        self.queue_size = max(1, queue_size)
+        self.start_method = start_method
+        self.pages_fetched = 0
+        self.bytes_fetched = 0
+        self.fetch_errors = 0
+        self.parse_errors = 0
+
+    def run(self, links):
+        """Return the extracted records for `links` [(url, link_text)] in link order"""
+        links = list(links)
+        if not links:
+            return []
+
+        work = queue.Queue()
+        for position, (url, link_text) in enumerate(links):
+            work.put((position, url, link_text))
+        raw = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        stats_lock = threading.Lock()
+
+        def fetcher():
+            try:
+                while not stop.is_set():
+                    try:
+                        position, url, link_text = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        content, encoding = self.fetch(url)
+                    except Exception as e:
+                        logger.error(f"Error processing link: {str(e)}")
+                        with stats_lock:
+                            self.fetch_errors += 1
+                        continue
+                    if not content:
+                        continue
+                    with stats_lock:
+                        self.pages_fetched += 1
+                        self.bytes_fetched += len(content)
+                    # Blocks while the parse stage is behind (backpressure)
+                    while not stop.is_set():
+                        try:
+                            raw.put((position, content, encoding, url, link_text), timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+            finally:
+                raw.put(_DONE)
+
+        threads = [
+            threading.Thread(target=fetcher, name=f'crawl-fetch-{i}', daemon=True)
+            for i in range(min(self.fetch_workers, len(links)))
+        ]
+        for thread in threads:
+            thread.start()
+
+        results = {}
+        executor = None
+        try:
+            if self.parse_workers:
+                executor = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                )
+            self._dispatch(raw, len(threads), executor, results)
+        finally:
+            stop.set()
+            # Unblock fetchers waiting on a full queue, then wait for them
+            while any(thread.is_alive() for thread in threads):
+                try:
+                    raw.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            for thread in threads:
+                thread.join()
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        return [results[position] for position in sorted(results)]
+
+    def _dispatch(self, raw, producers, executor, results):
+        """Move pages from the raw queue into the parser stage until all fetchers finish"""
+        max_in_flight = max(1, self.parse_workers * 2)
+        in_flight = {}
+        finished = 0
+
+        def store(record, position):
+            if record:
+                results[position] = record
+                logger.info(f"Added article: {record['title']}")
+
+        def collect(done):
+            for future in done:
+                position, url = in_flight.pop(future)
+                try:
+                    store(future.result(), position)
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error parsing {url}: {str(e)}")
+                    self.parse_errors += 1
+
+        while finished < producers:
+            item = raw.get()
+            if item is _DONE:
+                finished += 1
+                continue
+            position, content, encoding, url, link_text = item
+
+            if executor is not None:
+                try:
+                    # Cap in-flight parse jobs so the queue, not the pool, absorbs bursts
+                    if len(in_flight) >= max_in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    in_flight[executor.submit(parse_page, content, encoding, url, link_text)] = (position, url)
+                    continue
+                except BrokenProcessPool as e:
+                    logger.error(f"Parser pool failed, parsing inline from now on: {str(e)}")
+                    self.parse_errors += len(in_flight)
+                    in_flight.clear()
+                    executor = None
+
+            try:
+                store(parse_page(content, encoding, url, link_text), position)
+            except Exception as e:
+                logger.error(f"Error parsing {url}: {str(e)}")
+                self.parse_errors += 1
+
+        if in_flight:
+            try:
+                done, _ = wait(in_flight)
+                collect(done)
+            except BrokenProcessPool as e:
+                logger.error(f"Parser pool failed: {str(e)}")
+                self.parse_errors += len(in_flight)
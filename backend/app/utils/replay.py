@@ -0,0 +1,190 @@
+"""
+Record/replay layer for the scraper's HTTP session.
+
+Responses are stored in a gzip-compressed, WARC-like archive: every record is
+its own gzip member holding WARC headers followed by the raw HTTP response, so
+recording can append to an existing archive and a replay can be served back
+deterministically without any network access.
+"""
+import gzip
+import io
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+# Headers that describe the wire encoding rather than the stored body
+_HOP_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'keep-alive'}
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def _format_http(status, reason, headers, body):
+    lines = [f"HTTP/1.1 {status} {reason or ''}".rstrip()]
+    for key, value in headers.items():
+        if key.lower() not in _HOP_HEADERS:
+            lines.append(f"{key}: {value}")
+    lines.append(f"Content-Length: {len(body)}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + body
+
+
+def _parse_http(block):
+    head, _, body = block.partition(b'\r\n\r\n')
+    lines = head.decode('utf-8', 'replace').split('\r\n')
+    _, status, *reason = lines[0].split(' ', 2)
+    headers = CaseInsensitiveDict()
+    for line in lines[1:]:
+        key, _, value = line.partition(':')
+        headers[key.strip()] = value.strip()
+    return int(status), (reason[0] if reason else ''), headers, body
+
+
+def write_record(fileobj, url, status, reason, headers, body, date=None):
+    """Append one response record to an open binary archive file"""
+    payload = _format_http(status, reason, headers, body)
+    warc_date = (date or datetime.now(timezone.utc)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    header = (
+        "WARC/1.0\r\n"
+        "WARC-Type: response\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"WARC-Date: {warc_date}\r\n"
+        "Content-Type: application/http; msgtype=response\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        "\r\n"
+    ).encode('utf-8')
+    # One gzip member per record, as in .warc.gz files
+    fileobj.write(gzip.compress(header + payload + b'\r\n\r\n'))
+
+
+def iter_records(path):
+    """Yield (url, status, reason, headers, body) for every record in an archive"""
+    with gzip.open(path, 'rb') as f:
+        while True:
+            version = f.readline()
+            if not version:
+                return
+            if not version.strip():
+                continue
+            warc_headers = {}
+            for line in iter(f.readline, b'\r\n'):
+                if not line:
+                    return
+                key, _, value = line.decode('utf-8').partition(':')
+                warc_headers[key.strip().lower()] = value.strip()
+            block = f.read(int(warc_headers.get('content-length', 0)))
+            f.read(4)  # record separator
+            if warc_headers.get('warc-type') != 'response':
+                continue
+            status, reason, headers, body = _parse_http(block)
+            yield warc_headers.get('warc-target-uri'), status, reason, headers, body
+
+
+class ReplayArchive:
+    """In-memory index of an archive, keyed by request URL"""
+
+    def __init__(self, path):
+        self.path = path
+        self.responses = {}
+        for url, status, reason, headers, body in iter_records(path):
+            # The first capture of a URL wins so replays are stable
+            self.responses.setdefault(url, (status, reason, headers, body))
+        logger.info(f"Loaded {len(self.responses)} archived responses from {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Load an archive once per process and reuse it until the file changes"""
+        mtime = os.path.getmtime(path)
+        with _archives_lock:
+            archive = _archives.get(path)
+            if archive is None or archive[0] != mtime:
+                archive = (mtime, cls(path))
+                _archives[path] = archive
+            return archive[1]
+
+    def __len__(self):
+        return len(self.responses)
+
+    def __contains__(self, url):
+        return url in self.responses
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter answering requests from a ReplayArchive"""
+
+    def __init__(self, archive):
+        super().__init__()
+        self.archive = archive
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        record = self.archive.responses.get(request.url)
+        if record is None:
+            with self._lock:
+                self.misses += 1
+            logger.warning(f"Replay miss: {request.url}")
+            status, reason, headers, body = 404, 'Not Found', CaseInsensitiveDict({'X-Replay': 'miss'}), b''
+        else:
+            status, reason, headers, body = record
+            with self._lock:
+                self.hits += 1
+                self.bytes_served += len(body)
+
+        response = Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.raw = io.BytesIO(body)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that appends every response it receives to an archive"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Reading .content here keeps the body available to the caller,
+        # including for streamed responses (iter_content serves from _content)
+        body = response.content
+        with self._lock, open(self.path, 'ab') as f:
+            write_record(f, request.url, response.status_code, response.reason, response.headers, body)
+        return response
+
+
+def enable_replay(session, path):
+    """Serve every request made through `session` from the archive at `path`"""
+    adapter = ReplayAdapter(ReplayArchive.load(path))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
+
+
+def enable_recording(session, path):
+    """Append every response fetched through `session` to the archive at `path`"""
+    adapter = RecordingAdapter(path)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
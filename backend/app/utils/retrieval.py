@@ -0,0 +1,742 @@
+"""
+Retrieval engine shared by every question/search endpoint.
+
+One pipeline: fetch (scraper cache, crawl or MongoDB) -> index (in-memory
+inverted index, rebuilt once per refresh) -> rank (per query) -> answer
+(LLM, cached). Endpoints only call `ask`, `search` and `rank`, so caching and
+indexing work is done once per process and shared by all of them.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+from .admission import ConcurrencyGate, Overloaded
+from .cache import TwoTierCache, get_shared_client
+from .corpus import Article, compact
+from .dates import parse_date, recency_intent
+from .dedup import DuplicateIndex
+from .institution_info import get_amc_info, get_query_type, is_institutional_query
+from .suggest import SuggestionIndex
+
+logger = logging.getLogger(__name__)
+
+NO_CONTENT_MESSAGE = 'No relevant content found'
+FOUND_MESSAGE = 'Content retrieved successfully'
+
+
+def published_timestamp(item: Dict[str, Any]) -> Optional[float]:
+    """Publication time of a scraped or stored article in epoch seconds, if known"""
+    published = item.get('published_ts')
+    if isinstance(published, (int, float)):
+        return float(published)
+    published = item.get('published_at')
+    if isinstance(published, datetime):
+        # pymongo returns naive UTC datetimes
+        return (published if published.tzinfo else published.replace(tzinfo=timezone.utc)).timestamp()
+    # Relative dates ("2 hours ago") are meaningless without the crawl time
+    return parse_date(item.get('date', ''), relative=False)
+
+
+class ArticleIndex:
+    """Immutable inverted index over the whitespace tokens of titles and bodies
+
+    Scoring matches the original substring ranking exactly: a query term
+    (which never contains whitespace) is a substring of a text iff it is a
+    substring of one of the text's whitespace tokens, so matching documents
+    are found through the vocabulary instead of scanning every article.
+
+    Dated articles are also kept sorted by publication time, so time-bounded
+    questions ("today's news") are answered with a range scan. Near-duplicate
+    articles (the same story under several sections) are clustered as they are
+    added, and results carry only the best-ranked article of each cluster.
+    """
+
+    # Recency bonus for time-bounded questions, halving every RECENCY_HALF_LIFE
+    RECENCY_WEIGHT = 10
+    RECENCY_HALF_LIFE = 3 * 86400
+
+    def __init__(self, articles: List[Mapping[str, Any]], version: int = 0):
+        self.version = version
+        self.articles = []
+        self.titles = []
+        self.url_ids = {}
+        self.title_postings = defaultdict(set)
+        self.content_postings = defaultdict(set)
+        self.published = []
+        self.clusters = []  # doc id -> representative doc id of its near-duplicate cluster
+        self._matches = {}
+        self._vocabularies = {}
+        self._matches_lock = threading.Lock()
+
+        duplicates = DuplicateIndex()
+        for item in articles:
+            if not item or not isinstance(item, Mapping):
+                continue
+            # Records keep bodies compressed; tokenize the body before compacting
+            content = str(item.get('content', '') or '')
+            article = Article.from_dict(item)
+            if not article.title or not article.url or article.url in self.url_ids:
+                continue
+
+            doc_id = len(self.articles)
+            self.url_ids[article.url] = doc_id
+            lowered = article.title.lower()
+            self.articles.append(article)
+            self.published.append(published_timestamp(item))
+            self.titles.append(lowered)
+            for token in set(lowered.split()):
+                self.title_postings[token].add(doc_id)
+            for token in set(content.lower().split()):
+                self.content_postings[token].add(doc_id)
+            self.clusters.append(duplicates.add(doc_id, article, content))
+        self.duplicates = duplicates.duplicates
+
+        # Time index: publication times in ascending order with their documents
+        dated = sorted((ts, doc_id) for doc_id, ts in enumerate(self.published) if ts is not None)
+        self.times = [ts for ts, _ in dated]
+        self.time_docs = [doc_id for _, doc_id in dated]
+
+    def __len__(self):
+        return len(self.articles)
+
+    def _lookup(self, field: str, term: str) -> frozenset:
+        """Documents whose `field` contains `term` as a substring (memoised)"""
+        key = (field, term)
+        docs = self._matches.get(key)
+        if docs is None:
+            postings = self.title_postings if field == 'title' else self.content_postings
+            tokens, joined, starts = self._vocabulary(field)
+            docs = set()
+            # Terms never contain whitespace, so a match never spans two tokens
+            position = joined.find(term)
+            while position != -1:
+                i = bisect_right(starts, position) - 1
+                docs |= postings[tokens[i]]
+                if i + 1 == len(tokens):
+                    break
+                position = joined.find(term, starts[i + 1])
+            docs = frozenset(docs)
+            with self._matches_lock:
+                self._matches[key] = docs
+        return docs
+
+    def _vocabulary(self, field: str):
+        """(tokens, tokens joined by newlines, offset of each token) for substring scans in C"""
+        vocabulary = self._vocabularies.get(field)
+        if vocabulary is None:
+            tokens = list(self.title_postings if field == 'title' else self.content_postings)
+            starts = []
+            offset = 0
+            for token in tokens:
+                starts.append(offset)
+                offset += len(token) + 1
+            vocabulary = (tokens, '\n'.join(tokens), starts)
+            with self._matches_lock:
+                self._vocabularies[field] = vocabulary
+        return vocabulary
+
+    def between(self, start: Optional[float] = None, end: Optional[float] = None) -> List[int]:
+        """Documents published in [start, end), newest first"""
+        lo = bisect_left(self.times, start) if start is not None else 0
+        hi = bisect_left(self.times, end) if end is not None else len(self.times)
+        return self.time_docs[lo:hi][::-1]
+
+    def latest(self, count: int) -> List[int]:
+        """The `count` most recently published documents, newest first"""
+        return self.time_docs[-count:][::-1] if count > 0 else []
+
+    def rank(self, query: str, include_english: bool = False, limit: int = 10,
+             now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return the public fields of the best matching articles"""
+        now = time.time() if now is None else now
+        intent = recency_intent(query, now)
+        if intent is not None:
+            return self._rank_recent(intent, include_english, limit, now)
+
+        lowered = query.lower()
+        query_terms = lowered.split()
+        scores = self._relevance(query_terms)
+
+        candidates = scores.keys() if query_terms else range(len(self.articles))
+        ranked = []
+        for doc_id in candidates:
+            exact_match = lowered in self.titles[doc_id]
+            score = scores.get(doc_id, 0) + (10 if exact_match else 0)
+            if score <= 0 and not exact_match:
+                continue
+            if not include_english and self.articles[doc_id].language == 'en':
+                continue
+            # Exact matches first, then by score, then newest, then in corpus order
+            ranked.append((not exact_match, -score, -(self.published[doc_id] or 0.0), doc_id))
+
+        ranked.sort()
+        return [self.public(doc_id) for doc_id in self._distinct((item[-1] for item in ranked), limit)]
+
+    def rank_many(self, queries: List[str], include_english: bool = False, limit: int = 10,
+                  now: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """`rank` for many queries against this snapshot, resolving each distinct term once"""
+        now = time.time() if now is None else now
+        for term in sorted({term for query in queries for term in query.lower().split()}):
+            self._lookup('title', term)
+            self._lookup('content', term)
+        return [self.rank(query, include_english=include_english, limit=limit, now=now) for query in queries]
+
+    def _relevance(self, query_terms: List[str]) -> Dict[int, int]:
+        scores = defaultdict(int)
+        for term in query_terms:
+            for doc_id in self._lookup('title', term):
+                scores[doc_id] += 5
+            for doc_id in self._lookup('content', term):
+                scores[doc_id] += 2
+        return scores
+
+    def _rank_recent(self, intent, include_english: bool, limit: int, now: float) -> List[Dict[str, Any]]:
+        """Rank a time-bounded question: relevance within the window plus a recency bonus"""
+        start, end, remaining = intent
+        scores = self._relevance(remaining.lower().split())
+
+        candidates = None
+        if start is not None or end is not None:
+            candidates = self.between(start, end)
+        if not candidates:
+            # "latest ..." or nothing that recent: matching articles from any
+            # time and the newest ones, recency-weighted
+            candidates = sorted(set(scores) | set(self.latest(limit)))
+
+        ranked = []
+        for doc_id in candidates:
+            if not include_english and self.articles[doc_id].language == 'en':
+                continue
+            published = self.published[doc_id]
+            age = max(now - published, 0.0) if published is not None else None
+            recency = self.RECENCY_WEIGHT * 0.5 ** (age / self.RECENCY_HALF_LIFE) if age is not None else 0.0
+            ranked.append((-(scores.get(doc_id, 0) + recency), doc_id))
+
+        ranked.sort()
+        return [self.public(doc_id) for doc_id in self._distinct((doc_id for _, doc_id in ranked), limit)]
+
+    def _distinct(self, doc_ids, limit: int) -> List[int]:
+        """The first `limit` of `doc_ids`, skipping near-duplicates of earlier ones"""
+        seen = set()
+        distinct = []
+        for doc_id in doc_ids:
+            if len(distinct) >= limit:
+                break
+            cluster = self.clusters[doc_id]
+            if cluster not in seen:
+                seen.add(cluster)
+                distinct.append(doc_id)
+        return distinct
+
+    def public(self, doc_id: int) -> Dict[str, Any]:
+        article = self.articles[doc_id]
+        published = self.published[doc_id]
+        return {
+            'title': article.title,
+            'url': article.url,
+            'date': article.date,
+            'published_at': datetime.fromtimestamp(published, timezone.utc).isoformat() if published is not None else None,
+            'category': article.category,
+            'language': article.language,
+        }
+
+    def by_url(self, url: str) -> Optional[Article]:
+        doc_id = self.url_ids.get(url)
+        return self.articles[doc_id] if doc_id is not None else None
+
+
+class RetrievalEngine:
+    """fetch -> index -> rank -> answer, shared by /api/ask and /api/search"""
+
+    EMPTY_RETRY_INTERVAL = 60
+    MAX_CACHED_ANSWERS = 10000
+
+    def __init__(self, scraper, db=None, refresh_interval: int = Config.SCRAPE_INTERVAL,
+                 answer_ttl: int = Config.MAX_CACHE_AGE, shared_cache=None):
+        self.scraper = scraper
+        self.db = db
+        self.refresh_interval = refresh_interval
+        self.answer_ttl = answer_ttl
+        self._index = None
+        self._expires_at = 0.0
+        self._version = 0
+        self._refresh_lock = threading.Lock()
+        # Expensive paths are bounded so a burst cannot tie up every worker thread
+        self.scrape_gate = ConcurrencyGate('crawl', 1, Config.ADMISSION_SCRAPE_QUEUE)
+        self.llm_gate = ConcurrencyGate('LLM', Config.ADMISSION_LLM_CONCURRENCY, Config.ADMISSION_LLM_QUEUE)
+        # L1 per process, L2 (Redis) shared by every node when configured
+        shared = shared_cache if shared_cache is not None else get_shared_client()
+        self.answers = TwoTierCache('answers', answer_ttl, client=shared, max_items=self.MAX_CACHED_ANSWERS)
+        # Expires with the refresh interval, so some node re-crawls on schedule
+        # Without Redis, the crawl lock is a file lock beside the scraper cache
+        cache_file = getattr(scraper, 'cache_file', None)
+        self.corpus = TwoTierCache('corpus', refresh_interval, client=shared, max_items=2,
+                                   encode=lambda articles: [dict(article) for article in articles], decode=compact,
+                                   lock_dir=os.path.dirname(os.path.abspath(cache_file)) if cache_file else None)
+        self.corpus.subscribe(self._on_new_corpus)
+        self.suggestions = SuggestionIndex()
+
+    @property
+    def indexed_count(self) -> int:
+        return len(self._index) if self._index is not None else 0
+
+    @property
+    def cache_stats(self) -> Dict[str, Any]:
+        return {'answers': self.answers.stats, 'corpus': self.corpus.stats}
+
+    @property
+    def gate_stats(self) -> Dict[str, Any]:
+        return {'crawl': self.scrape_gate.stats, 'llm': self.llm_gate.stats}
+
+    # fetch ---------------------------------------------------------------
+
+    def fetch(self, allow_crawl: bool = True) -> List[Dict[str, Any]]:
+        """Load articles from the shared cache, the scraper cache, a fresh crawl or MongoDB"""
+        return self._fetch(allow_crawl)[0]
+
+    def _cached(self):
+        """(articles, shared version or None) from the shared cache or the scraper cache"""
+        version = self.corpus.version() if self.corpus.client is not None else None
+        if version:
+            # Published by whichever node crawled last
+            articles = self.corpus.get('articles', version=version)
+            if articles:
+                logger.info(f"Loaded {len(articles)} articles from the shared cache (version {version})")
+                return articles, version
+        return self.scraper._load_cache(), version
+
+    def _fetch(self, allow_crawl: bool = True, wait_for_db: bool = True):
+        """(articles, shared version or None)"""
+        articles, version = self._cached()
+        if not articles and allow_crawl:
+            # With no index to serve meanwhile, wait for another process's crawl
+            cold = self._index is None or not len(self._index)
+            if self.corpus.lock('crawl', ttl=Config.SCRAPE_LOCK_TIMEOUT, wait=Config.SCRAPE_LOCK_WAIT if cold else 0):
+                try:
+                    # The previous holder may have just finished a crawl
+                    articles, version = self._cached()
+                    if not articles:
+                        articles = compact(self._crawl())
+                        if articles:
+                            version = self.corpus.publish('articles', articles)
+                finally:
+                    self.corpus.unlock('crawl')
+            else:
+                logger.info("Another process is crawling; using stored articles meanwhile")
+
+        if not articles and self._use_db(wait_for_db):
+            try:
+                articles = self.db.get_articles(limit=Config.INDEX_MAX_ARTICLES)
+                logger.info(f"Loaded {len(articles)} articles from database")
+            except Exception as e:
+                logger.warning(f"Error retrieving articles from MongoDB: {str(e)}")
+        return articles or [], version
+
+    def _crawl(self) -> List[Dict[str, Any]]:
+        logger.info("Attempting to scrape new content...")
+        try:
+            articles = self.scraper.get_news_content()
+        except Exception as e:
+            logger.error(f"Error scraping content: {str(e)}")
+            return []
+        if articles:
+            logger.info(f"Scraped {len(articles)} new articles")
+            self._save(articles)
+        else:
+            logger.warning("No articles found from scraping")
+        return articles
+
+    def _save(self, articles):
+        if not self.db:
+            return
+        try:
+            self.db.save_articles([dict(article) for article in articles])
+            logger.info("Saved new articles to database")
+        except Exception as e:
+            logger.warning(f"Could not save articles to MongoDB: {str(e)}")
+
+    def _on_new_corpus(self, version: int) -> None:
+        """Another node published a crawl: rebuild from the shared cache on the next request"""
+        index = self._index
+        if index is None or index.version != version:
+            logger.info(f"New shared corpus version {version}; index will be refreshed")
+            self._expires_at = 0.0
+
+    # index ---------------------------------------------------------------
+
+    def _use_db(self, wait_for_db: bool = True) -> bool:
+        """Whether to query MongoDB; without `wait_for_db`, only once it is known to be up"""
+        return bool(self.db) and (wait_for_db or self.db.ready)
+
+    def refresh(self, allow_crawl: bool = True, wait_for_db: bool = True) -> ArticleIndex:
+        """Rebuild the index from freshly fetched articles
+
+        With ``wait_for_db=False`` MongoDB is skipped unless its connection
+        check has already succeeded, so the caller never waits on it.
+        """
+        articles, version = self._fetch(allow_crawl=allow_crawl, wait_for_db=wait_for_db)
+        if not articles and self._index is not None and len(self._index):
+            # Site down or another process crawling: keep serving what we have
+            logger.warning("No articles fetched; keeping the current index")
+            self._expires_at = time.monotonic() + self.EMPTY_RETRY_INTERVAL
+            return self._index
+        if version is None:
+            self._version += 1
+            version = self._version
+        index = ArticleIndex(articles, version=version)
+        self._index = index
+        self._refresh_suggestions(index, wait_for_db)
+        # An empty corpus (e.g. the site is down) is retried sooner
+        interval = self.refresh_interval if len(index) else self.EMPTY_RETRY_INTERVAL
+        self._expires_at = time.monotonic() + interval + self._jitter(interval)
+        logger.info(f"Indexed {len(index)} articles, {index.duplicates} near-duplicates (version {index.version})")
+        return index
+
+    def _refresh_suggestions(self, index: ArticleIndex, wait_for_db: bool = True) -> None:
+        """Autocomplete over the new titles (one per near-duplicate cluster) and popular questions"""
+        try:
+            entries = [
+                SuggestionIndex.title_entry(article.title, article.language, index.published[doc_id])
+                for doc_id, article in enumerate(index.articles) if index.clusters[doc_id] == doc_id
+            ]
+            if self._use_db(wait_for_db) and Config.SUGGEST_POPULAR_QUESTIONS:
+                try:
+                    popular = self.db.popular_questions(limit=Config.SUGGEST_POPULAR_QUESTIONS,
+                                                        days=Config.SUGGEST_QUESTION_DAYS)
+                    entries += [
+                        SuggestionIndex.question_entry(item['question'], item.get('language') or 'am', item['count'])
+                        for item in popular if item.get('question')
+                    ]
+                except Exception as e:
+                    logger.warning(f"Suggesting titles only, popular questions unavailable: {str(e)}")
+            self.suggestions = self.suggestions.updated(entries)
+        except Exception as e:
+            logger.error(f"Error refreshing suggestions: {str(e)}")
+
+    @staticmethod
+    def _jitter(interval: float) -> float:
+        """Random extra delay so processes sharing a start time do not refresh together"""
+        return random.uniform(0, interval * Config.SCRAPE_INTERVAL_JITTER)
+
+    def after_fork(self) -> None:
+        """Stagger this worker's refreshes; preloaded workers inherit the master's expiry"""
+        # The master's refresh thread may have held the lock at fork time
+        self._refresh_lock = threading.Lock()
+        if self._expires_at:
+            self._expires_at += self._jitter(self.refresh_interval)
+
+    def get_index(self) -> ArticleIndex:
+        """Current index, refreshed once per interval by a single thread"""
+        self.corpus.ensure_subscribed()
+        index = self._index
+        if index is not None and time.monotonic() < self._expires_at:
+            return index
+        if index is not None and len(index):
+            # Keep serving the stale index while a background thread refreshes it
+            if self._refresh_lock.acquire(blocking=False):
+                threading.Thread(target=self._refresh_stale, name='index-refresh', daemon=True).start()
+            return index
+
+        # Nothing to serve until the crawl finishes: wait in a bounded queue
+        self.scrape_gate.acquire()
+        self._refresh_lock.acquire()
+        try:
+            # Another thread may have refreshed it while we waited
+            if self._index is not index and time.monotonic() < self._expires_at:
+                return self._index
+            return self.refresh()
+        finally:
+            self._refresh_lock.release()
+            self.scrape_gate.release()
+
+    def _refresh_stale(self) -> None:
+        """Background refresh; the caller acquired the refresh lock for it"""
+        try:
+            if time.monotonic() >= self._expires_at:
+                self.refresh()
+        except Exception as e:
+            logger.error(f"Error refreshing the index: {str(e)}")
+            self._expires_at = time.monotonic() + self.EMPTY_RETRY_INTERVAL
+        finally:
+            self._refresh_lock.release()
+
+    def warm(self) -> int:
+        """Build the index from cached or stored articles without crawling or waiting on MongoDB"""
+        with self._refresh_lock:
+            index = self.refresh(allow_crawl=False, wait_for_db=False)
+            if not len(index):
+                # Nothing cached: let the first query crawl
+                self._expires_at = 0.0
+            return len(index)
+
+    # rank ----------------------------------------------------------------
+
+    def rank(self, query: str, include_english: bool = True, limit: int = 10) -> List[Dict[str, Any]]:
+        if not query or not isinstance(query, str):
+            logger.error("Invalid query")
+            return []
+        return self.get_index().rank(query, include_english=include_english, limit=limit)
+
+    # answer --------------------------------------------------------------
+
+    def answer(self, question: str, context: List[Dict[str, Any]], language: str,
+               trace: Optional[Dict[str, Any]] = None, generate: bool = True) -> Optional[str]:
+        """LLM answer for the question, cached per index version; None if unavailable
+
+        `trace`, if given, receives the tier that served the answer under
+        'cache' ('memory', 'shared', 'mongo' or 'llm'). With ``generate=False`` only the
+        caches are consulted.
+        """
+        if not Config.DEEPSEEK_API_KEY:
+            return None
+        index = self._index
+        version = index.version if index else 0
+        key = self._answer_key(question, language)
+        cached, tier = self.answers.lookup(key, version=version)
+        if tier is not None:
+            if trace is not None:
+                trace['cache'] = 'memory' if tier == 'l1' else 'shared'
+            return cached
+
+        answer = None
+        source = 'mongo'
+        if self.db:
+            try:
+                answer = self.db.get_cached_response(question, language, max_age=self.answer_ttl)
+            except Exception as e:
+                logger.warning(f"Error reading cached answer: {str(e)}")
+
+        if answer is None:
+            if not generate:
+                return None
+            source = 'llm'
+            try:
+                answer = self._generate(question, context, language, index)
+            except Overloaded:
+                raise
+            except Exception as e:
+                logger.error(f"Error in AI response: {str(e)}")
+                return None
+
+        if trace is not None:
+            trace['cache'] = source
+        self.answers.set(key, answer, version=version)
+        return answer
+
+    @staticmethod
+    def _answer_key(question: str, language: str) -> str:
+        return f"{language}:{' '.join(question.lower().split())}"
+
+    def _generate(self, question: str, context: List[Dict[str, Any]], language: str,
+                  index: Optional[ArticleIndex]) -> str:
+        """Ask the LLM, grounded in the top ranked articles, and store the answer in MongoDB"""
+        from .ai_engine import request_ai_response
+
+        documents = []
+        for item in context[:5]:
+            article = index.by_url(item['url']) if index else None
+            if article and Config.LLM_CONTEXT_SUMMARIES:
+                # The ingest summary keeps the prompt short; bodies stay compressed
+                article = {'title': article.title, 'content': article.summary, 'date': article.date}
+            documents.append(article or item)
+        with self.llm_gate.slot():
+            answer = request_ai_response(question, documents, language)
+        if self.db:
+            try:
+                self.db.cache_response(question, answer, language)
+            except Exception as e:
+                logger.warning(f"Could not cache answer: {str(e)}")
+        return answer
+
+    def prewarm(self, questions: List[Dict[str, Any]]) -> int:
+        """Load stored answers for popular questions into the in-memory cache"""
+        warmed = 0
+        for item in questions:
+            question, language = item.get('question'), item.get('language') or 'am'
+            if not question or is_institutional_query(question):
+                continue
+            if self.answer(question, [], language, generate=False) is not None:
+                warmed += 1
+        return warmed
+
+    # endpoints -----------------------------------------------------------
+
+    def ask(self, message: str, language: str = 'am', trace: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Full question pipeline; returns the /api/ask response payload"""
+        if is_institutional_query(message):
+            return self._institutional_response(message, language)
+
+        context = self.rank(message, include_english=True)
+        return self._news_response(message, language, context, self.answer(message, context, language, trace=trace))
+
+    @staticmethod
+    def _institutional_response(message: str, language: str) -> Dict[str, Any]:
+        return {
+            'status': 'success',
+            'question': message,
+            'language': language,
+            'context': [],
+            'source': 'AMC Info',
+            'message': get_amc_info(get_query_type(message), language),
+            'answer': None,
+            'is_institutional': True,
+            'total_results': 0
+        }
+
+    @staticmethod
+    def _news_response(message: str, language: str, context: List[Dict[str, Any]],
+                       answer: Optional[str]) -> Dict[str, Any]:
+        return {
+            'status': 'success',
+            'question': message,
+            'language': language,
+            'context': context,
+            'source': 'AMC News',
+            'message': FOUND_MESSAGE if context else NO_CONTENT_MESSAGE,
+            'answer': answer,
+            'is_institutional': False,
+            'total_results': len(context)
+        }
+
+    def ask_batch(self, questions: List[Tuple[str, str]], workers: int = Config.ASK_BATCH_WORKERS
+                  ) -> Iterator[Tuple[int, Dict[str, Any], Optional[str], float]]:
+        """Answer many (message, language) questions; yields (position, response, cache tier, latency ms)
+
+        Results are yielded as soon as they are ready, not in input order.
+        Identical questions are answered once. News questions are ranked
+        together against one index snapshot, stored answers are read with one
+        MongoDB query per language, and LLM calls run on `workers` threads.
+        The latency is the time spent on that question alone; shared steps are
+        split evenly between the questions that took part. Closing the
+        generator cancels LLM calls that have not started yet.
+        """
+        positions = defaultdict(list)  # answer key -> input positions
+        unique = {}  # answer key -> (message, language)
+        for position, (message, language) in enumerate(questions):
+            key = self._answer_key(message, language)
+            positions[key].append(position)
+            unique.setdefault(key, (message, language))
+        spent = defaultdict(float)  # answer key -> seconds spent on it
+
+        def results(key, response, cache=None):
+            for position in positions[key]:
+                yield position, dict(response, question=questions[position][0]), cache, spent[key] * 1000
+
+        news = {}
+        for key, (message, language) in unique.items():
+            if is_institutional_query(message):
+                started = time.perf_counter()
+                response = self._institutional_response(message, language)
+                spent[key] = time.perf_counter() - started
+                yield from results(key, response)
+            else:
+                news[key] = (message, language)
+        if not news:
+            return
+
+        # Contexts do not depend on the answer language, so each text is ranked once
+        started = time.perf_counter()
+        index = self.get_index()
+        texts = sorted({message.lower() for message, _ in news.values()})
+        contexts = dict(zip(texts, index.rank_many(texts, include_english=True)))
+        share = (time.perf_counter() - started) / len(news)
+
+        pending = {}  # key -> context still needing an answer
+        for key, (message, language) in news.items():
+            started = time.perf_counter()
+            context = contexts[message.lower()]
+            cached, tier = self.answers.lookup(key, version=index.version) if Config.DEEPSEEK_API_KEY else (None, None)
+            spent[key] = share + time.perf_counter() - started
+            if tier is None and Config.DEEPSEEK_API_KEY:
+                pending[key] = context
+                continue
+            yield from results(key, self._news_response(message, language, context, cached),
+                               {'l1': 'memory', 'l2': 'shared'}.get(tier))
+        if not pending:
+            return
+
+        if self.db:
+            by_language = defaultdict(list)
+            for key in pending:
+                message, language = news[key]
+                by_language[language].append(message)
+            for language, messages in by_language.items():
+                started = time.perf_counter()
+                try:
+                    stored = self.db.get_cached_responses(messages, language, max_age=self.answer_ttl)
+                except Exception as e:
+                    logger.warning(f"Error reading cached answers: {str(e)}")
+                    continue
+                finally:
+                    share = (time.perf_counter() - started) / len(messages)
+                    for message in messages:
+                        spent[self._answer_key(message, language)] += share
+                for message in messages:
+                    key = self._answer_key(message, language)
+                    if message in stored and key in pending:
+                        self.answers.set(key, stored[message], version=index.version)
+                        yield from results(key, self._news_response(message, language, pending.pop(key),
+                                                                     stored[message]), 'mongo')
+
+        def generate(key, context):
+            started = time.perf_counter()
+            try:
+                return self._generate(news[key][0], context, news[key][1], index)
+            finally:
+                spent[key] += time.perf_counter() - started
+
+        pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='ask-batch')
+        try:
+            futures = {pool.submit(generate, key, context): key for key, context in pending.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                message, language = news[key]
+                try:
+                    answer = future.result()
+                    self.answers.set(key, answer, version=index.version)
+                except Overloaded as e:
+                    yield from results(key, {'status': 'error', 'message': str(e), 'retry_after': e.retry_after,
+                                             'language': language})
+                    continue
+                except Exception as e:
+                    logger.error(f"Error in AI response: {str(e)}")
+                    answer = None
+                yield from results(key, self._news_response(message, language, pending[key], answer), 'llm')
+        finally:
+            # Reached early when the client disconnects: drop the calls still queued
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def suggest(self, prefix: str, language: Optional[str] = None,
+                limit: int = Config.SUGGEST_LIMIT) -> List[Dict[str, str]]:
+        """Completions for a partly typed question; never waits for a crawl"""
+        return self.suggestions.lookup(prefix, limit=limit, language=language)
+
+    def search(self, query: str, language: str = 'am', limit: int = 5) -> Dict[str, Any]:
+        """Keyword search; returns the /api/search response payload"""
+        index = self.get_index()
+        results = []
+        for item in index.rank(query, include_english=True, limit=limit):
+            article = index.by_url(item['url'])
+            results.append({
+                'title': item['title'],
+                'summary': article.snippet if article else '',
+                'url': item['url'],
+                'date': item['date'],
+                'published_at': item['published_at'],
+                'language': item['language'],
+            })
+        return {
+            'status': 'success',
+            'query': query,
+            'results': results,
+            'language': language
+        }
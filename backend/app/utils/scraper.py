@@ -1,17 +1,90 @@
 import requests
-from bs4 import BeautifulSoup
 import os
 from datetime import datetime, timedelta
-import json
 import logging
+import threading
+from config import Config
+from .corpus import compact, read_corpus_file, write_corpus_file
+from .dates import parse_date
+from .discovery import LinkDiscovery, is_article_url
+from .ingest import ingest
+from .pipeline import CrawlPipeline
+from .replay import enable_recording, enable_replay
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Parsed cache files as compact article records, keyed by path and invalidated
+# on mtime change. Loading this before gunicorn forks lets every worker share
+# the parsed index.
+_cache_files = {}
+_cache_files_lock = threading.Lock()
+
+def _read_cache_file(path):
+    """Return the cache at `path` with its articles compacted, parsing it only when it changed"""
+    mtime = os.path.getmtime(path)
+    with _cache_files_lock:
+        entry = _cache_files.get(path)
+        if entry is None or entry[0] != mtime:
+            cache = read_corpus_file(path)
+            cache['data'] = compact(cache.get('data', []))
+            entry = (mtime, cache)
+            _cache_files[path] = entry
+        return entry[1]
+
+def extract_article(html, url, link_text=''):
+    """Extract an article record from a fetched page, or None if it has no title"""
+    from bs4 import BeautifulSoup
+
+    article_soup = BeautifulSoup(html, 'html.parser')
+
+    # Get title
+    title = None
+    title_elem = article_soup.find(['h1', 'h2', 'h3'], class_=lambda x: x and any(term in str(x).lower() for term in ['title', 'heading']))
+    if title_elem:
+        title = title_elem.text.strip()
+    else:
+        title = (link_text or '').strip()
+
+    if not title:
+        return None
+
+    # Get content
+    content = ''
+    content_elem = article_soup.find(['div', 'article'], class_=lambda x: x and any(term in str(x).lower() for term in ['content', 'body', 'text']))
+    if content_elem:
+        # Remove unwanted elements
+        for unwanted in content_elem.find_all(['script', 'style', 'iframe', 'nav', 'header', 'footer']):
+            unwanted.decompose()
+        content = content_elem.text.strip()
+
+    # Get date
+    date = ''
+    date_elem = article_soup.find(['time', 'span'], class_=lambda x: x and any(term in str(x).lower() for term in ['date', 'time', 'meta']))
+    if date_elem:
+        date = date_elem.text.strip()
+
+    # Get category
+    category = 'News'
+    category_elem = article_soup.find(['span', 'a'], class_=lambda x: x and 'category' in str(x).lower())
+    if category_elem:
+        category = category_elem.text.strip()
+
+    # Snippet, summary and language are derived here, in the parse workers, once per article
+    return ingest({
+        'title': title,
+        'content': content,
+        'date': date,
+        # Normalized at crawl time, when relative dates ("2 hours ago") are still accurate
+        'published_ts': parse_date(date),
+        'url': url,
+        'category': category
+    })
+
 class AMCScraper:
     def __init__(self):
-        self.base_url = "https://ameco.et"  # Base URL without trailing slash
-        self.cache_file = 'data/amc_cache.json'
+        self.base_url = Config.AMC_BASE_URL.rstrip('/')  # Base URL without trailing slash
+        self.cache_file = Config.AMC_CACHE_FILE
         self.cache_duration = timedelta(hours=1)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -22,18 +95,39 @@ class AMCScraper:
             'Upgrade-Insecure-Requests': '1',
             'Cache-Control': 'max-age=0'
         }
+        self.fetch_workers = Config.SCRAPER_FETCH_WORKERS
+        self.parse_workers = Config.SCRAPER_PARSE_WORKERS
+        self.max_links = Config.SCRAPER_MAX_LINKS
+        self.last_crawl_stats = {}
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Enough pooled connections for every fetch thread
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(10, self.fetch_workers))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Optional offline record/replay of every request made by the scraper
+        if Config.AMC_REPLAY_ARCHIVE:
+            enable_replay(self.session, Config.AMC_REPLAY_ARCHIVE)
+        elif Config.AMC_RECORD_ARCHIVE:
+            enable_recording(self.session, Config.AMC_RECORD_ARCHIVE)
     
+    def _cache_path(self):
+        """The cache file to read: the configured one, else a legacy uncompressed cache"""
+        if not os.path.exists(self.cache_file) and self.cache_file.endswith('.gz'):
+            legacy = self.cache_file[:-len('.gz')]
+            if os.path.exists(legacy):
+                return legacy
+        return self.cache_file
+
     def _load_cache(self):
         """Load cached content"""
         try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cache = json.load(f)
-                    if datetime.fromisoformat(cache['timestamp']) + self.cache_duration > datetime.now():
-                        logger.info("Using cached content")
-                        return cache['data']
+            path = self._cache_path()
+            if os.path.exists(path):
+                cache = _read_cache_file(path)
+                if datetime.fromisoformat(cache['timestamp']) + self.cache_duration > datetime.now():
+                    logger.info("Using cached content")
+                    return cache['data']
         except Exception as e:
             logger.error(f"Cache loading error: {str(e)}")
         return None
@@ -41,22 +135,16 @@ class AMCScraper:
     def _save_cache(self, data):
         """Save content to cache"""
         try:
-            os.makedirs('data', exist_ok=True)
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'timestamp': datetime.now().isoformat(),
-                    'data': data
-                }, f, ensure_ascii=False)
+            write_corpus_file(self.cache_file, {
+                'timestamp': datetime.now().isoformat(),
+                'data': [dict(item) for item in data]
+            })
             logger.info("Content cached successfully")
         except Exception as e:
             logger.error(f"Cache saving error: {str(e)}")
     
-    def _get_page_content(self, url):
-        """Get page content with retries"""
-        if not url:
-            logger.error("Invalid URL: URL is None or empty")
-            return None
-            
+    def _fetch(self, url):
+        """Fetch a URL with retries and return the response"""
         if not url.startswith('http'):
             url = f"{self.base_url}/{'news' if 'news' in url else ''}"
             
@@ -66,215 +154,149 @@ class AMCScraper:
                 logger.info(f"Attempting to fetch URL: {url}")
                 response = self.session.get(url, timeout=10)
                 response.raise_for_status()
-                return response.text
+                return response
             except Exception as e:
                 logger.error(f"Attempt {attempt + 1}/{max_retries} failed: {str(e)}")
                 if attempt == max_retries - 1:
                     raise
         return None
 
-    def get_news_content(self):
+    def _get_page_content(self, url):
+        """Get page content with retries"""
+        if not url:
+            logger.error("Invalid URL: URL is None or empty")
+            return None
+        response = self._fetch(url)
+        return response.text if response is not None else None
+
+    def _get_page_bytes(self, url):
+        """Get raw page bytes and their encoding, for the parser processes"""
+        response = self._fetch(url)
+        if response is None:
+            return None, None
+        return response.content, response.encoding or response.apparent_encoding
+
+    def _discover_links(self, html_content):
+        """Return unique (url, link_text) pairs from the home page's news sections"""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html_content, 'html.parser')
+        logger.info("Successfully parsed main page")
+        
+        # Try to find news sections
+        sections = []
+        
+        # Method 1: Look for news sections by heading
+        for heading in ['አማራ', 'ኢትዮጵያ', 'አፍሪካ', 'ዓለም', 'ዜና']:
+            section = soup.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'], string=lambda x: x and heading in x)
+            if section:
+                sections.append(section.parent)
+        
+        # Method 2: Look for article containers
+        article_containers = soup.find_all(['article', 'div'], class_=lambda x: x and any(term in str(x).lower() for term in ['post', 'article', 'news']))
+        sections.extend(article_containers)
+        
+        logger.info(f"Found {len(sections)} potential news sections")
+        
+        links = {}
+        for section in sections:
+            # Find all links in this section
+            for link in section.find_all('a'):
+                url = link.get('href', '')
+                if not url:
+                    continue
+                if not url.startswith('http'):
+                    url = f"{self.base_url}{url if url.startswith('/') else '/' + url}"
+                # Keep the first occurrence of every URL
+                links.setdefault(url, link.text)
+        return list(links.items())
+
+    def _previous_crawl(self):
+        """Articles from the last saved crawl, fresh or not, keyed by URL, and its epoch time"""
+        try:
+            path = self._cache_path()
+            if os.path.exists(path):
+                cache = _read_cache_file(path)
+                articles = {item['url']: item for item in cache.get('data', []) if item.get('url')}
+                return articles, datetime.fromisoformat(cache['timestamp']).timestamp()
+        except Exception as e:
+            logger.error(f"Cache loading error: {str(e)}")
+        return {}, None
+
+    def _find_links(self, since=None):
+        """(url, link_text, lastmod) article links from feeds/sitemaps, else the home page"""
+        discovery = LinkDiscovery(self.session, self.base_url)
+        links = discovery.discover(self.max_links, since=since)
+        self.last_crawl_stats = {'discovery_source': discovery.source, 'discovery_requests': discovery.requests}
+        if links is not None:
+            # Possibly empty: nothing changed since the last crawl
+            return links
+
+        logger.info(f"No feed or sitemap found, fetching links from {self.base_url}")
+        html_content = self._get_page_content(self.base_url)
+        if not html_content:
+            raise Exception("Failed to fetch main page")
+        self.last_crawl_stats.update(discovery_source='home', discovery_requests=discovery.requests + 1)
+        links = [(url, text, None) for url, text in self._discover_links(html_content)
+                 if is_article_url(url, self.base_url)]
+        return links[:self.max_links]
+
+    def get_news_content(self, use_cache=True):
         """Scrape news content from AMC website"""
-        cached = self._load_cache()
+        cached = self._load_cache() if use_cache else None
         if cached:
             return cached
-        
-        news_items = []
+
         try:
             logger.info(f"Fetching content from {self.base_url}")
-            html_content = self._get_page_content(self.base_url)
-            if not html_content:
-                raise Exception("Failed to fetch main page")
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
-            logger.info("Successfully parsed main page")
-            
-            # Try to find news sections
-            sections = []
-            
-            # Method 1: Look for news sections by heading
-            for heading in ['አማራ', 'ኢትዮጵያ', 'አፍሪካ', 'ዓለም', 'ዜና']:
-                section = soup.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'], string=lambda x: x and heading in x)
-                if section:
-                    sections.append(section.parent)
-            
-            # Method 2: Look for article containers
-            article_containers = soup.find_all(['article', 'div'], class_=lambda x: x and any(term in str(x).lower() for term in ['post', 'article', 'news']))
-            sections.extend(article_containers)
-            
-            logger.info(f"Found {len(sections)} potential news sections")
-            
-            # Process each section
-            for section in sections:
-                try:
-                    # Find all links in this section
-                    links = section.find_all('a')
-                    for link in links:
-                        try:
-                            url = link.get('href', '')
-                            if not url:
-                                continue
-                                
-                            if not url.startswith('http'):
-                                url = f"{self.base_url}{url if url.startswith('/') else '/' + url}"
-                            
-                            # Skip if we already processed this URL
-                            if any(item['url'] == url for item in news_items):
-                                continue
-                            
-                            logger.info(f"Processing URL: {url}")
-                            
-                            # Get article content
-                            article_html = self._get_page_content(url)
-                            if not article_html:
-                                continue
-                                
-                            article_soup = BeautifulSoup(article_html, 'html.parser')
-                            
-                            # Get title
-                            title = None
-                            title_elem = article_soup.find(['h1', 'h2', 'h3'], class_=lambda x: x and any(term in str(x).lower() for term in ['title', 'heading']))
-                            if title_elem:
-                                title = title_elem.text.strip()
-                            else:
-                                title = link.text.strip()
-                            
-                            if not title:
-                                continue
-                            
-                            # Get content
-                            content = ''
-                            content_elem = article_soup.find(['div', 'article'], class_=lambda x: x and any(term in str(x).lower() for term in ['content', 'body', 'text']))
-                            if content_elem:
-                                # Remove unwanted elements
-                                for unwanted in content_elem.find_all(['script', 'style', 'iframe', 'nav', 'header', 'footer']):
-                                    unwanted.decompose()
-                                content = content_elem.text.strip()
-                            
-                            # Get date
-                            date = ''
-                            date_elem = article_soup.find(['time', 'span'], class_=lambda x: x and any(term in str(x).lower() for term in ['date', 'time', 'meta']))
-                            if date_elem:
-                                date = date_elem.text.strip()
-                            
-                            # Get category
-                            category = 'News'
-                            category_elem = article_soup.find(['span', 'a'], class_=lambda x: x and 'category' in str(x).lower())
-                            if category_elem:
-                                category = category_elem.text.strip()
-                            
-                            news_items.append({
-                                'title': title,
-                                'content': content,
-                                'date': date,
-                                'url': url,
-                                'category': category
-                            })
-                            logger.info(f"Added article: {title}")
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing link: {str(e)}")
-                            continue
-                            
-                except Exception as e:
-                    logger.error(f"Error processing section: {str(e)}")
-                    continue
+            previous, previous_at = self._previous_crawl() if use_cache else ({}, None)
+            links = self._find_links(since=previous_at)
+
+            # Articles already crawled and not modified since are reused as-is
+            reused = {}
+            to_fetch = []
+            for url, link_text, lastmod in links:
+                if url in previous and previous_at and (lastmod is None or lastmod <= previous_at):
+                    reused[url] = previous[url]
+                else:
+                    to_fetch.append((url, link_text))
+            logger.info(f"Processing {len(to_fetch)} links ({len(reused)} unchanged)")
+
+            pipeline = CrawlPipeline(
+                self._get_page_bytes,
+                fetch_workers=self.fetch_workers,
+                parse_workers=self.parse_workers,
+                queue_size=Config.SCRAPER_QUEUE_SIZE,
+                start_method=Config.SCRAPER_START_METHOD,
+            )
+            # lastmod only decides what to refetch; an edit does not make a story new
+            fetched = {item['url']: item for item in pipeline.run(to_fetch)}
+            news_items = [reused.get(url) or fetched.get(url) for url, _, _ in links]
+            news_items = [item for item in news_items if item]
+            # Keep older articles that sitemaps skipped because they had not changed
+            listed = {url for url, _, _ in links}
+            news_items += [item for url, item in previous.items() if url not in listed
+                           and is_article_url(url, self.base_url)][:max(self.max_links - len(news_items), 0)]
+
+            self.last_crawl_stats.update({
+                'links': len(links),
+                'reused': len(reused),
+                'pages_fetched': pipeline.pages_fetched,
+                'bytes_fetched': pipeline.bytes_fetched,
+                'fetch_errors': pipeline.fetch_errors,
+                'parse_errors': pipeline.parse_errors,
+                'articles': len(news_items),
+            })
             
-            if news_items:
+            if news_items and use_cache:
                 self._save_cache(news_items)
                 logger.info(f"Successfully processed {len(news_items)} articles")
-            else:
+            elif not news_items:
                 logger.warning("No news items found")
             
             return news_items
             
         except Exception as e:
             logger.error(f"Error scraping AMC website: {str(e)}")
-            cached = self._load_cache()
+            cached = self._load_cache() if use_cache else None
             return cached if cached else []
-
-def get_amc_content(query, include_english=False):
-    """Get relevant AMC content based on the query"""
-    logger = logging.getLogger(__name__)
-    
-    if not query or not isinstance(query, str):
-        logger.error("Invalid query")
-        return []
-    
-    try:
-        scraper = AMCScraper()
-        news_items = scraper.get_news_content()
-        
-        if not news_items:
-            logger.warning("No news items available")
-            return []
-        
-        # Prepare query terms (both Amharic and English)
-        query_terms = query.lower().split()
-        
-        # Score and filter articles
-        scored_items = []
-        for item in news_items:
-            try:
-                if not item or not isinstance(item, dict):
-                    continue
-                
-                title = str(item.get('title', '')).lower()
-                content = str(item.get('content', '')).lower()
-                url = str(item.get('url', ''))
-                
-                if not title or not url:
-                    continue
-                
-                # Calculate relevance score
-                score = 0
-                exact_match = False
-                
-                # Check for exact matches in title
-                if query.lower() in title:
-                    score += 10
-                    exact_match = True
-                
-                # Check for partial matches in title
-                for term in query_terms:
-                    if term in title:
-                        score += 5
-                    if term in content:
-                        score += 2
-                
-                # Determine language
-                is_english = any(c.isascii() for c in title)
-                
-                # Include article if:
-                # 1. It has a non-zero score (relevant to query)
-                # 2. It's an exact match
-                # 3. It matches the language preference
-                if score > 0 or exact_match:
-                    if include_english or not is_english:
-                        scored_items.append({
-                            'item': {
-                                'title': item['title'],
-                                'url': url,
-                                'date': item.get('date', ''),
-                                'category': item.get('category', ''),
-                                'language': 'en' if is_english else 'am'
-                            },
-                            'score': score,
-                            'exact_match': exact_match
-                        })
-            except Exception as e:
-                logger.error(f"Error processing item: {str(e)}")
-                continue
-        
-        # Sort by exact match first, then by score
-        scored_items.sort(key=lambda x: (not x['exact_match'], -x['score']))
-        
-        # Return top 10 most relevant items
-        relevant_items = [item['item'] for item in scored_items[:10]]
-        
-        logger.info(f"Found {len(relevant_items)} relevant items")
-        return relevant_items
-        
-    except Exception as e:
-        logger.error(f"Error in get_amc_content: {str(e)}", exc_info=True)
-        return [] 
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+Query autocomplete over article titles and frequently asked questions.
+
+Suggestions live in one sorted array of keys (every word-start suffix of each
+normalized text, so "ባሕር" also completes "... የቀይ ባሕር ..."), searched with
+bisect. The best suggestions for every prefix of up to ``PRECOMPUTED_PREFIX``
+characters are computed ahead of time, so the short prefixes that match most
+keys are answered with one dict lookup. Keys are also grouped by their first
+``PRECOMPUTED_PREFIX`` characters, each group in rank order, so a longer
+prefix walks its group from the best key down and stops once it has enough
+matches instead of ranking every key it matches. Past questions rank before titles,
+steering users towards questions whose answers are already cached.
+
+An index is immutable; `updated` returns a new one that reuses everything
+that did not change, so a crawl only pays for its new and removed articles.
+"""
+import heapq
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PRECOMPUTED_PREFIX = 3
+# Suggestions kept per precomputed prefix, enough to filter by language
+PRECOMPUTED_COUNT = 20
+
+_END = chr(0x10ffff)
+
+# (text, kind, language, rank); lower ranks are suggested first
+Entry = Tuple[str, str, str, Tuple[Any, ...]]
+
+
+def normalize(text: str) -> str:
+    return ' '.join(str(text).lower().split())
+
+
+def _word_keys(text: str) -> List[str]:
+    """The normalized text from the start of each of its words"""
+    words = normalize(text).split(' ')
+    return [' '.join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+def _prefixes(key: str):
+    return (key[:length] for length in range(1, min(len(key), PRECOMPUTED_PREFIX) + 1))
+
+
+def _rank_order(pairs):
+    return sorted(pairs, key=lambda pair: pair[1][3])
+
+
+class SuggestionIndex:
+    """Immutable prefix index; swap in the result of `updated` to refresh"""
+
+    def __init__(self, entries: Iterable[Entry] = ()):
+        self.entries = {(entry[1], normalize(entry[0])): entry for entry in entries}
+        self._pairs = sorted((key, entry) for entry in self.entries.values() for key in _word_keys(entry[0]))
+        self._keys = [key for key, _ in self._pairs]
+        self._top = self._precompute({prefix for key in self._keys for prefix in _prefixes(key)})
+        groups = defaultdict(list)
+        for pair in self._pairs:
+            groups[pair[0][:PRECOMPUTED_PREFIX]].append(pair)
+        self._ranked = {group: _rank_order(pairs) for group, pairs in groups.items()}
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def title_entry(title: str, language: str, published: Optional[float]) -> Entry:
+        # Newest titles first
+        return (title, 'title', language, (1, -(published or 0.0)))
+
+    @staticmethod
+    def question_entry(question: str, language: str, count: int) -> Entry:
+        # Most asked first; these are the questions with cached answers
+        return (question, 'question', language, (0, -count))
+
+    def _range(self, prefix: str):
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + _END, lo)
+        return lo, hi
+
+    def _best(self, lo: int, hi: int, count: int, language: Optional[str] = None) -> List[Entry]:
+        # A text is listed once per matching word, and may be both a question and a title
+        candidates = {}
+        for _, entry in self._pairs[lo:hi]:
+            if language is None or entry[2] == language:
+                if entry[0] not in candidates or entry[3] < candidates[entry[0]][3]:
+                    candidates[entry[0]] = entry
+        return heapq.nsmallest(count, candidates.values(), key=lambda entry: entry[3])
+
+    def _walk(self, prefix: str, count: int, language: Optional[str] = None) -> List[Entry]:
+        """The best `count` entries for a prefix longer than PRECOMPUTED_PREFIX"""
+        lo, hi = self._range(prefix)
+        group = self._ranked.get(prefix[:PRECOMPUTED_PREFIX], ())
+        # Ranking the matches costs about their number; walking the group costs
+        # about `count` times the group size over the number of matches
+        if (hi - lo) ** 2 <= count * len(group):
+            return self._best(lo, hi, count, language)
+        seen = set()
+        best = []
+        for key, entry in group:
+            if key.startswith(prefix) and (language is None or entry[2] == language) and entry[0] not in seen:
+                # In rank order, a text's first match is its best
+                seen.add(entry[0])
+                best.append(entry)
+                if len(best) == count:
+                    break
+        return best
+
+    def _precompute(self, prefixes) -> Dict[str, List[Entry]]:
+        return {prefix: self._best(*self._range(prefix), PRECOMPUTED_COUNT) for prefix in prefixes}
+
+    def lookup(self, prefix: str, limit: int = 8, language: Optional[str] = None) -> List[Dict[str, str]]:
+        """Up to `limit` suggestions completing `prefix`, optionally in one language"""
+        key = normalize(prefix)
+        if not key:
+            return []
+        best = None
+        if key in self._top:
+            best = [entry for entry in self._top[key] if language is None or entry[2] == language][:limit]
+            if len(best) < limit and len(self._top[key]) == PRECOMPUTED_COUNT:
+                # Filtered below the limit; there may be more further down
+                best = None
+        if best is None:
+            if len(key) > PRECOMPUTED_PREFIX:
+                best = self._walk(key, limit, language)
+            else:
+                best = self._best(*self._range(key), limit, language)
+        return [{'text': text, 'type': kind, 'language': lang} for text, kind, lang, _ in best]
+
+    def updated(self, entries: Iterable[Entry]) -> 'SuggestionIndex':
+        """A new index over `entries`, reusing the unchanged part of this one"""
+        entries = {(entry[1], normalize(entry[0])): entry for entry in entries}
+        removed = [entry for name, entry in self.entries.items() if entries.get(name) != entry]
+        added = [entry for name, entry in entries.items() if self.entries.get(name) != entry]
+        if not removed and not added:
+            return self
+        for name, entry in entries.items():
+            # Keep the objects already in the pairs, which are matched by identity
+            if self.entries.get(name) == entry:
+                entries[name] = self.entries[name]
+
+        removed_ids = {id(entry) for entry in removed}
+        kept = [pair for pair in self._pairs if id(pair[1]) not in removed_ids]
+        new = sorted((key, entry) for entry in added for key in _word_keys(entry[0]))
+        pairs = list(heapq.merge(kept, new))
+
+        index = SuggestionIndex.__new__(SuggestionIndex)
+        index.entries = entries
+        index._pairs = pairs
+        index._keys = [key for key, _ in pairs]
+        # Only prefixes of changed keys need their best suggestions recomputed
+        dirty = {prefix for entry in removed + added for key in _word_keys(entry[0]) for prefix in _prefixes(key)}
+        top = {prefix: best for prefix, best in self._top.items() if prefix not in dirty}
+        top.update((prefix, best) for prefix, best in index._precompute(dirty).items() if best)
+        index._top = top
+        groups = {key[:PRECOMPUTED_PREFIX] for entry in removed + added for key in _word_keys(entry[0])}
+        ranked = {group: pairs for group, pairs in self._ranked.items() if group not in groups}
+        for group in groups:
+            lo, hi = index._range(group)
+            pairs = _rank_order(pair for pair in index._pairs[lo:hi] if pair[0][:PRECOMPUTED_PREFIX] == group)
+            if pairs:
+                ranked[group] = pairs
+        index._ranked = ranked
+        return index
@@ -0,0 +1,51 @@
+"""
+Warm-up pass run before the server accepts traffic.
+
+With gunicorn's ``preload_app`` this runs once in the master process, so the
+parsed article index and compiled matchers are inherited copy-on-write by
+every worker instead of being rebuilt on each worker's first request.
+"""
+import logging
+import time
+
+from config import Config
+from .utils.institution_info import compile_matchers
+
+logger = logging.getLogger(__name__)
+
+WARMUP_QUERIES = ['ዜና', 'news']
+
+
+def warm_up(app):
+    """Load the article index, compile matchers and start connecting to MongoDB"""
+    start = time.perf_counter()
+
+    compile_matchers()
+
+    if app.db is not None:
+        app.db.connect_async()
+
+    # Index from the on-disk cache, or MongoDB if the probe has already reached
+    # it; a cold cache means a full crawl, and an unreachable MongoDB a server
+    # selection timeout, both left to the first request rather than blocking
+    # the deploy.
+    indexed = app.engine.warm()
+    if indexed:
+        for query in WARMUP_QUERIES:
+            app.engine.rank(query)
+
+    # Stored answers to the most asked questions (from the query log) go
+    # straight into the in-memory answer cache
+    warmed = 0
+    if app.db is not None and Config.PREWARM_POPULAR_QUESTIONS and Config.DEEPSEEK_API_KEY:
+        if not app.db.ready:
+            logger.info("Skipping answer pre-warming: MongoDB is not connected yet")
+        else:
+            try:
+                warmed = app.engine.prewarm(app.db.popular_questions(limit=Config.PREWARM_POPULAR_QUESTIONS))
+            except Exception as e:
+                logger.warning(f"Skipping answer pre-warming: {str(e)}")
+
+    logger.info(f"Warm-up finished in {(time.perf_counter() - start) * 1000:.0f}ms "
+                f"({indexed} articles indexed, {warmed} answers pre-warmed)")
+    return indexed
@@ -0,0 +1,7 @@
+"""
+Benchmark harnesses for the AMC chatbot backend.
+
+Run the modules from the ``backend`` directory, e.g.::
+
+    python -m benchmarks.load_test --concurrency 1,8,32 --output bench.json
+"""
@@ -0,0 +1,208 @@
+"""
+Offline crawl replay and parser benchmark.
+
+Works on the gzip WARC-like archives written by ``app.utils.replay``::
+
+    # build a synthetic archive from the fixture corpus (no network needed)
+    python -m benchmarks.crawl_replay synth --pages 5000 --output data/fixture.warc.gz
+
+    # or record a real crawl once
+    python -m benchmarks.crawl_replay record --output data/ameco.warc.gz
+
+    # full get_news_content run served from the archive; crawls stop at
+    # SCRAPER_MAX_LINKS (200) article links unless --max-links is raised
+    python -m benchmarks.crawl_replay crawl --archive data/fixture.warc.gz --max-links 5000
+
+    # same, with the parse stage inline vs. on four processes
+    python -m benchmarks.crawl_replay crawl --archive data/fixture.warc.gz --parse-workers 0
+    python -m benchmarks.crawl_replay crawl --archive data/fixture.warc.gz --parse-workers 4
+
+    # extractor only, over every archived page
+    python -m benchmarks.crawl_replay parse --archive data/fixture.warc.gz
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+from benchmarks.fixtures import load_corpus, render_article, render_home
+
+logger = logging.getLogger(__name__)
+
+
+def _report(results, output):
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+def cmd_synth(args):
+    """Write a home page plus `pages` article pages into a new archive"""
+    from app.utils.replay import write_record
+    from benchmarks.fixtures import render_feed, render_sitemap
+
+    corpus = load_corpus()
+    corpus = load_corpus(scale=math.ceil(args.pages / max(len(corpus), 1)))[:args.pages]
+    base_url = args.base_url.rstrip('/')
+    headers = {'Content-Type': 'text/html; charset=UTF-8'}
+
+    if os.path.exists(args.output):
+        os.remove(args.output)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    records = [(f"{base_url}/", headers, render_home(corpus))]
+    records += [(f"{base_url}{quote(article['path'])}", headers, render_article(article)) for article in corpus]
+    if not args.no_sitemap:
+        xml_headers = {'Content-Type': 'application/xml; charset=UTF-8'}
+        records.append((f"{base_url}/sitemap.xml", xml_headers, render_sitemap(corpus, base_url)))
+        records.append((f"{base_url}/feed/", xml_headers, render_feed(corpus, base_url)))
+    with open(args.output, 'wb') as f:
+        for url, record_headers, body in records:
+            write_record(f, url, 200, 'OK', record_headers, body.encode('utf-8'))
+    print(f"Wrote {len(records)} records to {args.output}", file=sys.stderr)
+
+
+def cmd_record(args):
+    """Crawl `base_url` once, appending every response to the archive"""
+    from app.utils.replay import enable_recording
+    from app.utils.scraper import AMCScraper
+
+    scraper = AMCScraper()
+    scraper.base_url = args.base_url.rstrip('/')
+    enable_recording(scraper.session, args.output)
+    start = time.perf_counter()
+    articles = scraper.get_news_content(use_cache=False)
+    print(f"Recorded crawl of {scraper.base_url}: {len(articles)} articles in "
+          f"{time.perf_counter() - start:.1f}s -> {args.output}", file=sys.stderr)
+
+
+def cmd_crawl(args):
+    """Run get_news_content against the archive and report crawl throughput"""
+    from app.utils.replay import enable_replay
+    from app.utils.scraper import AMCScraper
+
+    runs = []
+    for _ in range(args.repeat):
+        scraper = AMCScraper()
+        scraper.base_url = args.base_url.rstrip('/')
+        if args.fetch_workers is not None:
+            scraper.fetch_workers = args.fetch_workers
+        if args.parse_workers is not None:
+            scraper.parse_workers = args.parse_workers
+        if args.max_links is not None:
+            scraper.max_links = args.max_links
+        adapter = enable_replay(scraper.session, args.archive)
+        start = time.perf_counter()
+        articles = scraper.get_news_content(use_cache=False)
+        elapsed = time.perf_counter() - start
+        stats = scraper.last_crawl_stats
+        pages = adapter.hits + adapter.misses
+        candidates = max(stats.get('links', 0), 1)
+        runs.append({
+            'elapsed_s': round(elapsed, 3),
+            'discovery_source': stats.get('discovery_source'),
+            'discovery_requests': stats.get('discovery_requests'),
+            'article_links': stats.get('links'),
+            'requests': pages,
+            'replay_misses': adapter.misses,
+            'bytes_parsed': adapter.bytes_served,
+            'pages_per_s': round(pages / elapsed, 2) if elapsed else None,
+            'mb_per_s': round(adapter.bytes_served / elapsed / 1e6, 3) if elapsed else None,
+            'articles': len(articles),
+            'articles_with_content': sum(1 for a in articles if a.get('content')),
+            'extraction_yield': round(len(articles) / candidates, 4),
+            'fetch_workers': scraper.fetch_workers,
+            'parse_workers': scraper.parse_workers,
+            'max_links': scraper.max_links,
+        })
+    _report({'mode': 'crawl', 'archive': args.archive, 'runs': runs}, args.output)
+
+
+def cmd_parse(args):
+    """Run extract_article over every archived HTML page"""
+    from app.utils.replay import iter_records
+    from app.utils.scraper import extract_article
+
+    pages = []
+    for url, status, _, headers, body in iter_records(args.archive):
+        # The home page is a link hub, not an article
+        if status == 200 and urlsplit(url).path not in ('', '/') \
+                and 'html' in headers.get('Content-Type', 'text/html'):
+            pages.append((url, body))
+        if args.limit and len(pages) >= args.limit:
+            break
+
+    runs = []
+    for _ in range(args.repeat):
+        extracted = with_content = with_date = parsed_bytes = 0
+        start = time.perf_counter()
+        for url, body in pages:
+            article = extract_article(body.decode('utf-8', 'replace'), url)
+            parsed_bytes += len(body)
+            if article:
+                extracted += 1
+                with_content += bool(article['content'])
+                with_date += bool(article['date'])
+        elapsed = time.perf_counter() - start
+        runs.append({
+            'elapsed_s': round(elapsed, 3),
+            'pages': len(pages),
+            'bytes_parsed': parsed_bytes,
+            'pages_per_s': round(len(pages) / elapsed, 2) if elapsed else None,
+            'mb_per_s': round(parsed_bytes / elapsed / 1e6, 3) if elapsed else None,
+            'articles': extracted,
+            'extraction_yield': round(with_content / len(pages), 4) if pages else None,
+            'date_yield': round(with_date / len(pages), 4) if pages else None,
+        })
+    _report({'mode': 'parse', 'archive': args.archive, 'runs': runs}, args.output)
+
+
+def main(argv=None):
+    from config import Config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    synth = sub.add_parser('synth', help='build an archive from the fixture corpus')
+    synth.add_argument('--pages', type=int, default=2000)
+    synth.add_argument('--output', required=True)
+    synth.add_argument('--no-sitemap', action='store_true', help='omit sitemap.xml and the feed (home-page discovery)')
+    synth.set_defaults(func=cmd_synth)
+
+    record = sub.add_parser('record', help='record a live crawl into an archive')
+    record.add_argument('--output', required=True)
+    record.set_defaults(func=cmd_record)
+
+    crawl = sub.add_parser('crawl', help='replay get_news_content from an archive')
+    crawl.add_argument('--archive', required=True)
+    crawl.add_argument('--repeat', type=int, default=1)
+    crawl.add_argument('--fetch-workers', type=int, help='I/O threads (default: SCRAPER_FETCH_WORKERS)')
+    crawl.add_argument('--parse-workers', type=int, help='parser processes, 0 = inline (default: SCRAPER_PARSE_WORKERS)')
+    crawl.add_argument('--max-links', type=int, help='article links crawled at most (default: SCRAPER_MAX_LINKS)')
+    crawl.add_argument('--output')
+    crawl.set_defaults(func=cmd_crawl)
+
+    parse = sub.add_parser('parse', help='benchmark the article extractor on archived pages')
+    parse.add_argument('--archive', required=True)
+    parse.add_argument('--limit', type=int, default=0)
+    parse.add_argument('--repeat', type=int, default=3)
+    parse.add_argument('--output')
+    parse.set_defaults(func=cmd_parse)
+
+    for p in (synth, record, crawl):
+        p.add_argument('--base-url', default=Config.AMC_BASE_URL)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Per-page scraper logging would dominate the measurements
+    logging.getLogger('app').setLevel(logging.ERROR)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
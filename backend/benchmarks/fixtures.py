@@ -0,0 +1,209 @@
+"""
+Local fixture server standing in for ameco.et and the DeepSeek API.
+
+The AMC pages are rendered from the recorded articles in ``data/amc_cache.json``
+using the same markup classes the scraper looks for, so a crawl against the
+fixture server exercises the real parsing code without touching the network.
+"""
+import html
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'amc_cache.json')
+LLM_PATH = '/v1/chat/completions'
+
+
+def load_corpus(path=DEFAULT_CORPUS, scale=1):
+    """Load recorded articles, optionally repeated `scale` times under fresh paths"""
+    with open(path, 'r', encoding='utf-8') as f:
+        recorded = json.load(f)['data']
+
+    corpus = []
+    for copy in range(scale):
+        for i, item in enumerate(recorded):
+            path = unquote(urlsplit(item['url']).path) or '/'
+            if path == '/':
+                continue
+            if copy:
+                path = f"/fixture/{copy}/{i}/"
+            corpus.append({
+                'path': path,
+                'title': item.get('title', ''),
+                'content': item.get('content', ''),
+                'date': item.get('date', ''),
+                'category': item.get('category', 'News'),
+            })
+    return corpus
+
+
+def render_home(corpus):
+    """Render a home page linking every article from a news container"""
+    links = '\n'.join(
+        f'<li><a href="{html.escape(quote(a["path"]))}">{html.escape(a["title"])}</a></li>'
+        for a in corpus
+    )
+    return f"""<!DOCTYPE html>
+<html lang="am"><head><meta charset="utf-8"><title>Amhara Media Corporation</title></head>
+<body>
+<h2>ዜና</h2>
+<div class="news-list post-grid"><ul>
+<li><a href="/category/%E1%8B%9C%E1%8A%93/regional/">አማራ</a></li>
+<li><a href="/about/">ስለ እኛ</a></li>
+<li><a href="https://www.facebook.com/AmharaMediaCorporation">Facebook</a></li>
+{links}
+</ul></div>
+</body></html>"""
+
+
+def _published(article):
+    """Publication time of a fixture article, parsed from its 'Month D, YYYY' date"""
+    try:
+        return datetime.strptime(article['date'], '%B %d, %Y').replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def render_sitemap(corpus, base_url):
+    """Render a sitemap listing every article with its lastmod, oldest first like WordPress"""
+    entries = []
+    for article in corpus:
+        published = _published(article)
+        lastmod = f"<lastmod>{published.isoformat()}</lastmod>" if published else ''
+        entries.append(f"<url><loc>{html.escape(base_url + quote(article['path']))}</loc>{lastmod}</url>")
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            + '\n'.join(entries) + '\n</urlset>')
+
+
+def render_feed(corpus, base_url, items=10):
+    """Render an RSS feed of the `items` most recent articles"""
+    recent = sorted(corpus, key=lambda a: _published(a) or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+    entries = []
+    for article in recent[:items]:
+        published = _published(article)
+        pub_date = f"<pubDate>{format_datetime(published)}</pubDate>" if published else ''
+        entries.append(f"<item><title>{html.escape(article['title'])}</title>"
+                       f"<link>{html.escape(base_url + quote(article['path']))}</link>{pub_date}</item>")
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+            '<title>Amhara Media Corporation</title>\n' + '\n'.join(entries) + '\n</channel></rss>')
+
+
+def render_article(article):
+    """Render an article page in the WordPress layout the scraper expects"""
+    paragraphs = ''.join(f'<p>{html.escape(p)}</p>' for p in article['content'].split('\n') if p.strip())
+    return f"""<!DOCTYPE html>
+<html lang="am"><head><meta charset="utf-8"><title>{html.escape(article['title'])}</title></head>
+<body>
+<h1 class="entry-title">{html.escape(article['title'])}</h1>
+<span class="entry-meta"><time class="entry-date">{html.escape(article['date'])}</time></span>
+<a class="post-category" href="/category/news/">{html.escape(article['category'])}</a>
+<div class="entry-content">{paragraphs}<script>var tracking = 1;</script></div>
+</body></html>"""
+
+
+class FixtureServer:
+    """Threaded HTTP server serving the AMC fixture site and a mock LLM endpoint"""
+
+    def __init__(self, corpus=None, host='127.0.0.1', port=0, llm_latency=0.0, sitemap=True):
+        self.corpus = corpus if corpus is not None else load_corpus()
+        self.llm_latency = llm_latency
+        self.llm_calls = 0
+        self._pages = {unquote(a['path']): render_article(a).encode('utf-8') for a in self.corpus}
+        self._home = render_home(self.corpus).encode('utf-8')
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._xml = {}
+        if sitemap:
+            self._xml = {
+                '/sitemap.xml': render_sitemap(self.corpus, self.base_url).encode('utf-8'),
+                '/feed/': render_feed(self.corpus, self.base_url).encode('utf-8'),
+            }
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def llm_url(self):
+        return f"{self.base_url}{LLM_PATH}"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                logger.debug("fixture: " + format, *args)
+
+            def _send(self, status, body, content_type='text/html; charset=utf-8'):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = unquote(urlsplit(self.path).path)
+                if path == '/':
+                    return self._send(200, server._home)
+                if path in server._xml:
+                    return self._send(200, server._xml[path], 'application/xml; charset=utf-8')
+                body = server._pages.get(path) or server._pages.get(path.rstrip('/') + '/')
+                if body is None:
+                    return self._send(404, b'Not Found', 'text/plain')
+                return self._send(200, body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if urlsplit(self.path).path != LLM_PATH:
+                    return self._send(404, b'Not Found', 'text/plain')
+                with server._lock:
+                    server.llm_calls += 1
+                if server.llm_latency:
+                    time.sleep(server.llm_latency)
+                question = payload.get('messages', [{}])[-1].get('content', '')
+                body = json.dumps({
+                    'id': 'bench-completion',
+                    'object': 'chat.completion',
+                    'model': payload.get('model', 'deepseek-chat'),
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': f"Mock answer ({len(question)} prompt chars)"},
+                        'finish_reason': 'stop'
+                    }]
+                }).encode('utf-8')
+                return self._send(200, body, 'application/json')
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Fixture server listening on {self.base_url} ({len(self.corpus)} articles)")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,296 @@
+"""
+End-to-end load and latency benchmark.
+
+Starts the Flask app from ``create_app`` against the local fixture server
+(recorded AMC pages plus a mock LLM endpoint) and either mongomock, a real
+MongoDB URI or no database at all, then drives a weighted mix of
+institutional, news and LLM questions at each concurrency level.
+
+Results are written as JSON so runs can be compared between versions::
+
+    python -m benchmarks.load_test --concurrency 1,8,32 --requests 500 --output new.json
+    python -m benchmarks.load_test --baseline old.json --output new.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.fixtures import FixtureServer, load_corpus
+
+logger = logging.getLogger(__name__)
+
+INSTITUTIONAL_QUESTIONS = [
+    'What is the mission of AMC?',
+    'What is the vision of AMC?',
+    'tell me about amc',
+    'የአማራ ሚዲያ ተልዕኮ ምንድን ነው?',
+    'ስለ አማራ ሚዲያ ንገረኝ',
+]
+
+LLM_QUESTIONS = [
+    'Summarize the most important development news from the Amhara region',
+    'What did the regional government announce about agriculture this season?',
+    'Explain the latest news about education in Bahir Dar',
+    'በክልሉ ስለተከናወኑ የልማት ስራዎች አብራራልኝ',
+]
+
+
+def parse_mix(text):
+    """Parse a mix such as ``institutional=0.3,news=0.5,llm=0.2``"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ('institutional', 'news', 'llm'):
+            raise argparse.ArgumentTypeError(f"Unknown question kind: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def news_questions(corpus, limit=50):
+    """Build news questions from words that actually occur in fixture titles"""
+    questions = []
+    for article in corpus:
+        words = [w for w in article['title'].split() if len(w) > 2]
+        if words:
+            questions.append(words[0])
+        if len(words) > 2:
+            questions.append(' '.join(words[1:3]))
+        if len(questions) >= limit:
+            break
+    return questions or ['ዜና']
+
+
+def build_workload(mix, total, corpus, seed):
+    """Return a deterministic list of (kind, endpoint, payload) requests"""
+    rng = random.Random(seed)
+    pools = {
+        'institutional': INSTITUTIONAL_QUESTIONS,
+        'news': news_questions(corpus),
+        'llm': LLM_QUESTIONS,
+    }
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    workload = []
+    for _ in range(total):
+        kind = rng.choices(kinds, weights)[0]
+        question = rng.choice(pools[kind])
+        language = 'am' if any(not c.isascii() for c in question) else 'en'
+        workload.append((kind, '/api/ask', {'message': question, 'language': language}))
+    return workload
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples, elapsed):
+    """Aggregate (latency_ms, ok) samples into throughput and percentiles"""
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else None,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': latencies[-1] if latencies else None,
+    }
+
+
+def run_level(base_url, workload, concurrency):
+    """Replay the workload with `concurrency` client threads"""
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def fire(item):
+        kind, endpoint, payload = item
+        start = time.perf_counter()
+        try:
+            response = session().post(f"{base_url}{endpoint}", json=payload, timeout=60)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return kind, endpoint, round((time.perf_counter() - start) * 1000, 3), ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fire, workload))
+    elapsed = time.perf_counter() - started
+
+    per_endpoint = defaultdict(list)
+    for kind, endpoint, latency, ok in results:
+        per_endpoint[f"{endpoint}:{kind}"].append((latency, ok))
+        per_endpoint[endpoint].append((latency, ok))
+
+    return {
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'overall': summarize([(latency, ok) for _, _, latency, ok in results], elapsed),
+        'endpoints': {name: summarize(samples, elapsed) for name, samples in sorted(per_endpoint.items())},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def make_database(mongo):
+    """Build the Database the app should use for the given --mongo option"""
+    from app.database import Database
+
+    if mongo == 'none':
+        return None
+    if mongo == 'mongomock':
+        import mongomock
+        return Database(client=mongomock.MongoClient())
+    return Database(mongo)
+
+
+def start_app(mongo):
+    """Create the app for the --mongo option and serve it with a threaded werkzeug server on a free port"""
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    # 'none' must not fall back to the default MONGODB_URI
+    app = create_app(database=make_database(mongo), use_database=mongo != 'none')
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name='bench-app', daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def compare(current, baseline):
+    """Print p50/p95/p99 and throughput deltas against a previous run"""
+    previous = {level['concurrency']: level for level in baseline.get('levels', [])}
+    for level in current['levels']:
+        old = previous.get(level['concurrency'])
+        if not old:
+            continue
+        print(f"\nconcurrency={level['concurrency']}")
+        for name, stats in level['endpoints'].items():
+            before = old['endpoints'].get(name)
+            if not before:
+                continue
+            parts = []
+            for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+                if stats[key] is None or not before[key]:
+                    continue
+                change = (stats[key] - before[key]) / before[key] * 100
+                parts.append(f"{key}={stats[key]} ({change:+.1f}%)")
+            print(f"  {name}: {', '.join(parts)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', default='1,4,16', help='comma separated client concurrency levels')
+    parser.add_argument('--requests', type=int, default=200, help='requests per concurrency level')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('institutional=0.3,news=0.5,llm=0.2'))
+    parser.add_argument('--mongo', default='mongomock', help="'mongomock', 'none' or a MongoDB URI")
+    parser.add_argument('--scale', type=int, default=1, help='repeat the fixture corpus this many times')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='mock LLM response delay in seconds')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--baseline', help='previous JSON results to compare against')
+    parser.add_argument('--verbose', action='store_true', help='keep the application log output')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not args.verbose:
+        # Per-request app logging would dominate the measurements
+        logging.getLogger('app').setLevel(logging.CRITICAL)
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    levels = [int(c) for c in args.concurrency.split(',') if c]
+    corpus = load_corpus(scale=args.scale)
+
+    with FixtureServer(corpus=corpus, llm_latency=args.llm_latency) as fixture, \
+            tempfile.TemporaryDirectory(prefix='amc-bench-') as workdir:
+        # Config is read at import time, so point the app at the fixtures first
+        os.environ['AMC_BASE_URL'] = fixture.base_url
+        os.environ['AMC_CACHE_FILE'] = os.path.join(workdir, 'amc_cache.json')
+        os.environ['DEEPSEEK_API_URL'] = fixture.llm_url
+        os.environ['DEEPSEEK_API_KEY'] = 'bench-key'
+        os.environ['ANALYTICS_SPILL_DIR'] = os.path.join(workdir, 'spill')
+        # Every request comes from one address; measure the server, not the per-client limit
+        os.environ.setdefault('ADMISSION_RATE', '0')
+
+        server, base_url = start_app(args.mongo)
+        try:
+            # Prime every path once so the first crawl is reported on its own
+            warmup = {}
+            for kind in args.mix:
+                [(_, endpoint, payload)] = build_workload({kind: 1}, 1, corpus, args.seed)
+                start = time.perf_counter()
+                requests.post(f"{base_url}{endpoint}", json=payload, timeout=300)
+                warmup[f"{endpoint}:{kind}"] = round((time.perf_counter() - start) * 1000, 3)
+
+            results = {
+                'meta': {
+                    'revision': git_revision(),
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'cpu_count': os.cpu_count(),
+                    'mongo': 'mongomock' if args.mongo == 'mongomock' else ('none' if args.mongo == 'none' else 'uri'),
+                    'mix': args.mix,
+                    'requests_per_level': args.requests,
+                    'corpus_articles': len(corpus),
+                    'llm_latency_s': args.llm_latency,
+                    'seed': args.seed,
+                },
+                'warmup_ms': warmup,
+                'levels': [],
+            }
+            for concurrency in levels:
+                workload = build_workload(args.mix, args.requests, corpus, args.seed + concurrency)
+                level = run_level(base_url, workload, concurrency)
+                results['levels'].append(level)
+                overall = level['overall']
+                print(f"concurrency={concurrency}: {overall['throughput_rps']} req/s, "
+                      f"p50={overall['p50_ms']}ms p95={overall['p95_ms']}ms p99={overall['p99_ms']}ms "
+                      f"errors={overall['errors']}", file=sys.stderr)
+            results['meta']['llm_calls'] = fixture.llm_calls
+            server.app.analytics.flush()
+            results['meta']['analytics'] = server.app.analytics.stats
+        finally:
+            server.shutdown()
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
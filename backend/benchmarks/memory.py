@@ -0,0 +1,150 @@
+"""
+Memory footprint of the article corpus, per 10k articles.
+
+Builds a synthetic corpus from the fixture articles (every copy gets a unique
+body, so nothing is shared between records) and loads it in fresh
+interpreters, once per representation, reporting the resident set size each
+one adds::
+
+    python -m benchmarks.memory --articles 10000 --output memory.json
+
+``dicts`` is the plain-dict representation the scraper cache used to hold,
+``records`` the compact ``Article`` records, and ``index`` the records plus
+the inverted index the engine serves from. The on-disk size of the scraper
+cache is reported for plain and gzip-compressed JSON; the synthetic corpus
+repeats a few dozen bodies, so its gzip figure is better than a real crawl's.
+"""
+import argparse
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ('dicts', 'records', 'index')
+
+
+def rss_bytes():
+    """Current resident set size of this process"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+
+        # Peak rather than current RSS, but still comparable between modes
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def build_corpus(path, count):
+    """Write `count` unique articles as JSON lines to `path`"""
+    from benchmarks.fixtures import load_corpus
+
+    recorded = load_corpus()
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            item = recorded[i % len(recorded)]
+            f.write(json.dumps({
+                'title': f"{item['title']} {i}",
+                'url': f"https://ameco.et/{100000 + i}/",
+                'content': f"{item['content']} ({i})",
+                'date': item['date'],
+                'category': item['category'],
+            }, ensure_ascii=False) + '\n')
+
+
+def measure(mode, path):
+    """Run in a child interpreter: RSS added by loading the corpus in `mode`"""
+    import gc
+
+    from app.utils.corpus import Article
+    from app.utils.retrieval import ArticleIndex
+
+    gc.collect()
+    before = rss_bytes()
+    start = time.perf_counter()
+    articles = []
+    with open(path, 'r', encoding='utf-8') as f:
+        # One line at a time, so only the final representation stays resident
+        for line in f:
+            item = json.loads(line)
+            articles.append(item if mode == 'dicts' else Article.from_dict(item))
+    index = ArticleIndex(articles) if mode == 'index' else None
+    load_s = time.perf_counter() - start
+    gc.collect()
+    result = {'mode': mode, 'articles': len(articles), 'rss_bytes': rss_bytes() - before,
+              'load_s': round(load_s, 3)}
+
+    if mode == 'records':
+        sample = articles[:1000]
+        start = time.perf_counter()
+        for article in sample:
+            article.content
+        result['decompress_us'] = round((time.perf_counter() - start) / max(len(sample), 1) * 1e6, 2)
+        result['compressed_body_bytes'] = sum(article.compressed_size for article in articles)
+        result['body_bytes'] = sum(len(article.content.encode('utf-8')) for article in articles)
+    del index
+    return result
+
+
+def run_child(mode, path):
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.memory', '--child', mode, '--corpus', path],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{mode} run failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def file_sizes(path):
+    """Size of the scraper cache for this corpus as plain and gzip-compressed JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = [json.loads(line) for line in f]
+    payload = json.dumps({'timestamp': '', 'data': data}, ensure_ascii=False).encode('utf-8')
+    return {'json': len(payload), 'json_gz': len(gzip.compress(payload, compresslevel=6))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--output')
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--corpus', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.corpus)))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix='amc-memory-') as workdir:
+        path = os.path.join(workdir, 'corpus.jsonl')
+        build_corpus(path, args.articles)
+        runs = {mode: run_child(mode, path) for mode in MODES}
+        sizes = file_sizes(path)
+
+    per_10k = 10000 / max(args.articles, 1)
+    results = {
+        'articles': args.articles,
+        'rss_mb_per_10k': {mode: round(run['rss_bytes'] * per_10k / 2 ** 20, 2) for mode, run in runs.items()},
+        'load_s': {mode: run['load_s'] for mode, run in runs.items()},
+        'records_vs_dicts': round(runs['records']['rss_bytes'] / max(runs['dicts']['rss_bytes'], 1), 3),
+        'body_compression_ratio': round(
+            runs['records']['compressed_body_bytes'] / max(runs['records']['body_bytes'], 1), 3),
+        'decompress_us_per_article': runs['records']['decompress_us'],
+        'cache_file_mb_per_10k': {name: round(size * per_10k / 2 ** 20, 2) for name, size in sizes.items()},
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
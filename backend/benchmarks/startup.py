@@ -0,0 +1,100 @@
+"""
+Cold-start benchmark with an import-time budget.
+
+Runs ``create_app()`` in fresh interpreters under ``python -X importtime`` and
+fails (exit status 1) when the median startup exceeds the budget or when a
+dependency that should be imported lazily shows up during startup::
+
+    python -m benchmarks.startup --budget-ms 400 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Imported on first use only; none of these may load during create_app()
+LAZY_MODULES = ('bs4', 'pymongo', 'googletrans', 'translate', 'redis')
+
+STARTUP_SNIPPET = (
+    "import time; _t = time.perf_counter(); "
+    "from app import create_app; create_app(); "
+    "print('STARTUP_MS', (time.perf_counter() - _t) * 1000)"
+)
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us, depth)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        self_us, cumulative_us, raw_name = int(parts[0]), int(parts[1]), parts[2]
+        name = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        modules[name] = (self_us, cumulative_us, depth)
+    return modules
+
+
+def run_once(env):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SNIPPET],
+        capture_output=True, text=True, env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"create_app() failed:\n{result.stderr}")
+    startup_ms = float(result.stdout.split('STARTUP_MS')[-1].strip())
+    return startup_ms, parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('STARTUP_BUDGET_MS', 500)))
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to report')
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    # An unreachable MongoDB must not slow startup down either
+    env.setdefault('MONGODB_URI', 'mongodb://127.0.0.1:1/')
+
+    timings, modules = [], {}
+    for _ in range(args.runs):
+        startup_ms, modules = run_once(env)
+        timings.append(startup_ms)
+
+    median = statistics.median(timings)
+    top_level = sorted(
+        ((name, cumulative) for name, (_, cumulative, depth) in modules.items() if depth == 0),
+        key=lambda item: item[1], reverse=True,
+    )
+    eager = [name for name in LAZY_MODULES if any(m == name or m.startswith(name + '.') for m in modules)]
+
+    results = {
+        'runs_ms': [round(t, 2) for t in timings],
+        'median_ms': round(median, 2),
+        'budget_ms': args.budget_ms,
+        'modules_imported': len(modules),
+        'slowest_imports_ms': {name: round(us / 1000, 2) for name, us in top_level[:args.top]},
+        'eager_lazy_modules': eager,
+        'within_budget': median <= args.budget_ms and not eager,
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}", file=sys.stderr)
+    if median > args.budget_ms:
+        print(f"FAIL: median startup {median:.0f}ms exceeds budget {args.budget_ms:.0f}ms", file=sys.stderr)
+    return 0 if results['within_budget'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,5 +3,54 @@ import os
 class Config:
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/amc_chatbot')
     DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY', '')
+    DEEPSEEK_API_URL = os.getenv('DEEPSEEK_API_URL', 'https://api.deepseek.com/v1/chat/completions')
     SCRAPE_INTERVAL = int(os.getenv('SCRAPE_INTERVAL', 3600))  # 1 hour
-    MAX_CACHE_AGE = int(os.getenv('MAX_CACHE_AGE', 86400))  # 24 hours
\ No newline at end of file
+    MAX_CACHE_AGE = int(os.getenv('MAX_CACHE_AGE', 86400))  # 24 hours
+    SCRAPE_LOCK_TIMEOUT = int(os.getenv('SCRAPE_LOCK_TIMEOUT', 600))  # one node crawls at a time
+    SCRAPE_LOCK_WAIT = int(os.getenv('SCRAPE_LOCK_WAIT', 60))  # seconds a worker with no index waits for another's crawl
+    SCRAPE_INTERVAL_JITTER = float(os.getenv('SCRAPE_INTERVAL_JITTER', 0.1))  # up to this fraction added per worker, so they do not refresh together
+    INDEX_MAX_ARTICLES = int(os.getenv('INDEX_MAX_ARTICLES', 5000))  # fallback load from MongoDB
+    AMC_BASE_URL = os.getenv('AMC_BASE_URL', 'https://ameco.et')
+    AMC_CACHE_FILE = os.getenv('AMC_CACHE_FILE', 'data/amc_cache.json.gz')  # gzip JSON; a legacy .json beside it is still read
+    SCRAPER_MAX_LINKS = int(os.getenv('SCRAPER_MAX_LINKS', 200))  # newest article links fetched per crawl; older ones are dropped
+    SCRAPER_FETCH_WORKERS = int(os.getenv('SCRAPER_FETCH_WORKERS', 8))  # I/O threads
+    SCRAPER_PARSE_WORKERS = int(os.getenv('SCRAPER_PARSE_WORKERS', max((os.cpu_count() or 1) - 1, 0)))  # parser processes, 0 = inline
+    SCRAPER_QUEUE_SIZE = int(os.getenv('SCRAPER_QUEUE_SIZE', 32))  # raw pages waiting to be parsed
+    SCRAPER_START_METHOD = os.getenv('SCRAPER_START_METHOD', 'spawn')  # safe with threaded servers
+    AMC_RECORD_ARCHIVE = os.getenv('AMC_RECORD_ARCHIVE', '')  # append scraped responses to this .warc.gz
+    AMC_REPLAY_ARCHIVE = os.getenv('AMC_REPLAY_ARCHIVE', '')  # serve scraper requests from this .warc.gz
+    ANALYTICS_BATCH_SIZE = int(os.getenv('ANALYTICS_BATCH_SIZE', 100))  # records per insert_many
+    ANALYTICS_FLUSH_INTERVAL = float(os.getenv('ANALYTICS_FLUSH_INTERVAL', 5))  # seconds
+    ANALYTICS_MAX_BUFFER = int(os.getenv('ANALYTICS_MAX_BUFFER', 10000))  # records held in memory
+    ANALYTICS_SPILL_DIR = os.getenv('ANALYTICS_SPILL_DIR', 'data/spill')  # used while MongoDB is down
+    ANALYTICS_MAX_SPILL_BYTES = int(os.getenv('ANALYTICS_MAX_SPILL_BYTES', 50 * 1024 * 1024))  # per process
+    # Per /api/ask/batch request. A batch costs one rate-limit token per question, so a
+    # client's batches are also capped at its burst: ADMISSION_BURST without an API key,
+    # ADMISSION_API_KEY_BURST with one
+    ASK_BATCH_MAX_QUESTIONS = int(os.getenv('ASK_BATCH_MAX_QUESTIONS', 1000))
+    ASK_BATCH_WORKERS = int(os.getenv('ASK_BATCH_WORKERS', 4))  # concurrent LLM calls per batch
+    SUGGEST_LIMIT = int(os.getenv('SUGGEST_LIMIT', 8))  # default suggestions per /api/suggest request
+    SUGGEST_POPULAR_QUESTIONS = int(os.getenv('SUGGEST_POPULAR_QUESTIONS', 500))  # past questions offered; 0 = titles only
+    SUGGEST_QUESTION_DAYS = int(os.getenv('SUGGEST_QUESTION_DAYS', 30))  # how far back questions count
+    INGEST_SNIPPET_CHARS = int(os.getenv('INGEST_SNIPPET_CHARS', 150))  # search result snippet length
+    INGEST_SUMMARY_SENTENCES = int(os.getenv('INGEST_SUMMARY_SENTENCES', 3))  # extractive summary per article
+    INGEST_SUMMARY_CHARS = int(os.getenv('INGEST_SUMMARY_CHARS', 600))
+    LLM_CONTEXT_SUMMARIES = os.getenv('LLM_CONTEXT_SUMMARIES', 'true').lower() in ('1', 'true', 'yes')  # summaries instead of full bodies
+    PREWARM_POPULAR_QUESTIONS = int(os.getenv('PREWARM_POPULAR_QUESTIONS', 50))  # 0 disables
+    ADMISSION_RATE = float(os.getenv('ADMISSION_RATE', 2))  # requests/s per client address; 0 disables rate limiting
+    ADMISSION_BURST = int(os.getenv('ADMISSION_BURST', 20))
+    ADMISSION_API_KEYS = os.getenv('ADMISSION_API_KEYS', '')  # comma-separated keys sent as X-API-Key
+    ADMISSION_API_KEY_RATE = float(os.getenv('ADMISSION_API_KEY_RATE', 20))
+    ADMISSION_API_KEY_BURST = int(os.getenv('ADMISSION_API_KEY_BURST', 1000))  # room for a full ASK_BATCH_MAX_QUESTIONS batch
+    ADMISSION_TRUST_PROXY = os.getenv('ADMISSION_TRUST_PROXY', '').lower() in ('1', 'true', 'yes')  # client address from X-Forwarded-For
+    ADMISSION_PROXY_HOPS = int(os.getenv('ADMISSION_PROXY_HOPS', 1))  # proxies of ours appending to X-Forwarded-For; entries before them are client-supplied
+    ADMISSION_MAX_CLIENTS = int(os.getenv('ADMISSION_MAX_CLIENTS', 100000))  # rate-limit buckets kept in memory
+    ADMISSION_LLM_CONCURRENCY = int(os.getenv('ADMISSION_LLM_CONCURRENCY', 8))  # LLM calls per process
+    ADMISSION_LLM_QUEUE = int(os.getenv('ADMISSION_LLM_QUEUE', 16))  # waiting beyond that get 503
+    ADMISSION_SCRAPE_QUEUE = int(os.getenv('ADMISSION_SCRAPE_QUEUE', 32))  # requests waiting for a cold crawl
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 30))  # seconds
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 5))  # seconds, sent with 503
+    REDIS_URL = os.getenv('REDIS_URL', '')  # shared L2 cache across nodes (needs the redis package); empty = in-process only
+    CACHE_NAMESPACE = os.getenv('CACHE_NAMESPACE', 'amc')
+    CACHE_L1_MAX_ITEMS = int(os.getenv('CACHE_L1_MAX_ITEMS', 10000))
+    CACHE_L1_MAX_BYTES = int(os.getenv('CACHE_L1_MAX_BYTES', 64 * 1024 * 1024))
@@ -0,0 +1,76 @@
+"""
+Gunicorn configuration for the AMC chatbot backend.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden through the environment (GUNICORN_*).
+
+The app is preloaded in the master: modules, the parsed article index and the
+compiled matchers are built once by wsgi.py's warm-up and shared copy-on-write
+with the workers. Reloads:
+
+* ``kill -HUP <master>``  - graceful restart of all workers with the same code
+  (workers finish in-flight requests, new ones are forked from the master).
+* ``kill -USR2 <master>`` then ``kill -WINCH`` / ``kill -QUIT`` the old master -
+  zero-downtime upgrade to new code, since preloaded code is not re-imported
+  on HUP.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Requests mostly wait on the AMC site, MongoDB and the LLM API, so a few
+# processes with several threads each give more concurrency per MB than
+# many single-threaded sync workers.
+workers = int(os.getenv('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 9)))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+preload_app = True
+
+# A cold crawl can take a while; the graceful timeout bounds reloads.
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically, staggered so they do not restart together.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+# Heartbeat files on tmpfs avoid worker stalls on slow container disks.
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+pidfile = os.getenv('GUNICORN_PIDFILE') or None
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+
+def when_ready(server):
+    # Everything allocated by the preload/warm-up is long lived; moving it to
+    # the permanent generation keeps the GC from touching (and copying) those
+    # pages in every worker.
+    gc.collect()
+    gc.freeze()
+    server.log.info("Application preloaded and warmed up; accepting connections")
+
+
+def post_fork(server, worker):
+    # MongoClient is not fork-safe, so each worker opens its own connections.
+    from wsgi import app
+
+    if getattr(app, 'db', None):
+        app.db.reconnect()
+    # Workers inherit the master's index expiry; spread their refreshes out
+    if getattr(app, 'engine', None):
+        app.engine.after_fork()
+
+
+def worker_exit(server, worker):
+    # Write buffered analytics before the worker goes away; atexit handlers
+    # are not guaranteed to run in gunicorn workers.
+    from wsgi import app
+
+    if getattr(app, 'analytics', None):
+        app.analytics.close()
@@ -0,0 +1,9 @@
+"""
+Offline unit tests; run from backend/ with ``python -m pytest``.
+
+The live-server scripts (test_api.py, test_scraper.py) are not collected.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,106 @@
+import math
+
+import mongomock
+import pytest
+
+from app import create_app
+from app.database import Database
+from app.utils.admission import Admission, Overloaded, RateLimiter
+from config import Config
+
+
+def test_bucket_allows_a_burst_then_refuses():
+    limiter = RateLimiter(rate=1, burst=3)
+    assert [limiter.acquire('client') for _ in range(3)] == [0, 0, 0]
+    assert 0 < limiter.acquire('client') <= 1
+    assert limiter.stats == {'clients': 1, 'admitted': 3, 'rejected': 1}
+
+
+def test_clients_have_separate_buckets():
+    limiter = RateLimiter(rate=1, burst=1)
+    assert limiter.acquire('a') == 0
+    assert limiter.acquire('b') == 0
+    assert limiter.acquire('a') > 0
+
+
+def test_batch_pays_its_full_cost():
+    limiter = RateLimiter(rate=1, burst=20)
+    assert limiter.acquire('client', cost=15) == 0
+    # Only five tokens are left
+    assert limiter.acquire('client', cost=10) == pytest.approx(5, abs=0.1)
+
+
+def test_cost_above_burst_is_never_admitted():
+    limiter = RateLimiter(rate=1, burst=20)
+    assert limiter.acquire('client', cost=1000) == math.inf
+    # Nothing was taken from the bucket
+    assert limiter.acquire('client', cost=20) == 0
+
+
+def test_admission_refuses_oversized_batches(monkeypatch):
+    monkeypatch.setattr(Config, 'ADMISSION_RATE', 2)
+    monkeypatch.setattr(Config, 'ADMISSION_BURST', 20)
+    admission = Admission(api_keys='')
+    with pytest.raises(Overloaded) as refused:
+        admission.admit('10.0.0.1', cost=21)
+    assert refused.value.status == 429
+    assert '21 tokens' in str(refused.value)
+
+
+def app_with(monkeypatch, **settings):
+    for name, value in settings.items():
+        monkeypatch.setattr(Config, name, value)
+    app = create_app(database=Database(client=mongomock.MongoClient()))
+    return app, app.test_client()
+
+
+def test_batch_above_the_burst_is_refused_before_any_work(monkeypatch):
+    app, client = app_with(monkeypatch, ADMISSION_RATE=2, ADMISSION_BURST=20)
+    response = client.post('/api/ask/batch', json={'questions': [f"question {n}" for n in range(1000)]})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'At most 20 questions per batch'
+    assert app.engine._index is None
+    # Charged like any other request, not one token per question
+    assert app.admission.clients.stats['admitted'] == 1
+
+
+def test_default_api_key_burst_fits_a_full_batch(monkeypatch):
+    app, client = app_with(monkeypatch, ADMISSION_API_KEYS='replay-key')
+    app.admission = Admission(api_keys='replay-key')
+    # Invalid items are answered without any retrieval work
+    items = [0] * Config.ASK_BATCH_MAX_QUESTIONS
+    response = client.post('/api/ask/batch', json={'questions': items}, headers={'X-API-Key': 'replay-key'})
+    assert response.status_code == 200
+    assert len(response.get_data(as_text=True).splitlines()) == Config.ASK_BATCH_MAX_QUESTIONS
+    assert app.admission.keys.stats['admitted'] == 1
+
+
+def test_batch_limit_without_rate_limiting(monkeypatch):
+    app, client = app_with(monkeypatch, ADMISSION_RATE=0)
+    response = client.post('/api/ask/batch', json={'questions': [0] * (Config.ASK_BATCH_MAX_QUESTIONS + 1)})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == f"At most {Config.ASK_BATCH_MAX_QUESTIONS} questions per batch"
+
+
+def test_forwarded_for_is_ignored_without_a_trusted_proxy(monkeypatch):
+    app, client = app_with(monkeypatch, ADMISSION_RATE=1, ADMISSION_BURST=1, ADMISSION_TRUST_PROXY=False)
+    client.post('/api/ask', json={}, headers={'X-Forwarded-For': '1.1.1.1'})
+    client.post('/api/ask', json={}, headers={'X-Forwarded-For': '2.2.2.2'})
+    assert app.admission.clients.stats['rejected'] == 1
+
+
+def test_client_cannot_spoof_its_address_through_a_proxy(monkeypatch):
+    app, client = app_with(monkeypatch, ADMISSION_RATE=1, ADMISSION_BURST=1, ADMISSION_TRUST_PROXY=True,
+                           ADMISSION_PROXY_HOPS=1)
+    # The proxy appends the real peer; the client made up the entries before it
+    for forged in ('1.1.1.1', '2.2.2.2'):
+        client.post('/api/ask', json={}, headers={'X-Forwarded-For': f"{forged}, 203.0.113.7"})
+    assert list(app.admission.clients._buckets) == ['203.0.113.7']
+    assert app.admission.clients.stats['rejected'] == 1
+
+
+def test_addresses_behind_two_proxies(monkeypatch):
+    app, client = app_with(monkeypatch, ADMISSION_RATE=1, ADMISSION_BURST=1, ADMISSION_TRUST_PROXY=True,
+                           ADMISSION_PROXY_HOPS=2)
+    client.post('/api/ask', json={}, headers={'X-Forwarded-For': '1.1.1.1, 203.0.113.7, 10.0.0.2'})
+    assert list(app.admission.clients._buckets) == ['203.0.113.7']
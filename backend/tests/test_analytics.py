@@ -0,0 +1,173 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+from app.utils.analytics import WriteBehindBuffer
+
+
+class FlakyStore:
+    """write() callable that fails while `down` is set"""
+
+    def __init__(self):
+        self.down = False
+        self.calls = 0
+        self.records = []
+
+    def __call__(self, records):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("MongoDB is not available")
+        self.records.extend(records)
+
+
+@pytest.fixture
+def store():
+    return FlakyStore()
+
+
+@pytest.fixture
+def buffer(store, tmp_path):
+    buffer = WriteBehindBuffer(store, 'query_log', batch_size=2, flush_interval=60, spill_dir=str(tmp_path))
+    yield buffer
+    buffer._closed = True
+
+
+def add(buffer, count, start=0):
+    for number in range(start, start + count):
+        # Without starting the background thread; the tests flush explicitly
+        buffer._records.append({'n': number, 'timestamp': datetime(2025, 5, 27, 12, number)})
+        buffer.enqueued += 1
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_writes_in_batches(buffer, store):
+    add(buffer, 5)
+    buffer.flush()
+    assert [record['n'] for record in store.records] == [0, 1, 2, 3, 4]
+    assert store.calls == 3
+    assert buffer.stats['written'] == 5
+
+
+def test_spills_while_down_and_replays_in_order(buffer, store, tmp_path):
+    store.down = True
+    add(buffer, 3)
+    buffer.flush()
+    assert os.listdir(tmp_path) == [f"query_log.{os.getpid()}.jsonl"]
+    assert buffer.stats['spilled'] == 3
+
+    store.down = False
+    add(buffer, 2, start=3)
+    buffer._retry_at = 0.0
+    buffer.flush()
+    assert [record['n'] for record in store.records] == [0, 1, 2, 3, 4]
+    assert store.records[0]['timestamp'] == datetime(2025, 5, 27, 12, 0)
+    assert os.listdir(tmp_path) == []
+
+
+def test_backs_off_while_down(buffer, store):
+    store.down = True
+    add(buffer, 2)
+    buffer.flush()
+    calls = store.calls
+    add(buffer, 2, start=2)
+    # Within the backoff: spilled without touching the database
+    buffer.flush()
+    assert store.calls == calls
+    assert buffer.stats['spilled'] == 4
+
+    first = buffer._retry_interval
+    buffer._retry_at = 0.0
+    buffer.flush()
+    assert buffer._retry_interval == 2 * first
+
+
+def test_failed_replay_reads_one_batch_and_keeps_the_file(buffer, store):
+    store.down = True
+    add(buffer, 10)
+    buffer.flush()
+    spill = buffer.spill_path
+    before = os.stat(spill)
+
+    buffer._retry_at = 0.0
+    calls = store.calls
+    buffer.flush()
+    assert store.calls == calls + 1
+    after = os.stat(spill)
+    assert (after.st_ino, after.st_size, after.st_mtime_ns) == (before.st_ino, before.st_size, before.st_mtime_ns)
+
+
+def test_partial_replay_keeps_the_rest(buffer, store):
+    store.down = True
+    add(buffer, 6)
+    buffer.flush()
+
+    store.down = False
+    writes = store.calls
+
+    def fail_after_first_batch(records):
+        store.down = store.calls > writes
+        FlakyStore.__call__(store, records)
+
+    buffer.write = fail_after_first_batch
+    buffer._retry_at = 0.0
+    buffer.flush()
+    assert [record['n'] for record in store.records] == [0, 1]
+    with open(buffer.spill_path, encoding='utf-8') as f:
+        assert [json.loads(line)['n'] for line in f] == [2, 3, 4, 5]
+
+
+def spill_file(directory, owner, numbers):
+    path = os.path.join(directory, f"query_log.{owner}.jsonl")
+    with open(path, 'w', encoding='utf-8') as f:
+        for number in numbers:
+            f.write(json.dumps({'n': number}) + '\n')
+    return path
+
+
+def test_replays_spill_files_of_exited_processes(buffer, store, tmp_path):
+    spill_file(tmp_path, dead_pid(), [7, 8, 9])
+    buffer.flush()
+    assert [record['n'] for record in store.records] == [7, 8, 9]
+    assert os.listdir(tmp_path) == []
+
+
+def test_leaves_spill_files_of_live_processes_alone(buffer, store, tmp_path):
+    path = spill_file(tmp_path, os.getppid(), [1, 2])
+    buffer.flush()
+    assert store.records == []
+    assert os.path.exists(path)
+
+
+def test_drops_when_spill_file_is_full(store, tmp_path):
+    buffer = WriteBehindBuffer(store, 'query_log', batch_size=2, flush_interval=60,
+                               spill_dir=str(tmp_path), max_spill_bytes=1)
+    store.down = True
+    add(buffer, 4)
+    buffer.flush()
+    assert buffer.stats['spilled'] == 2
+    assert buffer.stats['dropped'] == 2
+    buffer._closed = True
+
+
+def test_claimed_spill_files_respect_the_size_limit(store, tmp_path):
+    line_size = len(json.dumps({'n': 0}) + '\n')
+    buffer = WriteBehindBuffer(store, 'query_log', batch_size=2, flush_interval=60,
+                               spill_dir=str(tmp_path), max_spill_bytes=4 * line_size)
+    spill_file(tmp_path, dead_pid(), range(10))
+    store.down = True
+    buffer.flush()
+    with open(buffer.spill_path, encoding='utf-8') as f:
+        assert [json.loads(line)['n'] for line in f] == [0, 1, 2, 3]
+    assert os.path.getsize(buffer.spill_path) <= buffer.max_spill_bytes
+    assert buffer.stats['dropped'] == 6
+    assert os.listdir(tmp_path) == [os.path.basename(buffer.spill_path)]
+    buffer._closed = True
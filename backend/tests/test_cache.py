@@ -0,0 +1,201 @@
+import threading
+import time
+
+import fakeredis
+import pytest
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.utils.cache import LRUCache, TwoTierCache
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def node(server, **kwargs):
+    """A TwoTierCache as one node would build it, sharing `server` as L2"""
+    return TwoTierCache('test', 60, client=fakeredis.FakeStrictRedis(server=server), **kwargs)
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("Redis is down")
+        return fail
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_items=2, max_bytes=100)
+    cache.set('a', 1, ttl=60)
+    cache.set('b', 2, ttl=60)
+    cache.get('a')
+    cache.set('c', 3, ttl=60)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats['evictions'] == 1
+
+
+def test_lru_is_bounded_by_bytes_and_expires():
+    cache = LRUCache(max_items=10, max_bytes=10)
+    cache.set('a', 1, ttl=60, size=6)
+    cache.set('b', 2, ttl=60, size=6)
+    assert cache.get('a') is None and cache.bytes == 6
+    cache.set('too big', 3, ttl=60, size=11)
+    assert cache.get('too big') is None
+    cache.set('short', 4, ttl=-1)
+    assert cache.get('short') is None
+
+
+def test_l2_is_shared_between_nodes(server):
+    first, second = node(server), node(server)
+    first.set('answer', {'text': 'ሰላም'})
+    assert second.lookup('answer') == ({'text': 'ሰላም'}, 'l2')
+    assert second.lookup('answer') == ({'text': 'ሰላም'}, 'l1')
+
+
+def test_encode_and_decode_apply_to_l2_only(server):
+    first = node(server, encode=lambda value: sorted(value), decode=set)
+    second = node(server, encode=lambda value: sorted(value), decode=set)
+    first.set('tags', {'b', 'a'})
+    assert first.get('tags') == {'a', 'b'}
+    assert second.get('tags') == {'a', 'b'}
+
+
+def test_publish_bumps_the_shared_version(server):
+    first, second = node(server), node(server)
+    version = first.publish('articles', ['one'])
+    assert second.version() == version == 1
+    assert second.get('articles', version=version) == ['one']
+    version = second.publish('articles', ['two'])
+    assert first.version() == 2
+    assert first.get('articles', version=2) == ['two']
+    # Old versions are separate keys
+    assert first.get('articles', version=1) == ['one']
+
+
+def test_publish_invalidates_other_nodes(server):
+    first, second = node(server), node(server)
+    second.set('answer', 'old')
+    received = []
+    announced = threading.Event()
+
+    def on_version(version):
+        received.append(version)
+        announced.set()
+
+    second.subscribe(on_version)
+    second.ensure_subscribed()
+    # Wait for the listener to subscribe before publishing
+    wait_for_subscriber(first.client, second.channel)
+    first.publish('articles', ['new'])
+    assert announced.wait(5)
+    assert received == [1]
+    assert len(second.l1) == 0
+
+
+class TimingOutPubSub:
+    """A pubsub whose idle reads time out, like redis-py with a socket_timeout"""
+
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+        self.timeouts = 0
+
+    def __getattr__(self, name):
+        return getattr(self.pubsub, name)
+
+    def get_message(self, timeout=0.0):
+        message = self.pubsub.get_message(timeout=timeout)
+        if message is None:
+            self.timeouts += 1
+            raise RedisTimeoutError("Timeout reading from socket")
+        return message
+
+
+class TimingOutRedis(fakeredis.FakeStrictRedis):
+    def pubsub(self, **kwargs):
+        self.last_pubsub = TimingOutPubSub(super().pubsub(**kwargs))
+        return self.last_pubsub
+
+
+def wait_for_subscriber(client, channel):
+    deadline = time.monotonic() + 5
+    while client.pubsub_numsub(channel)[0][1] < 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_invalidation_arrives_after_idling(server, monkeypatch):
+    monkeypatch.setattr(TwoTierCache, 'LISTEN_TIMEOUT', 0.01)
+    first = node(server)
+    second = TwoTierCache('test', 60, client=TimingOutRedis(server=server))
+    announced = threading.Event()
+    second.subscribe(lambda version: announced.set())
+    second.ensure_subscribed()
+    wait_for_subscriber(first.client, second.channel)
+    # Several idle reads time out; none of them may drop the subscription for RETRY_INTERVAL
+    time.sleep(0.3)
+    assert second.client.last_pubsub.timeouts > 1
+    first.publish('articles', ['new'])
+    assert announced.wait(5)
+
+
+def test_without_l2_versions_are_local():
+    cache = TwoTierCache('test', 60)
+    assert cache.publish('articles', ['one']) == 1
+    assert cache.version() == 1
+    assert cache.lookup('articles', version=1) == (['one'], 'l1')
+    assert cache.lookup('missing') == (None, None)
+
+
+def test_l2_errors_fall_back_to_l1():
+    cache = TwoTierCache('test', 60, client=BrokenRedis())
+    cache.set('answer', 'local')
+    assert cache.lookup('answer') == ('local', 'l1')
+    assert cache.lookup('other') == (None, None)
+    assert cache.stats['l2']['errors'] == 1
+    # Skipped while down rather than timing out again
+    assert cache._down_until > time.monotonic()
+
+
+def test_redis_lock_is_exclusive(server):
+    first, second = node(server), node(server)
+    assert first.lock('crawl', ttl=60)
+    assert not second.lock('crawl', ttl=60)
+    first.unlock('crawl')
+    assert second.lock('crawl', ttl=60)
+
+
+def test_file_lock_without_redis(tmp_path):
+    first = TwoTierCache('test', 60, lock_dir=str(tmp_path))
+    second = TwoTierCache('test', 60, lock_dir=str(tmp_path))
+    assert first.lock('crawl', ttl=60)
+    start = time.monotonic()
+    assert not second.lock('crawl', ttl=60, wait=0.3)
+    assert time.monotonic() - start >= 0.3
+    first.unlock('crawl')
+    assert second.lock('crawl', ttl=60)
+    second.unlock('crawl')
+
+
+def test_lock_waits_for_the_holder(tmp_path):
+    first = TwoTierCache('test', 60, lock_dir=str(tmp_path))
+    second = TwoTierCache('test', 60, lock_dir=str(tmp_path))
+    assert first.lock('crawl', ttl=60)
+    threading.Timer(0.2, first.unlock, args=('crawl',)).start()
+    assert second.lock('crawl', ttl=60, wait=5)
+    second.unlock('crawl')
+
+
+def test_file_lock_while_redis_is_down(tmp_path):
+    first = TwoTierCache('test', 60, client=BrokenRedis(), lock_dir=str(tmp_path))
+    second = TwoTierCache('test', 60, client=BrokenRedis(), lock_dir=str(tmp_path))
+    assert first.lock('crawl', ttl=60)
+    assert not second.lock('crawl', ttl=60)
+    first.unlock('crawl')
+
+
+def test_lock_is_granted_with_nothing_to_lock_on():
+    cache = TwoTierCache('test', 60)
+    assert cache.lock('crawl', ttl=60)
+    assert cache.lock('crawl', ttl=60)
@@ -0,0 +1,119 @@
+import gzip
+import json
+import pickle
+from datetime import datetime
+
+from app.utils.corpus import Article, compact, read_corpus_file, write_corpus_file
+from app.utils.scraper import AMCScraper
+
+BODY = ('የአማራ ክልል ምክር ቤት ጉባኤውን ዛሬ በባሕር ዳር ጀመረ። ' * 20).strip()
+
+
+def scraped(**overrides):
+    item = {
+        'title': ' Council meets ',
+        'url': 'https://ameco.et/1/ ',
+        'content': BODY,
+        'date': 'ግንቦት 19/2017',
+        'category': 'News',
+        'published_ts': 1748336400,
+    }
+    item.update(overrides)
+    return item
+
+
+def test_body_round_trips_through_compression():
+    article = Article.from_dict(scraped())
+    assert article.content == BODY
+    assert article.compressed_size < len(BODY.encode('utf-8'))
+    assert article.title == 'Council meets'
+    assert article.url == 'https://ameco.et/1/'
+    assert article.published_ts == 1748336400.0
+
+
+def test_article_reads_like_the_scraped_dict():
+    article = Article.from_dict(scraped())
+    assert set(article) == set(Article.FIELDS)
+    assert article['content'] == BODY
+    assert article.get('missing') is None
+    assert dict(article)['language'] == 'am'
+
+
+def test_derived_fields_are_computed_for_old_items():
+    article = Article.from_dict(scraped())
+    assert article.snippet and len(article.snippet) < len(BODY)
+    assert article.summary and article.summary in BODY
+
+
+def test_short_body_is_its_own_snippet_and_summary():
+    article = Article.from_dict(scraped(content='Short  body.'))
+    assert article._snippet is None and article._summary is None
+    assert article.snippet == article.summary == 'Short body.'
+
+
+def test_repeated_strings_are_interned():
+    first, second = Article.from_dict(scraped()), Article.from_dict(scraped(url='https://ameco.et/2/'))
+    assert first.category is second.category
+    assert first.date is second.date
+
+
+def test_from_dict_returns_records_unchanged():
+    article = Article.from_dict(scraped())
+    assert Article.from_dict(article) is article
+
+
+def test_article_pickles():
+    article = Article.from_dict(scraped())
+    copy = pickle.loads(pickle.dumps(article))
+    assert dict(copy) == dict(article)
+
+
+def test_compact_skips_malformed_entries():
+    articles = compact([scraped(), 'not an article', None, scraped(url='https://ameco.et/2/')])
+    assert [article.url for article in articles] == ['https://ameco.et/1/', 'https://ameco.et/2/']
+
+
+def test_gzip_corpus_file_round_trip(tmp_path):
+    path = str(tmp_path / 'cache' / 'amc_cache.json.gz')
+    payload = {'articles': [scraped()], 'timestamp': 1748336400}
+    write_corpus_file(path, payload)
+    with open(path, 'rb') as f:
+        assert f.read(2) == b'\x1f\x8b'
+    assert read_corpus_file(path) == payload
+    # Written atomically: no temporary file is left behind
+    assert [p.name for p in (tmp_path / 'cache').iterdir()] == ['amc_cache.json.gz']
+
+
+def test_plain_json_corpus_file_round_trip(tmp_path):
+    path = str(tmp_path / 'amc_cache.json')
+    write_corpus_file(path, {'articles': [scraped()]})
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {'articles': [scraped()]}
+
+
+def test_legacy_plain_json_file_is_read(tmp_path):
+    path = tmp_path / 'amc_cache.json.gz'
+    # Older versions wrote plain JSON, whatever the file name
+    path.write_text(json.dumps({'articles': [scraped()]}, ensure_ascii=False), encoding='utf-8')
+    assert read_corpus_file(str(path)) == {'articles': [scraped()]}
+    assert compact(read_corpus_file(str(path))['articles'])[0].content == BODY
+
+
+def test_gzip_file_is_smaller_than_plain_json(tmp_path):
+    payload = {'articles': [scraped(url=f"https://ameco.et/{n}/") for n in range(20)]}
+    write_corpus_file(str(tmp_path / 'a.json.gz'), payload)
+    write_corpus_file(str(tmp_path / 'a.json'), payload)
+    assert (tmp_path / 'a.json.gz').stat().st_size < (tmp_path / 'a.json').stat().st_size
+    assert gzip.decompress((tmp_path / 'a.json.gz').read_bytes()) == (tmp_path / 'a.json').read_bytes()
+
+
+def test_scraper_reads_a_legacy_cache_beside_the_configured_one(tmp_path):
+    scraper = AMCScraper()
+    scraper.cache_file = str(tmp_path / 'amc_cache.json.gz')
+    legacy = tmp_path / 'amc_cache.json'
+    legacy.write_text(json.dumps({'timestamp': datetime.now().isoformat(), 'data': [scraped()]}), encoding='utf-8')
+    [article] = scraper._load_cache()
+    assert isinstance(article, Article) and article.content == BODY
+    # The next save writes the configured gzip file
+    scraper._save_cache([article])
+    assert read_corpus_file(scraper.cache_file)['data'][0]['content'] == BODY
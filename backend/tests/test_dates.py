@@ -0,0 +1,93 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.utils.dates import EAT, ethiopian_to_gregorian, parse_date, recency_intent, start_of_day
+
+# 2025-05-27 12:00 EAT
+NOW = datetime(2025, 5, 27, 12, tzinfo=EAT).timestamp()
+TODAY = start_of_day(NOW)
+DAY = 86400
+
+
+@pytest.mark.parametrize('ethiopian, gregorian', [
+    ((2017, 9, 19), date(2025, 5, 27)),    # ግንቦት 19/2017
+    ((2015, 13, 6), date(2023, 9, 11)),    # ጳጉሜ 6/2015, leap year
+    ((2016, 1, 1), date(2023, 9, 12)),     # Enkutatash after a leap year
+    ((2017, 1, 1), date(2024, 9, 11)),
+    ((2016, 5, 1), date(2024, 1, 10)),     # ጥር 1
+])
+def test_ethiopian_to_gregorian(ethiopian, gregorian):
+    assert ethiopian_to_gregorian(*ethiopian) == gregorian
+
+
+@pytest.mark.parametrize('ethiopian', [(2016, 13, 6), (2017, 14, 1), (2017, 1, 31), (2017, 0, 1)])
+def test_ethiopian_to_gregorian_rejects_invalid_dates(ethiopian):
+    with pytest.raises(ValueError):
+        ethiopian_to_gregorian(*ethiopian)
+
+
+def local_midnight(day):
+    return datetime(day.year, day.month, day.day, tzinfo=EAT).timestamp()
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('ግንቦት 19/2017 ዓ.ም', local_midnight(date(2025, 5, 27))),
+    ('ባሕር ዳር: ጳጉሜ 6/2015 ዓ.ም (አሚኮ)', local_midnight(date(2023, 9, 11))),
+    ('19/09/2017 ዓ.ም', local_midnight(date(2025, 5, 27))),
+    ('May 27, 2025', local_midnight(date(2025, 5, 27))),
+    ('27 May 2025', local_midnight(date(2025, 5, 27))),
+    ('27/05/2025', local_midnight(date(2025, 5, 27))),
+    ('2025-05-27T09:30:00Z', datetime.fromisoformat('2025-05-27T09:30:00+00:00').timestamp()),
+    ('2 hours ago', NOW - 2 * 3600),
+    ('ከ3 ቀን በፊት', NOW - 3 * DAY),
+    ('yesterday', TODAY - DAY),
+    ('', None),
+    ('Tuesday', None),
+    ('ግንቦት 31/2017 ዓ.ም', None),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text, now=NOW) == expected
+
+
+def test_parse_date_without_relative():
+    assert parse_date('2 hours ago', now=NOW, relative=False) is None
+
+
+@pytest.mark.parametrize('query, window', [
+    ("what is today's news", (TODAY, None)),
+    ('የዛሬ ዜና', (TODAY, None)),
+    ('what happened yesterday', (TODAY - DAY, TODAY)),
+    ('news this week', (TODAY - 6 * DAY, None)),
+    ('የሳምንቱ ዜና', (TODAY - 6 * DAY, None)),
+    ('past month', (TODAY - 29 * DAY, None)),
+    ('week news about football', (TODAY - 6 * DAY, None)),
+    ('latest news', (None, None)),
+    ('የቅርብ ጊዜ ዜናዎች', (None, None)),
+])
+def test_recency_intent(query, window):
+    intent = recency_intent(query, now=NOW)
+    assert intent is not None
+    assert intent[:2] == window
+
+
+@pytest.mark.parametrize('query', [
+    'current president of Ethiopia',
+    'AMC weekly program',
+    'monthly magazine subscription',
+    'the week of the festival',
+    'recent history of Bahir Dar',
+    'ኢትዮጵያ',
+])
+def test_no_recency_intent_without_cue(query):
+    assert recency_intent(query, now=NOW) is None
+
+
+def test_recency_intent_strips_temporal_words():
+    assert recency_intent('latest news about Bahir Dar', now=NOW)[2] == 'about bahir dar'
+    assert recency_intent('news this week in Gondar', now=NOW)[2] == 'gondar'
+
+
+@pytest.mark.parametrize('query', ['latest news', 'Latest headlines!', 'የቅርብ ጊዜ ዜናዎች', 'ወቅታዊ ዜና'])
+def test_recency_intent_drops_news_cues(query):
+    assert recency_intent(query, now=NOW) == (None, None, '')
@@ -0,0 +1,91 @@
+from app.utils.corpus import Article
+from app.utils.dedup import DuplicateIndex, fingerprint, hamming
+from app.utils.retrieval import ArticleIndex
+
+STORY = (
+    "The Amhara regional government announced on Tuesday that construction of the new "
+    "Bahir Dar stadium will be completed before the start of the football season. Officials "
+    "said the stadium will seat sixty thousand spectators and host national team matches. "
+    "Residents welcomed the news and said the project would bring jobs to the city. "
+    "The regional sports commission said that the first phase of the project, which includes "
+    "the pitch, the drainage system and the main stand, has already been finished by local "
+    "contractors. The second phase covers the roof, the lighting towers and the training "
+    "grounds next to the lake shore. Engineers explained that heavy rains in the summer months "
+    "had slowed down the work, but additional crews were hired to make up for the lost time. "
+    "The commissioner also thanked the federal government and the diaspora community for their "
+    "financial support and called on businesses in the city to prepare hotels, restaurants and "
+    "transport services for the visitors expected during the season. Football clubs from Gondar, "
+    "Dessie and Debre Markos have already asked to play friendly matches at the new venue once "
+    "it opens to the public."
+)
+OTHER_STORY = (
+    "Farmers in the Gojjam zone began harvesting wheat earlier than usual this year after "
+    "favourable rains. Agricultural experts advised them to store the grain in dry places "
+    "and to sell through cooperatives. The zone expects a record harvest compared with the "
+    "previous five years according to the regional agriculture bureau."
+)
+AMHARIC_STORY = (
+    "የአማራ ክልል መንግሥት የባሕር ዳር ስታዲየም ግንባታ ከእግር ኳስ ውድድር ዘመኑ መጀመሪያ በፊት እንደሚጠናቀቅ አስታወቀ። "
+    "ስታዲየሙ ስልሳ ሺህ ተመልካቾችን እንደሚይዝ እና ብሔራዊ ቡድኑን ጨዋታዎች እንደሚያስተናግድ ኃላፊዎች ገልጸዋል። "
+    "ነዋሪዎች ፕሮጀክቱ ለከተማዋ የሥራ ዕድል እንደሚፈጥር ተናግረዋል።"
+)
+
+
+def record(number, title, content):
+    return Article.from_dict({'title': title, 'url': f"https://ameco.et/{number}/", 'content': content})
+
+
+def test_near_duplicates_share_a_fingerprint_neighbourhood():
+    edited = 'Bahir Dar (AMC): ' + STORY + ' (AMC)'
+    same = fingerprint('Bahir Dar stadium to open this season', STORY)
+    near = fingerprint('Bahir Dar stadium to open this season', edited)
+    other = fingerprint('Early wheat harvest in Gojjam', OTHER_STORY)
+    assert hamming(same[0], near[0]) <= 3
+    assert hamming(same[0], other[0]) > 3
+
+
+def test_short_bodies_are_not_fingerprinted():
+    assert fingerprint('Title', 'Too short to compare') == ()
+
+
+def test_near_duplicates_cluster_together():
+    index = DuplicateIndex()
+    articles = [
+        record(1, 'Bahir Dar stadium to open this season', STORY),
+        # Same story filed under another section with a dateline and byline
+        record(2, 'Bahir Dar stadium to open this season', 'Bahir Dar (AMC): ' + STORY + ' (AMC)'),
+        record(3, 'Early wheat harvest in Gojjam', OTHER_STORY),
+        record(4, 'የባሕር ዳር ስታዲየም ግንባታ', AMHARIC_STORY),
+    ]
+    representatives = [index.add(doc_id, item, item.content) for doc_id, item in enumerate(articles)]
+    assert representatives == [0, 0, 2, 3]
+    assert index.duplicates == 1
+
+
+def test_same_body_with_a_different_title_is_not_merged():
+    # Navigation-only pages share a body but are different articles
+    index = DuplicateIndex()
+    first = record(1, 'Bahir Dar stadium to open this season', STORY)
+    second = record(2, 'Wheat prices fall in Gondar market', STORY)
+    assert index.add(0, first, first.content) == 0
+    assert index.add(1, second, second.content) == 1
+
+
+def test_fingerprints_are_cached_on_the_record():
+    item = record(1, 'Bahir Dar stadium to open this season', STORY)
+    DuplicateIndex().add(0, item, item.content)
+    cached = item.simhash
+    assert cached
+    DuplicateIndex().add(0, item, '')
+    assert item.simhash is cached
+
+
+def test_search_returns_one_article_per_cluster():
+    index = ArticleIndex([
+        {'title': 'Bahir Dar stadium to open this season', 'url': 'https://ameco.et/1/', 'content': STORY},
+        {'title': 'Bahir Dar stadium to open this season', 'url': 'https://ameco.et/2/',
+         'content': STORY + ' (AMC)'},
+        {'title': 'Stadium news from Gondar', 'url': 'https://ameco.et/3/', 'content': OTHER_STORY + ' stadium'},
+    ])
+    urls = [item['url'] for item in index.rank('stadium', include_english=True, limit=5)]
+    assert urls == ['https://ameco.et/1/', 'https://ameco.et/3/']
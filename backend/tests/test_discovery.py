@@ -0,0 +1,224 @@
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+
+from app.utils.discovery import LinkDiscovery, is_article_url, parse_timestamp
+from app.utils.scraper import AMCScraper
+
+BASE = 'https://ameco.et'
+DAY = 86400
+T0 = datetime(2025, 5, 1, tzinfo=timezone.utc).timestamp()
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.content = body
+        self.status_code = status_code
+        self.encoding = 'utf-8'
+        self.apparent_encoding = 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def iter_content(self, size):
+        for start in range(0, len(self.content), size):
+            yield self.content[start:start + size]
+
+    def raise_for_status(self):
+        if self.status_code != 200:
+            raise Exception(f"HTTP {self.status_code}")
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Serves `pages` (path -> str or bytes); everything else is a 404"""
+
+    def __init__(self, pages):
+        self.pages = {path: body.encode('utf-8') if isinstance(body, str) else body for path, body in pages.items()}
+        self.requested = []
+
+    def get(self, url, timeout=None, stream=False):
+        path = url[len(BASE):] or '/'
+        self.requested.append(path)
+        if path in self.pages:
+            return FakeResponse(self.pages[path])
+        return FakeResponse(b'', status_code=404)
+
+
+def iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def urlset(*entries):
+    urls = ''.join(f"<url><loc>{BASE}{path}</loc>" + (f"<lastmod>{iso(ts)}</lastmod>" if ts else '') + "</url>"
+                   for path, ts in entries)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+
+def sitemap_index(*entries):
+    maps = ''.join(f"<sitemap><loc>{BASE}{path}</loc><lastmod>{iso(ts)}</lastmod></sitemap>" for path, ts in entries)
+    return f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{maps}</sitemapindex>'
+
+
+RSS = f"""<?xml version="1.0"?><rss version="2.0"><channel><title>AMC</title>
+<item><title>Rain in Bahir Dar</title><link>{BASE}/74625/</link><pubDate>Fri, 02 May 2025 09:00:00 +0300</pubDate></item>
+<item><title>Category</title><link>{BASE}/category/news/</link></item>
+<item><title>Council meets</title><link>/74624/</link><pubDate>Thu, 01 May 2025 09:00:00 +0300</pubDate></item>
+</channel></rss>"""
+
+ATOM = f"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">
+<entry><title>Road opens</title><link rel="alternate" href="{BASE}/2025/05/road-opens/"/>
+<updated>2025-05-03T10:00:00Z</updated></entry>
+</feed>"""
+
+
+@pytest.mark.parametrize('url, expected', [
+    (f"{BASE}/74624/", True),
+    ('https://www.ameco.et/74624', True),
+    (f"{BASE}/news/74624/", True),
+    (f"{BASE}/2025/05/road-opens/", True),
+    (f"{BASE}/2025/05/03/road-opens/", True),
+    (f"{BASE}/?p=74624", True),
+    (f"{BASE}/2025/", False),
+    (f"{BASE}/2025/05/", False),
+    (f"{BASE}/2025/05/03/", False),
+    (f"{BASE}/news/2025/05", False),
+    (f"{BASE}/category/news/", False),
+    (f"{BASE}/tag/amhara/", False),
+    (f"{BASE}/page/2/", False),
+    (f"{BASE}/wp-content/uploads/2025/05/photo.jpg", False),
+    (f"{BASE}/about/", False),
+    ('https://www.facebook.com/74624/', False),
+])
+def test_is_article_url(url, expected):
+    assert is_article_url(url, BASE) is expected
+
+
+def test_parse_timestamp():
+    assert parse_timestamp('2025-05-01T00:00:00Z') == T0
+    assert parse_timestamp('2025-05-01T03:00:00+03:00') == T0
+    assert parse_timestamp('2025-05-01') == T0
+    assert parse_timestamp('Thu, 01 May 2025 03:00:00 +0300') == T0
+    assert parse_timestamp('yesterday') is None
+    assert parse_timestamp('') is None
+
+
+def test_rss_feed_entries():
+    discovery = LinkDiscovery(FakeSession({'/feed/': RSS}), BASE)
+    entries = list(discovery.feed_entries(f"{BASE}/feed/"))
+    assert [(url, title) for url, title, _ in entries] == [
+        (f"{BASE}/74625/", 'Rain in Bahir Dar'),
+        (f"{BASE}/category/news/", 'Category'),
+        (f"{BASE}/74624/", 'Council meets'),
+    ]
+    assert entries[2][2] == T0 + 6 * 3600
+    # Only article links are kept
+    assert [url for url, _, _ in discovery.from_feeds()] == [f"{BASE}/74625/", f"{BASE}/74624/"]
+
+
+def test_atom_feed_entries():
+    discovery = LinkDiscovery(FakeSession({'/feed/atom/': ATOM}), BASE)
+    assert discovery.from_feeds() == [(f"{BASE}/2025/05/road-opens/", 'Road opens', T0 + 2 * DAY + 10 * 3600)]
+
+
+def test_sitemap_index_from_robots_newest_first():
+    session = FakeSession({
+        '/robots.txt': f"User-agent: *\nSitemap: {BASE}/wp-sitemap.xml\n",
+        '/wp-sitemap.xml': sitemap_index(('/wp-sitemap-posts-post-1.xml', T0 + 5 * DAY),
+                                         ('/wp-sitemap-taxonomies-category-1.xml', T0 + 5 * DAY)),
+        '/wp-sitemap-posts-post-1.xml': urlset(('/74620/', T0), ('/74622/', T0 + 2 * DAY), ('/2025/05/', T0 + 4 * DAY),
+                                               ('/74621/', T0 + DAY), ('/about/', T0 + 3 * DAY)),
+    })
+    discovery = LinkDiscovery(session, BASE)
+    links = discovery.from_sitemaps(limit=2)
+    assert links == [(f"{BASE}/74622/", '', T0 + 2 * DAY), (f"{BASE}/74621/", '', T0 + DAY)]
+    assert '/wp-sitemap-taxonomies-category-1.xml' not in session.requested
+
+
+def test_gzip_sitemap():
+    session = FakeSession({'/sitemap.xml': gzip.compress(urlset(('/74620/', T0)).encode('utf-8'))})
+    assert LinkDiscovery(session, BASE).from_sitemaps(limit=10) == [(f"{BASE}/74620/", '', T0)]
+
+
+def test_malformed_sitemap_keeps_what_was_parsed():
+    session = FakeSession({'/sitemap.xml': urlset(('/74620/', T0)).replace('</urlset>', '<url><loc>&broken')})
+    assert LinkDiscovery(session, BASE).from_sitemaps(limit=10) == [(f"{BASE}/74620/", '', T0)]
+
+
+def test_discover_merges_feed_and_sitemap():
+    session = FakeSession({
+        '/feed/': RSS,
+        '/sitemap.xml': urlset(('/74624/', T0 + 3 * DAY), ('/74623/', T0 - DAY)),
+    })
+    discovery = LinkDiscovery(session, BASE)
+    links = discovery.discover(limit=10)
+    assert links == [
+        (f"{BASE}/74624/", 'Council meets', T0 + 3 * DAY),
+        (f"{BASE}/74625/", 'Rain in Bahir Dar', T0 + DAY + 6 * 3600),
+        (f"{BASE}/74623/", '', T0 - DAY),
+    ]
+    assert discovery.source == 'feed+sitemap'
+
+
+def test_discover_without_feed_or_sitemap():
+    assert LinkDiscovery(FakeSession({}), BASE).discover(limit=10) is None
+
+
+def test_discover_with_nothing_new():
+    session = FakeSession({
+        '/sitemap.xml': sitemap_index(('/post-sitemap.xml', T0)),
+        '/post-sitemap.xml': urlset(('/74620/', T0)),
+    })
+    discovery = LinkDiscovery(session, BASE)
+    assert discovery.discover(limit=10, since=T0 + DAY) == []
+    assert '/post-sitemap.xml' not in session.requested
+
+
+def article_page(title, date=''):
+    return (f'<html><body><h1 class="entry-title">{title}</h1>'
+            f'<span class="entry-meta"><time class="entry-date">{date}</time></span>'
+            f'<div class="entry-content"><p>{title} was reported today.</p></div></body></html>')
+
+
+def scraper_with(session, tmp_path):
+    scraper = AMCScraper()
+    scraper.base_url = BASE
+    scraper.session = session
+    scraper.cache_file = str(tmp_path / 'amc_cache.json.gz')
+    scraper.parse_workers = 0
+    return scraper
+
+
+def test_nothing_new_does_not_crawl_the_home_page(tmp_path):
+    session = FakeSession({
+        '/sitemap.xml': sitemap_index(('/post-sitemap.xml', T0)),
+        '/post-sitemap.xml': urlset(('/74620/', T0)),
+        '/': '<html><body><div class="news"><a href="/74620/">Old</a></div></body></html>',
+    })
+    scraper = scraper_with(session, tmp_path)
+    assert scraper._find_links(since=T0 + DAY) == []
+    assert '/' not in session.requested
+    assert scraper.last_crawl_stats['discovery_source'] is None
+
+
+def test_home_page_is_the_fallback_without_discovery(tmp_path):
+    session = FakeSession({'/': '<html><body><div class="news"><a href="/74620/">Old</a></div></body></html>'})
+    scraper = scraper_with(session, tmp_path)
+    assert scraper._find_links() == [(f"{BASE}/74620/", 'Old', None)]
+    assert scraper.last_crawl_stats['discovery_source'] == 'home'
+
+
+def test_lastmod_is_not_a_publication_date(tmp_path):
+    session = FakeSession({
+        '/sitemap.xml': urlset(('/74620/', T0 + 300 * DAY), ('/74621/', T0)),
+        '/74620/': article_page('Edited old story'),
+        '/74621/': article_page('Dated story', 'May 1, 2025'),
+    })
+    scraper = scraper_with(session, tmp_path)
+    articles = {item['url']: item for item in scraper.get_news_content(use_cache=False)}
+    assert articles[f"{BASE}/74620/"]['published_ts'] is None
+    assert articles[f"{BASE}/74621/"]['published_ts'] is not None
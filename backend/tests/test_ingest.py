@@ -0,0 +1,80 @@
+import pytest
+
+from app.utils.ingest import (DERIVED_FIELDS, detect_language, ingest, make_snippet, normalize_title,
+                              split_sentences, summarize)
+
+
+@pytest.mark.parametrize('text, language', [
+    ('የአማራ ክልል ምክር ቤት ጉባኤውን ጀመረ', 'am'),
+    ('ዜና 2016', 'am'),
+    ('Bahir Dar ፡ news', 'en'),
+    ('The regional council opened its session.', 'en'),
+    ('Café au lait à Addis-Abeba, déjà vu', 'en'),
+    ('Ärzte in München über Äthiopien', 'en'),
+    ('Ελληνικά κείμενα', 'en'),
+    ('የክልሉ መንግሥት ዛሬ (AMC) አስታወቀ', 'am'),
+])
+def test_detect_language(text, language):
+    assert detect_language(text) == language
+
+
+def test_normalize_title():
+    assert normalize_title('  Bahir​ Dar\n  news﻿ ') == 'Bahir Dar news'
+    # Decomposed é becomes one character
+    assert normalize_title('Café') == 'Café'
+    assert normalize_title(None) == ''
+
+
+def test_split_sentences():
+    text = 'ዝናብ ጣለ። ገበሬዎች ተደሰቱ፧ Prices fell. Really?'
+    assert split_sentences(text) == ['ዝናብ ጣለ።', 'ገበሬዎች ተደሰቱ፧', 'Prices fell.', 'Really?']
+
+
+def test_snippet_keeps_short_text():
+    assert make_snippet('  One   sentence. ', max_chars=50) == 'One sentence.'
+
+
+def test_snippet_keeps_whole_sentences():
+    text = 'First sentence here. Second sentence here. Third sentence here.'
+    assert make_snippet(text, max_chars=45) == 'First sentence here. Second sentence here.'
+
+
+def test_snippet_cuts_a_long_sentence_at_a_word():
+    text = 'The regional council discussed the budget, the roads and the schools of the zone'
+    snippet = make_snippet(text, max_chars=30)
+    assert snippet == 'The regional council discussed...'
+    assert len(snippet) <= 30 + 3
+
+
+def test_summary_of_a_short_text_is_the_text():
+    assert summarize('One. Two.', max_sentences=3, max_chars=100) == 'One. Two.'
+
+
+def test_summary_keeps_the_lead_and_the_most_central_sentence_in_order():
+    text = ('Rain fell on Bahir Dar. '
+            'A football match was played. '
+            'Farmers in Bahir Dar welcomed the rain. '
+            'The weather was warm.')
+    summary = summarize(text, max_sentences=2, max_chars=500)
+    assert summary == 'Rain fell on Bahir Dar. Farmers in Bahir Dar welcomed the rain.'
+
+
+def test_summary_skips_repeated_boilerplate():
+    text = 'Council met today. Follow AMC news. Follow AMC news. Follow AMC news. Budget was approved.'
+    summary = summarize(text, max_sentences=3, max_chars=500)
+    assert summary.count('Follow AMC news.') == 1
+
+
+def test_summary_respects_max_chars():
+    text = ' '.join(f"Sentence number {n} about the council budget." for n in range(20))
+    assert len(summarize(text, max_sentences=5, max_chars=100)) <= 100
+
+
+def test_ingest_adds_derived_fields_once():
+    article = ingest({'title': ' Rain​  in Bahir Dar ', 'content': 'Rain fell on Bahir Dar today.'})
+    assert article['title'] == 'Rain in Bahir Dar'
+    assert article['language'] == 'en'
+    assert article['snippet'] == article['summary'] == 'Rain fell on Bahir Dar today.'
+    stored = dict(article, summary='kept')
+    assert ingest(stored)['summary'] == 'kept'
+    assert all(field in article for field in DERIVED_FIELDS)
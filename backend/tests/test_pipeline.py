@@ -0,0 +1,53 @@
+import pytest
+
+from app.utils.pipeline import CrawlPipeline
+
+
+def page(title):
+    return (f'<html><body><h1 class="entry-title">{title}</h1>'
+            f'<div class="entry-content"><p>{title} was reported today.</p></div></body></html>').encode('utf-8')
+
+
+PAGES = {f"https://ameco.et/{n}/": page(f"Story {n}") for n in range(12)}
+
+
+def fetch(url):
+    if url.endswith('/broken/'):
+        raise ConnectionError('connection reset')
+    if url.endswith('/empty/'):
+        return b'', 'utf-8'
+    if url.endswith('/bad-encoding/'):
+        return page('Bad'), 'no-such-codec'
+    return PAGES[url], 'utf-8'
+
+
+@pytest.mark.parametrize('parse_workers', [0, 1])
+def test_records_come_back_in_link_order(parse_workers):
+    pipeline = CrawlPipeline(fetch, fetch_workers=4, parse_workers=parse_workers, queue_size=2)
+    links = [(url, '') for url in PAGES]
+    records = pipeline.run(links)
+    assert [record['url'] for record in records] == list(PAGES)
+    assert [record['title'] for record in records] == [f"Story {n}" for n in range(12)]
+    assert pipeline.pages_fetched == 12
+    assert pipeline.bytes_fetched == sum(len(body) for body in PAGES.values())
+
+
+def test_failed_pages_are_counted_and_skipped():
+    pipeline = CrawlPipeline(fetch, fetch_workers=2, parse_workers=0)
+    links = [('https://ameco.et/1/', ''), ('https://ameco.et/broken/', ''), ('https://ameco.et/empty/', ''),
+             ('https://ameco.et/bad-encoding/', ''), ('https://ameco.et/2/', '')]
+    records = pipeline.run(links)
+    assert [record['url'] for record in records] == ['https://ameco.et/1/', 'https://ameco.et/2/']
+    assert pipeline.fetch_errors == 1
+    assert pipeline.parse_errors == 1
+    assert pipeline.pages_fetched == 3
+
+
+def test_link_text_is_the_title_of_pages_without_one():
+    pipeline = CrawlPipeline(lambda url: (b'<html><body><p>No heading</p></body></html>', 'utf-8'), parse_workers=0)
+    assert [record['title'] for record in pipeline.run([('https://ameco.et/1/', 'From the link')])] == ['From the link']
+    assert pipeline.run([('https://ameco.et/2/', '')]) == []
+
+
+def test_no_links():
+    assert CrawlPipeline(fetch).run([]) == []
@@ -0,0 +1,89 @@
+import gzip
+import os
+
+import pytest
+import requests
+
+from app.utils.replay import ReplayArchive, enable_recording, enable_replay, iter_records, write_record
+from benchmarks.fixtures import FixtureServer, load_corpus
+
+HTML = {'Content-Type': 'text/html; charset=UTF-8'}
+
+
+@pytest.fixture(scope='module')
+def site():
+    with FixtureServer(corpus=load_corpus()[:3]) as server:
+        yield server
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / 'archive.warc.gz')
+    body = 'ዜና\r\n\r\nbody with a blank line'.encode('utf-8')
+    with open(path, 'wb') as f:
+        write_record(f, 'https://ameco.et/1/', 200, 'OK', dict(HTML, **{'Content-Encoding': 'gzip'}), body)
+        write_record(f, 'https://ameco.et/2/', 404, 'Not Found', HTML, b'')
+    [(url, status, reason, headers, stored), missing] = list(iter_records(path))
+    assert (url, status, reason, stored) == ('https://ameco.et/1/', 200, 'OK', body)
+    assert headers['Content-Type'] == 'text/html; charset=UTF-8'
+    # The body is stored decoded, so its wire encoding is dropped
+    assert 'Content-Encoding' not in headers
+    assert headers['Content-Length'] == str(len(body))
+    assert missing[:3] == ('https://ameco.et/2/', 404, 'Not Found')
+
+
+def test_every_record_is_its_own_gzip_member(tmp_path):
+    path = str(tmp_path / 'archive.warc.gz')
+    for n in range(2):
+        # Appending, as recording does
+        with open(path, 'ab') as f:
+            write_record(f, f"https://ameco.et/{n}/", 200, 'OK', HTML, b'page')
+    assert gzip.decompress(open(path, 'rb').read()).count(b'WARC/1.0') == 2
+    assert [record[0] for record in iter_records(path)] == ['https://ameco.et/0/', 'https://ameco.et/1/']
+
+
+def test_first_capture_wins(tmp_path):
+    path = str(tmp_path / 'archive.warc.gz')
+    with open(path, 'wb') as f:
+        write_record(f, 'https://ameco.et/1/', 200, 'OK', HTML, b'first')
+        write_record(f, 'https://ameco.et/1/', 200, 'OK', HTML, b'second')
+    archive = ReplayArchive(path)
+    assert len(archive) == 1
+    assert archive.responses['https://ameco.et/1/'][3] == b'first'
+
+
+def test_archive_is_reloaded_when_the_file_changes(tmp_path):
+    path = str(tmp_path / 'archive.warc.gz')
+    with open(path, 'wb') as f:
+        write_record(f, 'https://ameco.et/1/', 200, 'OK', HTML, b'page')
+    first = ReplayArchive.load(path)
+    assert ReplayArchive.load(path) is first
+    with open(path, 'ab') as f:
+        write_record(f, 'https://ameco.et/2/', 200, 'OK', HTML, b'page')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+    assert 'https://ameco.et/2/' in ReplayArchive.load(path)
+
+
+def test_record_then_replay(site, tmp_path):
+    path = str(tmp_path / 'crawl.warc.gz')
+    urls = [f"{site.base_url}/", f"{site.base_url}/sitemap.xml", f"{site.base_url}/feed/"]
+
+    recording = requests.Session()
+    enable_recording(recording, path)
+    live = [recording.get(url, timeout=10) for url in urls]
+    # Streamed reads, as discovery does, still see the body
+    streamed = b''.join(recording.get(urls[1], timeout=10, stream=True).iter_content(1024))
+    assert streamed == live[1].content
+
+    replay = requests.Session()
+    adapter = enable_replay(replay, path)
+    for url, original in zip(urls, live):
+        response = replay.get(url, timeout=10)
+        assert response.status_code == 200
+        assert response.content == original.content
+        assert response.text == original.text
+        assert response.encoding == original.encoding
+    assert adapter.hits == 3
+
+    miss = replay.get(f"{site.base_url}/not-recorded/", timeout=10)
+    assert miss.status_code == 404 and miss.headers['X-Replay'] == 'miss'
+    assert adapter.misses == 1
@@ -0,0 +1,171 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.utils.dates import EAT
+from app.utils.retrieval import ArticleIndex, RetrievalEngine
+from config import Config
+
+NOW = datetime(2025, 5, 27, 12, tzinfo=EAT).timestamp()
+DAY = 86400
+
+
+def article(number, title, content, age_days):
+    return {
+        'title': title,
+        'url': f"https://ameco.et/{number}/",
+        'content': content,
+        'date': '',
+        'category': 'News',
+        'published_ts': NOW - age_days * DAY,
+    }
+
+
+def test_empty_window_falls_back_to_relevance():
+    index = ArticleIndex([
+        article(1, 'Stadium opens in Bahir Dar', 'The football stadium in Bahir Dar opened.', 20),
+        article(2, 'Rainfall forecast', 'Heavy rain is expected in the highlands.', 10),
+    ])
+    results = index.rank("today's news about football stadium", include_english=True, limit=1, now=NOW)
+    assert [item['url'] for item in results] == ['https://ameco.et/1/']
+
+
+def test_window_prefers_recent_articles():
+    index = ArticleIndex([
+        article(1, 'Old football report', 'Football match report from Gondar.', 20),
+        article(2, 'New football report', 'Football match report from Dessie.', 0),
+    ])
+    results = index.rank('football news this week', include_english=True, limit=2, now=NOW)
+    assert [item['url'] for item in results] == ['https://ameco.et/2/']
+
+
+@pytest.mark.parametrize('query', ['latest news', 'የቅርብ ጊዜ ዜናዎች'])
+def test_latest_news_returns_the_newest_articles(query):
+    index = ArticleIndex([
+        article(1, 'Archive', 'Old news from the archive. ዜናዎች', 300),
+        article(2, 'Road opens', 'A new road opened in Bahir Dar.', 0),
+        article(3, 'Market prices', 'Teff prices fell this month.', 1),
+    ])
+    results = index.rank(query, include_english=True, limit=2, now=NOW)
+    assert [item['url'] for item in results] == ['https://ameco.et/2/', 'https://ameco.et/3/']
+
+
+class FakeScraper:
+    """Serves `articles` as a fresh crawl; the on-disk cache starts empty"""
+
+    def __init__(self, cache_file, articles=(), delay=0.0):
+        self.cache_file = str(cache_file)
+        self.articles = list(articles)
+        self.delay = delay
+        self.cached = []
+        self.crawls = 0
+
+    def _load_cache(self):
+        return list(self.cached)
+
+    def get_news_content(self):
+        self.crawls += 1
+        time.sleep(self.delay)
+        # The real scraper writes its cache file, which other workers read
+        self.cached = list(self.articles)
+        return list(self.articles)
+
+
+def engine_with(scraper):
+    return RetrievalEngine(scraper, db=None, shared_cache=None)
+
+
+def test_stale_index_is_served_while_refreshing_in_background(tmp_path):
+    scraper = FakeScraper(tmp_path / 'amc_cache.json.gz', [article(1, 'First', 'Body one.', 0)])
+    engine = engine_with(scraper)
+    first = engine.get_index()
+    assert len(first) == 1 and scraper.crawls == 1
+
+    scraper.cached = []
+    scraper.articles = [article(2, 'Second', 'Body two.', 0)]
+    scraper.delay = 0.3
+    engine._expires_at = 0.0
+    start = time.monotonic()
+    assert engine.get_index() is first
+    assert time.monotonic() - start < 0.2
+    deadline = time.monotonic() + 5
+    while engine._index is first:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert engine._index.by_url('https://ameco.et/2/') is not None
+
+
+def test_empty_fetch_keeps_the_current_index(tmp_path):
+    scraper = FakeScraper(tmp_path / 'amc_cache.json.gz', [article(1, 'First', 'Body one.', 0)])
+    engine = engine_with(scraper)
+    first = engine.refresh()
+    scraper.cached = []
+    scraper.articles = []
+    assert engine.refresh() is first
+    assert engine._expires_at - time.monotonic() <= engine.EMPTY_RETRY_INTERVAL
+
+
+def test_cold_workers_wait_for_one_crawl(tmp_path):
+    shared = FakeScraper(tmp_path / 'amc_cache.json.gz', [article(1, 'First', 'Body one.', 0)], delay=0.3)
+
+    class Worker(FakeScraper):
+        # Every worker reads the cache file the crawling one writes
+        def _load_cache(self):
+            return list(shared.cached)
+
+        def get_news_content(self):
+            return shared.get_news_content()
+
+    engines = [engine_with(Worker(shared.cache_file)) for _ in range(3)]
+    threads = [threading.Thread(target=engine.get_index) for engine in engines]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert shared.crawls == 1
+    assert [len(engine._index) for engine in engines] == [1, 1, 1]
+
+
+def test_after_fork_staggers_refreshes(tmp_path):
+    engine = engine_with(FakeScraper(tmp_path / 'amc_cache.json.gz'))
+    engine._expires_at = expires = 1000.0
+    engine.after_fork()
+    assert expires <= engine._expires_at <= expires + engine.refresh_interval * Config.SCRAPE_INTERVAL_JITTER
+
+
+def slow_engine(tmp_path, monkeypatch, delay):
+    monkeypatch.setattr(Config, 'DEEPSEEK_API_KEY', 'test-key')
+    engine = engine_with(FakeScraper(tmp_path / 'amc_cache.json.gz', [article(1, 'First', 'Body one.', 0)]))
+    calls = []
+
+    def generate(message, context, language, index):
+        calls.append(message)
+        time.sleep(delay)
+        return f"answer to {message}"
+
+    engine._generate = generate
+    return engine, calls
+
+
+def test_closing_a_batch_cancels_queued_llm_calls(tmp_path, monkeypatch):
+    engine, calls = slow_engine(tmp_path, monkeypatch, 0.05)
+    results = engine.ask_batch([(f"question {n}", 'en') for n in range(40)], workers=2)
+    next(results)
+    results.close()
+    time.sleep(0.2)
+    # The two calls running when the client left may finish; the rest never start
+    assert len(calls) <= 4
+
+
+def test_batch_latency_is_per_question(tmp_path, monkeypatch):
+    engine, calls = slow_engine(tmp_path, monkeypatch, 0.05)
+    started = time.perf_counter()
+    latencies = [latency for _, _, _, latency in engine.ask_batch([(f"question {n}", 'en') for n in range(8)],
+                                                                  workers=1)]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert len(calls) == 8
+    # One worker answers in turn; each question still reports only its own call
+    assert elapsed_ms > 350
+    assert all(40 < latency < 150 for latency in latencies)
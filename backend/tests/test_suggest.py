@@ -0,0 +1,84 @@
+import random
+
+from app.utils.suggest import SuggestionIndex, normalize
+
+title = SuggestionIndex.title_entry
+question = SuggestionIndex.question_entry
+
+
+def texts(suggestions):
+    return [suggestion['text'] for suggestion in suggestions]
+
+
+def expected(entries, prefix, limit, language=None):
+    """Every matching entry ranked, best text first"""
+    prefix = normalize(prefix)
+    best = {}
+    for entry in sorted(entries, key=lambda entry: entry[3]):
+        words = normalize(entry[0]).split(' ')
+        matches = any(' '.join(words[i:]).startswith(prefix) for i in range(len(words)))
+        if matches and (language is None or entry[2] == language):
+            best.setdefault(entry[0], entry)
+    return list(best)[:limit]
+
+
+def random_entries(rng, count):
+    words = ['ባሕር', 'ባሕርዳር', 'ዳር', 'amhara', 'amc', 'amharic', 'news', 'new', 'bahir', 'dar', 'road']
+    entries = {}
+    for n in range(count):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 4))) + f" {n}"
+        language = 'am' if 'ባ' in text or 'ዳ' in text else 'en'
+        entries[text] = title(text, language, float(n)) if n % 5 else question(text, language, n)
+    return list(entries.values())
+
+
+def test_popular_question_beats_thousands_of_titles():
+    entries = [title(f"a{n:05d} story", 'en', float(n)) for n in range(6000)]
+    entries.append(question('azz popular question', 'en', 5))
+    index = SuggestionIndex(entries)
+    assert texts(index.lookup('a', 2)) == ['azz popular question', 'a05999 story']
+    assert texts(index.lookup('a0', 1)) == ['a05999 story']
+    assert texts(index.lookup('a05', 1)) == ['a05999 story']
+    assert texts(index.lookup('a0599', 2)) == ['a05999 story', 'a05998 story']
+
+
+def test_long_prefix_ranks_every_match():
+    entries = [title(f"the news number {n}", 'en', float(n)) for n in range(3000)]
+    index = SuggestionIndex(entries)
+    assert texts(index.lookup('the news', 2)) == ['the news number 2999', 'the news number 2998']
+    assert texts(index.lookup('number 1', 1)) == ['the news number 1999']
+    assert index.lookup('the zebra') == []
+
+
+def test_lookup_matches_a_full_ranking():
+    rng = random.Random(7)
+    entries = random_entries(rng, 400)
+    index = SuggestionIndex(entries)
+    for prefix in ('a', 'am', 'amh', 'amha', 'new', 'news ', 'ባ', 'ባሕርዳ', 'dar b', 'road road', '1'):
+        for language in (None, 'am', 'en'):
+            assert texts(index.lookup(prefix, 5, language)) == expected(entries, prefix, 5, language), prefix
+
+
+def test_updated_index_matches_a_fresh_one():
+    rng = random.Random(11)
+    entries = random_entries(rng, 300)
+    index = SuggestionIndex(entries)
+    changed = entries[50:] + [title(f"amhara news extra {n}", 'en', 1000.0 + n) for n in range(20)]
+    updated = index.updated(changed)
+    fresh = SuggestionIndex(changed)
+    for prefix in ('a', 'amh', 'amhara n', 'news', 'ባሕር', 'road'):
+        assert updated.lookup(prefix, 6) == fresh.lookup(prefix, 6) == [
+            {'text': text, 'type': dict((entry[0], entry[1]) for entry in changed)[text],
+             'language': dict((entry[0], entry[2]) for entry in changed)[text]}
+            for text in expected(changed, prefix, 6)
+        ]
+
+
+def test_text_is_suggested_once():
+    index = SuggestionIndex([
+        title('road to road news', 'en', 1.0),
+        question('road to road news', 'en', 3),
+    ])
+    # Matches twice as a question and twice as a title; the question ranks first
+    assert index.lookup('road') == [{'text': 'road to road news', 'type': 'question', 'language': 'en'}]
+    assert index.lookup('road to r') == [{'text': 'road to road news', 'type': 'question', 'language': 'en'}]
@@ -1,6 +1,12 @@
-from app import app
+"""
+Production WSGI entry point.
 
-if __name__ == "__main__":
-    from wsgiref.simple_server import make_server
-    server = make_server('localhost', 5000, app)
-    server.serve_forever()
\ No newline at end of file
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+See gunicorn.conf.py for worker tuning, preloading and reload signals.
+"""
+from app import create_app
+from app.warmup import warm_up
+
+app = create_app()
+warm_up(app)